@@ -1,7 +1,7 @@
 from typing import Optional
 from llama_index.core.agent import FunctionAgent
 from app.core.llm import get_llm
-from app.agents.tools import build_vector_search_tool
+from app.agents.tools import build_vector_batch_search_tool, build_vector_search_tool
 
 
 def build_agent(
@@ -17,9 +17,12 @@ If using retrieved text, cite the 'source' fields from metadata.
 
 {confidence_instruction}"""
 
-    tool = build_vector_search_tool(namespace=namespace)
+    tools = [
+        build_vector_search_tool(namespace=namespace),
+        build_vector_batch_search_tool(namespace=namespace),
+    ]
     agent = FunctionAgent(
-        tools=[tool],
+        tools=tools,
         llm=get_llm(),
         system_prompt=system_prompt,
     )
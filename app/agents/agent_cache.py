@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Type
+from app.agents.base_agent import BaseAgent
+from app.core.config import get_settings
+
+_agent_cache: Optional["AgentCache"] = None
+
+
+class AgentCache:
+    """
+    LRU cache of built agents keyed by (agent class, language, markdown).
+
+    An agent's tools, system prompt and FunctionAgent depend only on those
+    three, so one instance serves every request that shares them. Nothing
+    per request lives on the agent: each FunctionAgent.run() starts its own
+    Context (memory, tool call state), so cached agents can serve concurrent
+    requests.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[type, str, bool], BaseAgent]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.build_seconds = 0.0
+
+    def get_or_create(
+        self, agent_class: Type[BaseAgent], language: str, markdown: bool
+    ) -> BaseAgent:
+        key = (agent_class, language, markdown)
+        with self._lock:
+            agent = self._entries.get(key)
+            if agent is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return agent
+            self.misses += 1
+
+        # Built outside the lock; if two requests race, the first one stored wins
+        t0 = time.perf_counter()
+        agent = agent_class(language=language, markdown=markdown)
+        elapsed = time.perf_counter() - t0
+
+        with self._lock:
+            self.build_seconds += elapsed
+            agent = self._entries.setdefault(key, agent)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return agent
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "avg_build_ms": (
+                round(self.build_seconds / self.misses * 1000, 3)
+                if self.misses
+                else 0.0
+            ),
+        }
+
+
+def get_agent_cache() -> Optional[AgentCache]:
+    """Return the process-wide agent cache, or None when it is disabled"""
+    global _agent_cache
+    settings = get_settings()
+    if not settings.agent_cache_enabled:
+        return None
+    if _agent_cache is None:
+        _agent_cache = AgentCache(max_entries=settings.agent_cache_max_entries)
+    return _agent_cache
@@ -1,4 +1,5 @@
 from typing import Optional
+from app.agents.agent_cache import get_agent_cache
 from app.agents.base_agent import BaseAgent
 from app.agents.weather_agent.agent import WeatherAgent
 from app.agents.crop_science_agent.agent import CropScienceAgent
@@ -45,6 +46,10 @@ class AgentFactory:
         """
         Create an agent based on the category, language, and markdown preference.
 
+        Agents are immutable once built, so they come from the agent cache
+        (AGENT_CACHE_ENABLED) and are shared by requests with the same agent
+        class, language and markdown preference.
+
         Args:
             category: The category of agricultural information needed
             language: The language code for the agent (e.g., "hi-IN", "en-US")
@@ -65,7 +70,10 @@ class AgentFactory:
                 f"Warning: Unknown category '{category}', defaulting to CropScienceAgent"
             )
 
-        return agent_class(language=language, markdown=markdown)
+        cache = get_agent_cache()
+        if cache is None:
+            return agent_class(language=language, markdown=markdown)
+        return cache.get_or_create(agent_class, language, markdown)
 
     @classmethod
     def get_available_categories(cls) -> list:
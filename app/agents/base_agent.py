@@ -2,12 +2,21 @@ from typing import Optional, List
 from llama_index.core.agent import FunctionAgent
 from llama_index.core.tools import FunctionTool
 from app.core.llm import get_llm
-from app.agents.tools import build_vector_search_tool, build_web_search_tool
+from app.agents.tools import (
+    build_vector_batch_search_tool,
+    build_vector_search_tool,
+    build_web_search_tool,
+)
 
 
 class BaseAgent:
     """Base class for all specialized agricultural agents."""
 
+    # MMR diversification of knowledge base results; None uses the
+    # RETRIEVAL_MMR / MMR_LAMBDA settings
+    retrieval_mmr: Optional[bool] = None
+    mmr_lambda: Optional[float] = None
+
     def __init__(self, language: str = "en-US", markdown: bool = False):
         self.language = language
         self.markdown = markdown
@@ -17,7 +26,15 @@ class BaseAgent:
 
     def _build_tools(self) -> List[FunctionTool]:
         """Build the common tools that all agents use."""
-        return [build_vector_search_tool(), build_web_search_tool()]
+        return [
+            build_vector_search_tool(
+                diversify=self.retrieval_mmr, mmr_lambda=self.mmr_lambda
+            ),
+            build_vector_batch_search_tool(
+                diversify=self.retrieval_mmr, mmr_lambda=self.mmr_lambda
+            ),
+            build_web_search_tool(),
+        ]
 
     def _build_system_prompt(self) -> str:
         """Build the base system prompt with language instruction and markdown preference."""
@@ -31,9 +48,10 @@ class BaseAgent:
 
 {confidence_instruction}
 
-You have access to two tools:
+You have access to three tools:
 1. knowledge_base_search: Search the knowledge base for relevant agricultural information
-2. web_search: Search the web for current information, market prices, weather updates, and news
+2. knowledge_base_batch_search: Search the knowledge base for several queries at once; prefer it over repeated knowledge_base_search calls when a question has multiple parts
+3. web_search: Search the web for current information, market prices, weather updates, and news
 
 Always use these tools to provide accurate, up-to-date information. When using retrieved information, cite the sources.
 
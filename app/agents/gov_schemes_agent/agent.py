@@ -5,6 +5,10 @@ from app.agents.gov_schemes_agent.prompt import GOV_SCHEMES_PROMPT
 class GovSchemesAgent(BaseAgent):
     """Agent specialized in government agricultural schemes and subsidies."""
 
+    # Scheme circulars repeat the same eligibility boilerplate across
+    # documents, so results are diversified regardless of RETRIEVAL_MMR
+    retrieval_mmr = True
+
     def __init__(self, language: str = "en-US", markdown: bool = False):
         super().__init__(language=language, markdown=markdown)
         self.specialization = "government_schemes"
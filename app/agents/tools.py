@@ -3,16 +3,31 @@ import requests
 from typing import List, Dict, Any, Optional
 from llama_index.core.tools import FunctionTool
 from app.core.llm import get_embed_model
-from app.core.qdrant_client import search_similar
+from app.core.qdrant_client import search_similar, search_similar_batch
 from app.core.config import get_settings
+from app.utils.search_results import (
+    format_batch_search_results,
+    format_search_results,
+    format_web_results,
+)
 from tavily import TavilyClient
 
 
-def build_vector_search_tool(namespace: Optional[str] = None) -> FunctionTool:
+def build_vector_search_tool(
+    namespace: Optional[str] = None,
+    diversify: Optional[bool] = None,
+    mmr_lambda: Optional[float] = None,
+) -> FunctionTool:
     async def vector_search(query: str, top_k: int = 5) -> str:
         # Use direct Qdrant search
-        results = await search_similar(query, top_k=top_k, namespace=namespace)
-        return json.dumps(results)
+        results = await search_similar(
+            query,
+            top_k=top_k,
+            namespace=namespace,
+            diversify=diversify,
+            mmr_lambda=mmr_lambda,
+        )
+        return format_search_results(results)
 
     return FunctionTool.from_defaults(
         fn=vector_search,
@@ -21,6 +36,29 @@ def build_vector_search_tool(namespace: Optional[str] = None) -> FunctionTool:
     )
 
 
+def build_vector_batch_search_tool(
+    namespace: Optional[str] = None,
+    diversify: Optional[bool] = None,
+    mmr_lambda: Optional[float] = None,
+) -> FunctionTool:
+    async def vector_batch_search(queries: List[str], top_k: int = 5) -> str:
+        # One embedding batch and one Qdrant round trip for all sub-queries
+        results = await search_similar_batch(
+            queries,
+            top_k=top_k,
+            namespace=namespace,
+            diversify=diversify,
+            mmr_lambda=mmr_lambda,
+        )
+        return format_batch_search_results(queries, results)
+
+    return FunctionTool.from_defaults(
+        fn=vector_batch_search,
+        name="knowledge_base_batch_search",
+        description="Search the knowledge base for several related queries at once (for example the sub-questions of a complex question). Accepts a list of query strings and top_k; returns the results for each query.",
+    )
+
+
 def build_web_search_tool() -> FunctionTool:
     async def web_search(
         query: str, search_depth: str = "basic", max_results: int = 5
@@ -48,33 +86,11 @@ def build_web_search_tool() -> FunctionTool:
                 include_images=False,
             )
 
-            # Extract and format results
-            results = []
-
-            # Add answer if available
-            if search_result.get("answer"):
-                results.append(f"Answer: {search_result['answer']}")
-
-            # Add search results
-            if search_result.get("results"):
-                for i, result in enumerate(search_result["results"][:max_results], 1):
-                    title = result.get("title", "No title")
-                    content = result.get("content", "No content")
-                    url = result.get("url", "No URL")
-
-                    result_text = f"{i}. {title}\n   Content: {content[:200]}...\n   Source: {url}"
-                    results.append(result_text)
-
-            # Add source information
-            results.append(f"\nSearch performed using Tavily. Query: '{query}'")
-
-            return json.dumps(
-                {
-                    "results": results,
-                    "source": "tavily_web_search",
-                    "query": query,
-                    "total_results": len(results) - 1,  # Exclude the source info line
-                }
+            # Pack the answer and the pages into the tool result token budget
+            return format_web_results(
+                query,
+                search_result.get("answer"),
+                search_result.get("results", [])[:max_results],
             )
 
         except Exception as e:
@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from llama_index.core.llms import ChatMessage
+from app.agents.agent_cache import get_agent_cache
 from app.agents.agent_factory import AgentFactory
 
 router = APIRouter()
@@ -30,14 +31,15 @@ async def chat_stream(request: ChatRequest):
         StreamingResponse with the agent's response as plain text or markdown
     """
     try:
-        # Create the appropriate agent based on category, language, and markdown preference
+        # Get the (cached) agent for the category, language, and markdown preference
         agent = AgentFactory.create_agent(
             category=request.category,
             language=request.language,
             markdown=request.markdown,
         )
 
-        # Get the FunctionAgent from the specialized agent
+        # Get the FunctionAgent from the specialized agent; each run() gets
+        # its own context, so the shared agent keeps no per-request state
         function_agent = agent.get_agent()
 
         async def token_generator() -> AsyncGenerator[bytes, None]:
@@ -130,6 +132,15 @@ async def get_agent_categories():
     }
 
 
+@router.get("/agents/cache/stats")
+async def agent_cache_stats():
+    """Report agent cache size, hit rate and agent build time."""
+    cache = get_agent_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint for the chat service."""
@@ -3,56 +3,127 @@ import os
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import JSONResponse
-from app.core.qdrant_client import insert_documents, get_collection_stats
-from app.utils.chunking import chunk_text
-from app.utils.parsing import read_file_to_text
+from app.core.dedup_index import get_near_duplicate_index
+from app.core.embedding_cache import get_embedding_cache
+from app.core.ingest_jobs import IngestQueueFullError, get_ingest_job_manager
+from app.core.ingest_pipeline import run_ingest_pipeline
+from app.core.llm import get_embedding_scheduler
+from app.core.qdrant_client import get_collection_stats
+from app.core.retrieval_cache import get_retrieval_cache
+from app.utils.archives import ArchiveLimitError, check_archive_uploads
 
 router = APIRouter()
 
 
 @router.post("/ingest")
 async def ingest(
-    files: List[UploadFile] = File(...), namespace: Optional[str] = Form(None)
+    files: List[UploadFile] = File(...),
+    namespace: Optional[str] = Form(None),
+    incremental: bool = Form(False),
+    background: bool = Form(False),
 ):
     try:
-        all_texts = []
-        all_metadatas = []
-
-        for f in files:
-            text = read_file_to_text(f)
-            chunks = chunk_text(text)
-
-            for i, chunk in enumerate(chunks):
-                all_texts.append(chunk)
-
-                # Store all metadata in a single JSON field
-                metadata = {
-                    "source": f.filename,
-                    "chunk_id": i,
-                    "file_size": len(text),
-                    "chunk_size": len(chunk),
-                    "namespace": namespace,
-                    "total_chunks": len(chunks),
-                }
-                all_metadatas.append(metadata)
-
-        if not all_texts:
-            raise HTTPException(status_code=400, detail="No content to ingest")
+        # Reject oversized archives before any file of the request is ingested
+        await asyncio.to_thread(check_archive_uploads, files)
+
+        if background:
+            # Spool the files and hand them to the worker pool so large
+            # batches don't hold the request open until Qdrant is done
+            job = await get_ingest_job_manager().submit(
+                files, namespace=namespace, incremental=incremental
+            )
+            return JSONResponse(
+                {
+                    "status": "queued",
+                    "job_id": job.id,
+                    "status_url": f"/ingest/jobs/{job.id}",
+                    "files_queued": len(job.files),
+                },
+                status_code=202,
+            )
 
-        # Insert directly into Qdrant with simplified schema
-        await insert_documents(texts=all_texts, metadatas=all_metadatas)
+        # Parse, chunk, embed and upsert run as concurrent stages so points
+        # reach Qdrant while later files are still being parsed. In
+        # incremental mode chunks already stored under the same
+        # content-addressed ID are neither re-embedded nor re-upserted.
+        # Zip/tar uploads are streamed member by member.
+        stats = await run_ingest_pipeline(
+            files, namespace=namespace, incremental=incremental
+        )
+
+        if not (
+            stats.chunks_upserted or stats.chunks_unchanged or stats.chunks_suppressed
+        ):
+            raise HTTPException(status_code=400, detail="No content to ingest")
 
         # Verify insertion by getting collection stats
-        stats = await get_collection_stats()
+        collection_stats = await get_collection_stats()
 
         return JSONResponse(
             {
                 "status": "ok",
-                "ingested_chunks": len(all_texts),
-                "files_processed": len(files),
-                "collection_stats": stats,
+                "ingested_chunks": stats.chunks_upserted,
+                "unchanged_chunks": stats.chunks_unchanged,
+                "suppressed_chunks": stats.chunks_suppressed,
+                "skipped_pages": stats.skipped_pages,
+                "files_processed": stats.files_parsed,
+                "pipeline": stats.to_dict(),
+                "collection_stats": collection_stats,
             }
         )
 
+    except HTTPException:
+        raise
+    except IngestQueueFullError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "30"}
+        )
+    except ArchiveLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/ingest/jobs/{job_id}")
+async def ingest_job_status(job_id: str):
+    """Report progress and per-stage timings of a background ingest job.
+
+    Job state is kept by the process that accepted the job.
+    """
+    job = get_ingest_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingest job '{job_id}'")
+    return job.to_dict()
+
+
+@router.get("/embedding-cache/stats")
+async def embedding_cache_stats():
+    """Report embedding cache size and hit/miss counters."""
+    cache = get_embedding_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/retrieval-cache/stats")
+async def retrieval_cache_stats():
+    """Report retrieval cache size, exact/semantic hits and invalidations."""
+    cache = get_retrieval_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/dedup/stats")
+async def dedup_stats():
+    """Report near-duplicate index size and how many chunks it suppressed."""
+    index = get_near_duplicate_index()
+    if index is None:
+        return {"enabled": False}
+    return {"enabled": True, **index.stats()}
+
+
+@router.get("/embedding-scheduler/stats")
+async def embedding_scheduler_stats():
+    """Report embedding throughput, current concurrency and 429 count."""
+    return get_embedding_scheduler().stats()
@@ -1,33 +1,206 @@
 import os
+import tempfile
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @dataclass(frozen=True)
 class Settings:
     google_api_key: Optional[str]
     gemini_model: str
     embed_model_name: str
+    embed_batch_max_tokens: int
+    embed_batch_max_size: int
+    embed_min_concurrency: int
+    embed_max_concurrency: int
+    embed_target_latency: float
+    embed_max_retries: int
 
+    vector_backend: str
+    qdrant_local_path: str
+    vector_index_path: str
     qdrant_url: Optional[str]
     qdrant_api_key: Optional[str]
     qdrant_collection: str
+    qdrant_upsert_batch_size: int
+    qdrant_upsert_parallelism: int
+    qdrant_upsert_wait: bool
+    qdrant_upsert_retries: int
+    qdrant_prefer_grpc: bool
+    qdrant_http2: bool
+    qdrant_max_connections: int
+    qdrant_quantization: str
+    qdrant_vectors_on_disk: bool
+    qdrant_payload_on_disk: bool
+    qdrant_search_rescore: bool
+    qdrant_search_oversampling: float
+    qdrant_multitenancy: bool
+    qdrant_tenant_hnsw_m: int
+    qdrant_global_hnsw: bool
 
     tavily_api_key: Optional[str]
 
+    ingest_batch_size: int
+    ingest_queue_size: int
+    ingest_workers: int
+    ingest_max_queued_jobs: int
+    ingest_spool_dir: str
+    ingest_parse_workers: int
+    ingest_segment_chars: int
+    archive_max_members: int
+    archive_max_bytes: int
+    dedup_mode: str
+    dedup_threshold: float
+    dedup_num_perm: int
+    dedup_shingle_size: int
+    dedup_index_path: str
+
+    chunk_size: int
+    chunk_overlap: int
+    chunk_workers: int
+    chunk_parallel_threshold: int
+
+    pdf_workers: int
+    pdf_pages_per_task: int
+    pdf_page_timeout: float
+
+    embed_cache_enabled: bool
+    embed_cache_path: str
+    embed_cache_max_entries: int
+    retrieval_cache_enabled: bool
+    retrieval_cache_max_bytes: int
+    retrieval_cache_semantic_threshold: float
+    retrieval_cache_max_age: float
+    retrieval_cache_version_path: str
+    retrieval_cache_version_check: float
+    retrieval_mode: str
+    retrieval_payload_fields: Tuple[str, ...]
+    tool_result_format: str
+    tool_result_max_chars: int
+    tool_result_max_tokens: int
+    hybrid_prefetch_factor: int
+    retrieval_mmr: bool
+    mmr_lambda: float
+    mmr_fetch_factor: int
+    retrieval_merge_adjacent: bool
+    retrieval_window: int
+    agent_cache_enabled: bool
+    agent_cache_max_entries: int
+    sparse_avg_doc_tokens: float
+
     @staticmethod
     def load() -> "Settings":
         return Settings(
             google_api_key=os.getenv("GOOGLE_API_KEY"),
             gemini_model=os.getenv("GEMINI_MODEL", "gemini-2.0-flash"),
             embed_model_name=os.getenv("EMBED_MODEL_NAME", "text-embedding-004"),
+            embed_batch_max_tokens=int(os.getenv("EMBED_BATCH_MAX_TOKENS", "16000")),
+            embed_batch_max_size=int(os.getenv("EMBED_BATCH_MAX_SIZE", "100")),
+            embed_min_concurrency=int(os.getenv("EMBED_MIN_CONCURRENCY", "1")),
+            embed_max_concurrency=int(os.getenv("EMBED_MAX_CONCURRENCY", "8")),
+            embed_target_latency=float(os.getenv("EMBED_TARGET_LATENCY", "2.0")),
+            embed_max_retries=int(os.getenv("EMBED_MAX_RETRIES", "5")),
+            vector_backend=os.getenv("VECTOR_BACKEND", "qdrant").lower(),
+            qdrant_local_path=os.getenv("QDRANT_LOCAL_PATH", "volumes/qdrant_local"),
+            vector_index_path=os.getenv("VECTOR_INDEX_PATH", "volumes/vector_index"),
             qdrant_url=os.getenv("QDRANT_URL"),
             qdrant_api_key=os.getenv("QDRANT_API_KEY"),
             qdrant_collection="argisathi",
+            qdrant_upsert_batch_size=int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256")),
+            qdrant_upsert_parallelism=int(os.getenv("QDRANT_UPSERT_PARALLELISM", "4")),
+            qdrant_upsert_wait=_env_bool("QDRANT_UPSERT_WAIT", True),
+            qdrant_upsert_retries=int(os.getenv("QDRANT_UPSERT_RETRIES", "3")),
+            qdrant_prefer_grpc=_env_bool("QDRANT_PREFER_GRPC", False),
+            qdrant_http2=_env_bool("QDRANT_HTTP2", True),
+            qdrant_max_connections=int(os.getenv("QDRANT_MAX_CONNECTIONS", "64")),
+            qdrant_quantization=os.getenv("QDRANT_QUANTIZATION", "none").lower(),
+            qdrant_vectors_on_disk=_env_bool("QDRANT_VECTORS_ON_DISK", False),
+            qdrant_payload_on_disk=_env_bool("QDRANT_PAYLOAD_ON_DISK", False),
+            qdrant_search_rescore=_env_bool("QDRANT_SEARCH_RESCORE", True),
+            qdrant_search_oversampling=float(
+                os.getenv("QDRANT_SEARCH_OVERSAMPLING", "2.0")
+            ),
+            qdrant_multitenancy=_env_bool("QDRANT_MULTITENANCY", False),
+            qdrant_tenant_hnsw_m=int(os.getenv("QDRANT_TENANT_HNSW_M", "16")),
+            qdrant_global_hnsw=_env_bool("QDRANT_GLOBAL_HNSW", True),
             tavily_api_key=os.getenv("TAVILY_API_KEY"),
+            ingest_batch_size=int(os.getenv("INGEST_BATCH_SIZE", "64")),
+            ingest_queue_size=int(os.getenv("INGEST_QUEUE_SIZE", "4")),
+            ingest_workers=int(os.getenv("INGEST_WORKERS", "2")),
+            ingest_max_queued_jobs=int(os.getenv("INGEST_MAX_QUEUED_JOBS", "32")),
+            ingest_spool_dir=os.getenv(
+                "INGEST_SPOOL_DIR",
+                os.path.join(tempfile.gettempdir(), "agrisaarthi-ingest"),
+            ),
+            ingest_parse_workers=int(os.getenv("INGEST_PARSE_WORKERS", "4")),
+            ingest_segment_chars=int(os.getenv("INGEST_SEGMENT_CHARS", "200000")),
+            archive_max_members=int(os.getenv("ARCHIVE_MAX_MEMBERS", "10000")),
+            archive_max_bytes=int(os.getenv("ARCHIVE_MAX_BYTES", str(2 * 1024**3))),
+            dedup_mode=os.getenv("DEDUP_MODE", "skip").lower(),
+            dedup_threshold=float(os.getenv("DEDUP_THRESHOLD", "0.9")),
+            dedup_num_perm=int(os.getenv("DEDUP_NUM_PERM", "128")),
+            dedup_shingle_size=int(os.getenv("DEDUP_SHINGLE_SIZE", "5")),
+            dedup_index_path=os.getenv(
+                "DEDUP_INDEX_PATH", "volumes/dedup_index.sqlite3"
+            ),
+            chunk_size=int(os.getenv("CHUNK_SIZE", "800")),
+            chunk_overlap=int(os.getenv("CHUNK_OVERLAP", "120")),
+            chunk_workers=int(os.getenv("CHUNK_WORKERS", "2")),
+            chunk_parallel_threshold=int(
+                os.getenv("CHUNK_PARALLEL_THRESHOLD", "2000000")
+            ),
+            pdf_workers=int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1)))),
+            pdf_pages_per_task=int(os.getenv("PDF_PAGES_PER_TASK", "16")),
+            pdf_page_timeout=float(os.getenv("PDF_PAGE_TIMEOUT", "10")),
+            embed_cache_enabled=_env_bool("EMBED_CACHE_ENABLED", True),
+            embed_cache_path=os.getenv(
+                "EMBED_CACHE_PATH", "volumes/embedding_cache.sqlite3"
+            ),
+            embed_cache_max_entries=int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "200000")),
+            retrieval_cache_enabled=_env_bool("RETRIEVAL_CACHE_ENABLED", True),
+            retrieval_cache_max_bytes=int(
+                os.getenv("RETRIEVAL_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+            ),
+            retrieval_cache_semantic_threshold=float(
+                os.getenv("RETRIEVAL_CACHE_SEMANTIC_THRESHOLD", "0.95")
+            ),
+            retrieval_cache_max_age=float(os.getenv("RETRIEVAL_CACHE_MAX_AGE", "300")),
+            retrieval_cache_version_path=os.getenv(
+                "RETRIEVAL_CACHE_VERSION_PATH", "volumes/collection_version"
+            ),
+            retrieval_cache_version_check=float(
+                os.getenv("RETRIEVAL_CACHE_VERSION_CHECK_SECONDS", "1")
+            ),
+            retrieval_mode=os.getenv("RETRIEVAL_MODE", "hybrid").lower(),
+            retrieval_payload_fields=tuple(
+                field.strip()
+                for field in os.getenv(
+                    "RETRIEVAL_PAYLOAD_FIELDS", "source,chunk_id"
+                ).split(",")
+                if field.strip()
+            ),
+            tool_result_format=os.getenv("TOOL_RESULT_FORMAT", "compact").lower(),
+            tool_result_max_chars=int(os.getenv("TOOL_RESULT_MAX_CHARS", "0")),
+            tool_result_max_tokens=int(os.getenv("TOOL_RESULT_MAX_TOKENS", "1500")),
+            hybrid_prefetch_factor=int(os.getenv("HYBRID_PREFETCH_FACTOR", "4")),
+            retrieval_mmr=_env_bool("RETRIEVAL_MMR", False),
+            mmr_lambda=float(os.getenv("MMR_LAMBDA", "0.5")),
+            mmr_fetch_factor=int(os.getenv("MMR_FETCH_FACTOR", "4")),
+            retrieval_merge_adjacent=_env_bool("RETRIEVAL_MERGE_ADJACENT", True),
+            retrieval_window=int(os.getenv("RETRIEVAL_WINDOW", "0")),
+            agent_cache_enabled=_env_bool("AGENT_CACHE_ENABLED", True),
+            agent_cache_max_entries=int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "256")),
+            sparse_avg_doc_tokens=float(os.getenv("SPARSE_AVG_DOC_TOKENS", "130")),
         )
 
 
@@ -0,0 +1,309 @@
+import os
+import sqlite3
+import threading
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+import numpy as np
+from app.core.config import get_settings
+from app.utils.dedup import band_keys, estimate_similarity, lsh_bands, minhash
+
+_dedup_index: Optional["NearDuplicateIndex"] = None
+
+DEDUP_MODES = ("off", "skip", "link")
+
+_CREATE_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS signatures (
+        namespace TEXT NOT NULL,
+        point_id TEXT NOT NULL,
+        signature BLOB NOT NULL,
+        PRIMARY KEY (namespace, point_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS buckets (
+        namespace TEXT NOT NULL,
+        bucket BLOB NOT NULL,
+        point_id TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_buckets ON buckets (namespace, bucket)",
+    """
+    CREATE TABLE IF NOT EXISTS links (
+        namespace TEXT NOT NULL,
+        point_id TEXT NOT NULL,
+        canonical_id TEXT NOT NULL,
+        source TEXT,
+        chunk_id INTEGER,
+        PRIMARY KEY (namespace, point_id)
+    )
+    """,
+)
+
+
+class NearDuplicateIndex:
+    """
+    On-disk MinHash/LSH index of stored chunks, partitioned by namespace.
+
+    Every stored chunk keeps its signature plus one bucket row per LSH band.
+    A new chunk's candidates are the chunks sharing any bucket with it; they
+    count as near-duplicates once their estimated Jaccard similarity over
+    word shingles reaches `threshold`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        mode: str = "skip",
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.mode = mode
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        self.suppressed = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _CREATE_TABLES:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def signature(self, text: str) -> np.ndarray:
+        return minhash(text, self.num_perm, self.shingle_size)
+
+    def keys(self, signature: np.ndarray) -> List[bytes]:
+        return band_keys(signature, self.bands, self.rows)
+
+    def candidates(self, namespace: str, keys: Sequence[bytes]) -> Dict[str, bytes]:
+        """Return {point_id: signature} for stored chunks sharing a bucket"""
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT s.point_id, s.signature FROM signatures s "
+                f"JOIN (SELECT DISTINCT point_id FROM buckets "
+                f"WHERE namespace = ? AND bucket IN ({placeholders})) b "
+                f"ON s.point_id = b.point_id WHERE s.namespace = ?",
+                [namespace, *keys, namespace],
+            ).fetchall()
+        return dict(rows)
+
+    def add(self, namespace: str, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        """Index signatures of chunks that are now stored"""
+        with self._lock:
+            for point_id, signature in items:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO signatures "
+                    "(namespace, point_id, signature) VALUES (?, ?, ?)",
+                    (namespace, point_id, signature.tobytes()),
+                )
+                if cursor.rowcount:
+                    self._conn.executemany(
+                        "INSERT INTO buckets (namespace, bucket, point_id) "
+                        "VALUES (?, ?, ?)",
+                        [(namespace, key, point_id) for key in self.keys(signature)],
+                    )
+            self._conn.commit()
+
+    def remove(self, point_ids: Iterable[str]) -> None:
+        """Forget deleted chunks, along with the links made to them"""
+        point_ids = list(point_ids)
+        with self._lock:
+            for start in range(0, len(point_ids), 500):
+                batch = point_ids[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for table, column in (
+                    ("signatures", "point_id"),
+                    ("buckets", "point_id"),
+                    ("links", "point_id"),
+                    ("links", "canonical_id"),
+                ):
+                    self._conn.execute(
+                        f"DELETE FROM {table} WHERE {column} IN ({placeholders})",
+                        batch,
+                    )
+            self._conn.commit()
+
+    def link(self, namespace: str, rows: Iterable[Tuple[str, str, str, int]]) -> None:
+        """Record (point_id, canonical_id, source, chunk_id) for suppressed chunks"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO links "
+                "(namespace, point_id, canonical_id, source, chunk_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(namespace, *row) for row in rows],
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Forget every signature and link, e.g. when the collection is dropped"""
+        with self._lock:
+            for table in ("signatures", "buckets", "links"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()
+            links = self._conn.execute("SELECT COUNT(*) FROM links").fetchone()
+        return {
+            "path": self.path,
+            "mode": self.mode,
+            "threshold": self.threshold,
+            "bands": self.bands,
+            "rows": self.rows,
+            "entries": entries[0],
+            "links": links[0],
+            "suppressed": self.suppressed,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class NearDuplicateFilter:
+    """
+    One ingest run's view of the index.
+
+    Chunks that pass the check are staged in memory, so later chunks in the
+    same run are compared against them too, and are only written to the
+    index by commit() once they have actually been upserted.
+    """
+
+    def __init__(self, index: NearDuplicateIndex):
+        self.index = index
+        self._lock = threading.Lock()
+        self._staged: Dict[str, Tuple[str, np.ndarray]] = {}
+        self._staged_buckets: Dict[Tuple[str, bytes], Set[str]] = {}
+
+    def check(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        ignore: Collection[str] = (),
+    ) -> List[Optional[str]]:
+        """Return the canonical point ID for each near-duplicate, else None
+
+        Stored chunks in ignore (those a re-ingested revision supersedes)
+        are not candidates.
+        """
+        results: List[Optional[str]] = []
+        links: Dict[str, List[Tuple[str, str, str, int]]] = {}
+
+        for point_id, text, metadata in zip(ids, texts, metadatas):
+            namespace = metadata.get("namespace") or ""
+            signature = self.index.signature(text)
+            keys = self.index.keys(signature)
+
+            with self._lock:
+                candidates = {
+                    candidate: self._staged[candidate][1]
+                    for key in keys
+                    for candidate in self._staged_buckets.get((namespace, key), ())
+                }
+            for candidate, blob in self.index.candidates(namespace, keys).items():
+                candidates.setdefault(candidate, np.frombuffer(blob, dtype=np.uint32))
+            # Re-ingesting the same chunk is an overwrite, not a duplicate
+            candidates.pop(point_id, None)
+            if ignore:
+                candidates = {
+                    candidate: other
+                    for candidate, other in candidates.items()
+                    if candidate not in ignore
+                }
+
+            canonical, best = None, self.index.threshold
+            for candidate, other in candidates.items():
+                similarity = estimate_similarity(signature, other)
+                if similarity >= best:
+                    canonical, best = candidate, similarity
+
+            results.append(canonical)
+            if canonical is not None:
+                links.setdefault(namespace, []).append(
+                    (
+                        point_id,
+                        canonical,
+                        metadata.get("source"),
+                        metadata.get("chunk_id"),
+                    )
+                )
+                continue
+            with self._lock:
+                self._staged[point_id] = (namespace, signature)
+                for key in keys:
+                    self._staged_buckets.setdefault((namespace, key), set()).add(
+                        point_id
+                    )
+
+        self.index.suppressed += sum(1 for canonical in results if canonical)
+        if self.index.mode == "link":
+            for namespace, rows in links.items():
+                self.index.link(namespace, rows)
+        return results
+
+    def commit(self, ids: Iterable[str]) -> None:
+        """Move staged signatures of upserted chunks into the on-disk index"""
+        by_namespace: Dict[str, List[Tuple[str, np.ndarray]]] = {}
+        with self._lock:
+            for point_id in ids:
+                staged = self._staged.pop(point_id, None)
+                if staged is None:
+                    continue
+                namespace, signature = staged
+                by_namespace.setdefault(namespace, []).append((point_id, signature))
+                for key in self.index.keys(signature):
+                    bucket = self._staged_buckets.get((namespace, key))
+                    if bucket is not None:
+                        bucket.discard(point_id)
+        for namespace, items in by_namespace.items():
+            self.index.add(namespace, items)
+
+
+def get_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    """Return the process-wide near-duplicate index, or None when it is off"""
+    global _dedup_index
+    settings = get_settings()
+    if settings.dedup_mode == "off":
+        return None
+    if settings.dedup_mode not in DEDUP_MODES:
+        raise ValueError(
+            f"DEDUP_MODE must be one of {', '.join(DEDUP_MODES)}, "
+            f"got '{settings.dedup_mode}'"
+        )
+    if _dedup_index is None:
+        _dedup_index = NearDuplicateIndex(
+            path=settings.dedup_index_path,
+            threshold=settings.dedup_threshold,
+            num_perm=settings.dedup_num_perm,
+            shingle_size=settings.dedup_shingle_size,
+            mode=settings.dedup_mode,
+        )
+    return _dedup_index
+
+
+def get_near_duplicate_filter() -> Optional[NearDuplicateFilter]:
+    """Start a per-run near-duplicate filter, or None when dedup is off"""
+    index = get_near_duplicate_index()
+    return NearDuplicateFilter(index) if index is not None else None
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from fastapi import UploadFile
+from app.core.config import get_settings
+from app.core.ingest_pipeline import IngestPipeline, IngestStats
+
+# Finished jobs kept around for status polling before the oldest are dropped
+_MAX_FINISHED_JOBS = 500
+
+_job_manager: Optional["IngestJobManager"] = None
+
+
+class IngestQueueFullError(RuntimeError):
+    """Raised when INGEST_MAX_QUEUED_JOBS jobs are already waiting"""
+
+
+@dataclass
+class IngestJob:
+    """A background ingest request and its live progress"""
+
+    id: str
+    spool_dir: str
+    files: List[Tuple[str, str]]
+    namespace: Optional[str] = None
+    incremental: bool = False
+    status: str = "queued"
+    error: Optional[str] = None
+    stats: IngestStats = field(default_factory=IngestStats)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "namespace": self.namespace,
+            "incremental": self.incremental,
+            "files": [filename for filename, _ in self.files],
+            "error": self.error,
+            "progress": self.stats.to_dict(),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _spool_uploads(
+    files: Sequence[UploadFile], spool_root: str
+) -> Tuple[str, List[Tuple[str, str]]]:
+    """Copy uploads to a private directory so they outlive the request"""
+    os.makedirs(spool_root, exist_ok=True)
+    spool_dir = tempfile.mkdtemp(prefix="job-", dir=spool_root)
+
+    spooled = []
+    for i, upload in enumerate(files):
+        filename = upload.filename or f"upload-{i}"
+        path = os.path.join(spool_dir, f"{i:05d}-{os.path.basename(filename)}")
+        upload.file.seek(0)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(upload.file, out, length=1024 * 1024)
+        spooled.append((filename, path))
+    return spool_dir, spooled
+
+
+def _open_spooled(
+    stack: ExitStack, files: Sequence[Tuple[str, str]]
+) -> List[UploadFile]:
+    """Open spooled files as uploads; the stack closes them"""
+    return [
+        UploadFile(file=stack.enter_context(open(path, "rb")), filename=filename)
+        for filename, path in files
+    ]
+
+
+class IngestJobManager:
+    """
+    Runs spooled ingest jobs on a fixed number of worker tasks.
+
+    Jobs wait on an asyncio.Queue, so at most `workers` pipelines run at the
+    same time no matter how many uploads arrive. Once `max_queued` jobs are
+    waiting, submit() refuses new ones with IngestQueueFullError instead of
+    spooling them.
+
+    Jobs and their status live in this process only: with several uvicorn
+    workers or replicas, GET /ingest/jobs/{id} must reach the process that
+    accepted the job (e.g. sticky routing), or it answers 404.
+    """
+
+    def __init__(self, workers: int, spool_root: str, max_queued: int = 32):
+        self.workers = max(1, workers)
+        self.spool_root = spool_root
+        self.max_queued = max(1, max_queued)
+        self.jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Jobs admitted but not yet picked up by a worker, spooling included
+        self._waiting = 0
+
+    def _ensure_workers(self) -> None:
+        # Workers are created lazily so they bind to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def submit(
+        self,
+        files: Sequence[UploadFile],
+        namespace: Optional[str] = None,
+        incremental: bool = False,
+    ) -> IngestJob:
+        """Spool the uploads to disk and queue them for background ingest"""
+        if self._waiting >= self.max_queued:
+            raise IngestQueueFullError(
+                f"{self._waiting} ingest jobs are already waiting; retry later"
+            )
+        self._waiting += 1
+        try:
+            spool_dir, spooled = await asyncio.to_thread(
+                _spool_uploads, files, self.spool_root
+            )
+        except BaseException:
+            self._waiting -= 1
+            raise
+        job = IngestJob(
+            id=uuid.uuid4().hex,
+            spool_dir=spool_dir,
+            files=spooled,
+            namespace=namespace,
+            incremental=incremental,
+        )
+        job.stats.files_total = len(spooled)
+        self.jobs[job.id] = job
+        self._prune()
+
+        self._ensure_workers()
+        await self._queue.put(job)
+        print(f"Queued ingest job {job.id} with {len(spooled)} files")
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        return self.jobs.get(job_id)
+
+    def _prune(self) -> None:
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status in ("completed", "failed")
+        ]
+        for job_id in finished[: max(0, len(finished) - _MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._waiting -= 1
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: IngestJob) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        status = "failed"
+        try:
+            with ExitStack() as stack:
+                uploads = await asyncio.to_thread(_open_spooled, stack, job.files)
+                pipeline = IngestPipeline(
+                    namespace=job.namespace,
+                    stats=job.stats,
+                    incremental=job.incremental,
+                )
+                await pipeline.run(uploads)
+            status = "completed"
+        except Exception as e:
+            job.error = str(e)
+            print(f"Ingest job {job.id} failed: {e}")
+        finally:
+            await asyncio.to_thread(shutil.rmtree, job.spool_dir, ignore_errors=True)
+            # Finished jobs are reported only once their spool is gone
+            job.finished_at = time.time()
+            job.status = status
+
+
+def get_ingest_job_manager() -> IngestJobManager:
+    global _job_manager
+    if _job_manager is None:
+        settings = get_settings()
+        _job_manager = IngestJobManager(
+            workers=settings.ingest_workers,
+            spool_root=settings.ingest_spool_dir,
+            max_queued=settings.ingest_max_queued_jobs,
+        )
+    return _job_manager
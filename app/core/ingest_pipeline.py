@@ -0,0 +1,403 @@
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from fastapi import UploadFile
+from app.core.config import get_settings
+from app.core.dedup_index import get_near_duplicate_filter
+from app.core.llm import embed_texts
+from app.core.qdrant_client import DocumentRevisions, point_ids_for, upsert_chunks
+from app.utils.archives import is_archive, iter_archive_uploads
+from app.utils.chunking import TextChunk, chunk_texts
+from app.utils.parsing import is_supported_file, iter_text_segments
+
+# Marks the end of a stage's output on its queue
+_DONE = object()
+
+STAGES = ("parse", "chunk", "embed", "upsert")
+
+
+@dataclass
+class IngestStats:
+    """Live progress counters for one pipeline run"""
+
+    files_total: int = 0
+    files_parsed: int = 0
+    chunks_parsed: int = 0
+    chunks_embedded: int = 0
+    chunks_upserted: int = 0
+    chunks_unchanged: int = 0
+    chunks_suppressed: int = 0
+    chunks_deleted: int = 0
+    # PDF pages (1-based) whose extraction timed out, by file
+    skipped_pages: Dict[str, List[int]] = field(default_factory=dict)
+    # Files that could not be parsed, with the error (see on_file_failed)
+    failed_files: Dict[str, str] = field(default_factory=dict)
+    stage_seconds: Dict[str, float] = field(
+        default_factory=lambda: {stage: 0.0 for stage in STAGES}
+    )
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        self.stage_seconds[stage] += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files_total": self.files_total,
+            "files_parsed": self.files_parsed,
+            "chunks_parsed": self.chunks_parsed,
+            "chunks_embedded": self.chunks_embedded,
+            "chunks_upserted": self.chunks_upserted,
+            "chunks_unchanged": self.chunks_unchanged,
+            "chunks_suppressed": self.chunks_suppressed,
+            "chunks_deleted": self.chunks_deleted,
+            "skipped_pages": self.skipped_pages,
+            "failed_files": self.failed_files,
+            "stage_seconds": {k: round(v, 4) for k, v in self.stage_seconds.items()},
+        }
+
+
+class IngestPipeline:
+    """
+    Streams uploads through parse -> chunk -> embed -> upsert.
+
+    Each stage runs as its own task and hands work to the next one over a
+    bounded asyncio.Queue, so a slow stage applies backpressure upstream and
+    only a few files/batches are ever held in memory at once.
+
+    With incremental=True the embed stage first looks up the points stored
+    for the batch's sources and drops chunks whose content-addressed ID is
+    among them, refreshing their chunk_id/total_chunks if they moved. Once a
+    file is complete, its stored chunks that the new revision no longer
+    contains are deleted. Unless DEDUP_MODE=off, near-duplicates of stored
+    chunks (MinHash/LSH) are then suppressed as well.
+
+    Files may be a lazy iterable; `parse_workers` files are parsed at once
+    and `on_file_done(filename, chunks)` fires once every chunk of a file has
+    been upserted or skipped (and its superseded chunks deleted), which
+    callers use for checkpointing. Without `on_file_failed` a file that
+    cannot be parsed stops the run; with it, the file is reported there and
+    in stats.failed_files, and the run carries on with the others.
+
+    Parsed text reaches the chunk stage in groups of pages or blocks
+    (INGEST_SEGMENT_CHARS), so a long document is chunked while its later
+    pages are still being parsed. Its chunks move on to embedding once the
+    whole file is chunked, as each one records the file's total_chunks.
+
+    Zip/tar uploads are expanded in place: their members stream through the
+    parse workers like separately uploaded files, named '<archive>/<member>'.
+    Members without a supported extension (SUPPORTED_EXTENSIONS) are skipped.
+    """
+
+    def __init__(
+        self,
+        namespace: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        stats: Optional[IngestStats] = None,
+        incremental: bool = False,
+        parse_workers: Optional[int] = None,
+        close_files: bool = False,
+        on_file_done: Optional[Callable[[str, int], None]] = None,
+        on_file_failed: Optional[Callable[[str, Exception], None]] = None,
+    ):
+        settings = get_settings()
+        self.namespace = namespace
+        self.batch_size = batch_size or settings.ingest_batch_size
+        self.queue_size = queue_size or settings.ingest_queue_size
+        self.stats = stats or IngestStats()
+        self.incremental = incremental
+        self.parse_workers = max(1, parse_workers or settings.ingest_parse_workers)
+        self.close_files = close_files
+        self.on_file_done = on_file_done
+        self.on_file_failed = on_file_failed
+        # Chunks per source still waiting to be upserted or skipped
+        self._pending: Dict[str, int] = {}
+        # Archive members opened by the pipeline, which it must close itself
+        self._members: Set[UploadFile] = set()
+        self.revisions = DocumentRevisions() if incremental else None
+        self.dedup = get_near_duplicate_filter()
+
+    async def run(self, files: Iterable[UploadFile]) -> IngestStats:
+        """Run all stages concurrently until every file has been upserted"""
+        if hasattr(files, "__len__"):
+            self.stats.files_total = len(files)
+
+        parsed_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        chunk_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        embed_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        tasks = [
+            asyncio.create_task(self._parse_stage(files, parsed_q)),
+            asyncio.create_task(self._chunk_stage(parsed_q, chunk_q)),
+            asyncio.create_task(self._embed_stage(chunk_q, embed_q)),
+            asyncio.create_task(self._upsert_stage(embed_q)),
+        ]
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # A failed stage would leave its neighbours blocked on a full or
+            # empty queue, so tear the whole pipeline down
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        print(f"Ingest pipeline finished: {self.stats.to_dict()}")
+        return self.stats
+
+    def _expand_archives(self, files: Iterable[UploadFile]) -> Iterator[UploadFile]:
+        # Sized inputs were counted up front; lazy ones are counted as drawn
+        counted = hasattr(files, "__len__")
+        for f in files:
+            if not is_archive(f.filename):
+                if not counted:
+                    self.stats.files_total += 1
+                yield f
+                continue
+            # The archive itself is replaced by its members in the totals
+            if counted:
+                self.stats.files_total -= 1
+            # Images, office documents and nested archives would be read as
+            # text, so only members the parser handles are ingested
+            members = iter_archive_uploads(f.file, f.filename, is_supported_file)
+            for member in members:
+                self.stats.files_total += 1
+                self._members.add(member)
+                yield member
+
+    async def _settle(self, metadatas: List[Dict[str, Any]]) -> None:
+        """Mark chunks as finished and complete files that have no more"""
+        for metadata in metadatas:
+            source = metadata["source"]
+            self._pending[source] -= 1
+            if self._pending[source] == 0:
+                del self._pending[source]
+                if self.revisions is not None:
+                    self.stats.chunks_deleted += await self.revisions.retire(
+                        self.namespace, source
+                    )
+                if self.on_file_done is not None:
+                    self.on_file_done(source, metadata["total_chunks"])
+
+    async def _keep(self, keep: List[int], ids, texts, metadatas):
+        """Filter a batch down to the `keep` indices, settling the rest"""
+        kept = set(keep)
+        await self._settle([m for i, m in enumerate(metadatas) if i not in kept])
+        return (
+            [ids[i] for i in keep],
+            [texts[i] for i in keep],
+            [metadatas[i] for i in keep],
+        )
+
+    async def _parse_stage(
+        self, files: Iterable[UploadFile], out_q: asyncio.Queue
+    ) -> None:
+        iterator = self._expand_archives(files)
+        lock = asyncio.Lock()
+        # Tells apart files that share a name while their segments interleave
+        keys = itertools.count()
+
+        async def worker() -> None:
+            while True:
+                # Lazy iterables may open files or copy archive members, so
+                # advance them off the loop - one worker at a time
+                async with lock:
+                    f = await asyncio.to_thread(next, iterator, None)
+                if f is None:
+                    return
+
+                key = next(keys)
+                skipped: List[int] = []
+                segments = iter_text_segments(f, skipped)
+                try:
+                    # Hand each group of pages on as soon as it is parsed
+                    while True:
+                        t0 = time.perf_counter()
+                        segment = await asyncio.to_thread(next, segments, None)
+                        self.stats.add_time("parse", time.perf_counter() - t0)
+                        if segment is None:
+                            break
+                        await out_q.put((key, f.filename, segment, False))
+                except Exception as e:
+                    if self.on_file_failed is None:
+                        raise
+                    print(f"Failed to parse {f.filename}: {e}")
+                    self.stats.failed_files[f.filename] = str(e)
+                    self.on_file_failed(f.filename, e)
+                    # Drops the segments already handed to the chunk stage
+                    await out_q.put((key, f.filename, None, True))
+                    continue
+                finally:
+                    if self.close_files or f in self._members:
+                        self._members.discard(f)
+                        f.file.close()
+                self.stats.files_parsed += 1
+                if skipped:
+                    self.stats.skipped_pages[f.filename] = skipped
+                await out_q.put((key, f.filename, "", True))
+
+        await asyncio.gather(*(worker() for _ in range(self.parse_workers)))
+        await out_q.put(_DONE)
+
+    async def _chunk_stage(self, in_q: asyncio.Queue, out_q: asyncio.Queue) -> None:
+        texts: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        # Per file still being parsed: the text after its last complete
+        # chunk, the complete chunks so far and the characters parsed
+        partial: Dict[int, Tuple[str, List[TextChunk], int]] = {}
+        done = False
+
+        while not done:
+            # Chunk every parsed segment that is already waiting in one call
+            items = [await in_q.get()]
+            while not in_q.empty():
+                items.append(in_q.get_nowait())
+            if items[-1] is _DONE:
+                items.pop()
+                done = True
+            if not items:
+                continue
+
+            # A file's segments arrive in order, so waiting ones are joined
+            segments: Dict[int, List[Any]] = {}
+            for key, filename, segment, last in items:
+                if segment is None:
+                    # The file failed to parse part way through
+                    segments.pop(key, None)
+                    partial.pop(key, None)
+                    continue
+                entry = segments.setdefault(key, [filename, "", False])
+                entry[1] += segment
+                entry[2] = entry[2] or last
+            if not segments:
+                continue
+            documents = []
+            for key, (filename, segment, last) in segments.items():
+                carry, chunks, size = partial.pop(key, ("", [], 0))
+                size += len(segment)
+                documents.append((key, filename, carry + segment, chunks, size, last))
+
+            t0 = time.perf_counter()
+            chunked = await asyncio.to_thread(
+                chunk_texts, [document[2] for document in documents]
+            )
+            self.stats.add_time("chunk", time.perf_counter() - t0)
+
+            for (key, filename, text, chunks, size, last), new in zip(
+                documents, chunked
+            ):
+                if not last:
+                    # The last chunk may still grow with the next segment, so
+                    # its text is chunked again together with that segment
+                    if len(new) > 1:
+                        chunks.extend(new[:-1])
+                        text = new[-1].text
+                    partial[key] = (text, chunks, size)
+                    continue
+
+                chunks.extend(new)
+                self.stats.chunks_parsed += len(chunks)
+                if not chunks:
+                    if self.on_file_done is not None:
+                        self.on_file_done(filename, 0)
+                    continue
+                pending = self._pending.get(filename, 0)
+                self._pending[filename] = pending + len(chunks)
+
+                for i, chunk in enumerate(chunks):
+                    texts.append(chunk.text)
+                    metadatas.append(
+                        {
+                            "source": filename,
+                            "chunk_id": i,
+                            "file_size": size,
+                            "chunk_size": len(chunk.text),
+                            "token_count": chunk.token_count,
+                            "namespace": self.namespace,
+                            "total_chunks": len(chunks),
+                        }
+                    )
+                    if len(texts) >= self.batch_size:
+                        await out_q.put((texts, metadatas))
+                        texts, metadatas = [], []
+
+        if texts:
+            await out_q.put((texts, metadatas))
+        await out_q.put(_DONE)
+
+    async def _embed_stage(self, in_q: asyncio.Queue, out_q: asyncio.Queue) -> None:
+        while True:
+            item = await in_q.get()
+            if item is _DONE:
+                break
+            texts, metadatas = item
+            ids = point_ids_for(texts, metadatas)
+
+            t0 = time.perf_counter()
+            if self.revisions is not None:
+                await self.revisions.load(metadatas)
+                existing = await self.revisions.unchanged(ids, metadatas)
+                keep = [i for i, point_id in enumerate(ids) if point_id not in existing]
+                self.stats.chunks_unchanged += len(ids) - len(keep)
+                ids, texts, metadatas = await self._keep(keep, ids, texts, metadatas)
+            if self.dedup is not None and texts:
+                ignore = (
+                    self.revisions.superseded(metadatas)
+                    if self.revisions is not None
+                    else set()
+                )
+                canonical = await asyncio.to_thread(
+                    self.dedup.check, ids, texts, metadatas, ignore
+                )
+                keep = [i for i, point_id in enumerate(canonical) if point_id is None]
+                self.stats.chunks_suppressed += len(ids) - len(keep)
+                ids, texts, metadatas = await self._keep(keep, ids, texts, metadatas)
+            if not texts:
+                self.stats.add_time("embed", time.perf_counter() - t0)
+                continue
+
+            embeddings = await embed_texts(
+                texts, [metadata.get("token_count") for metadata in metadatas]
+            )
+            self.stats.add_time("embed", time.perf_counter() - t0)
+            self.stats.chunks_embedded += len(texts)
+
+            await out_q.put((ids, texts, metadatas, embeddings))
+        await out_q.put(_DONE)
+
+    async def _upsert_stage(self, in_q: asyncio.Queue) -> None:
+        while True:
+            item = await in_q.get()
+            if item is _DONE:
+                break
+            ids, texts, metadatas, embeddings = item
+
+            t0 = time.perf_counter()
+            report = await upsert_chunks(texts, metadatas, embeddings, ids=ids)
+            self.stats.add_time("upsert", time.perf_counter() - t0)
+            self.stats.chunks_upserted += report.points
+            if self.dedup is not None:
+                await asyncio.to_thread(self.dedup.commit, ids)
+            await self._settle(metadatas)
+
+
+async def run_ingest_pipeline(
+    files: Iterable[UploadFile],
+    namespace: Optional[str] = None,
+    incremental: bool = False,
+) -> IngestStats:
+    """Ingest uploaded files through the staged pipeline"""
+    pipeline = IngestPipeline(namespace=namespace, incremental=incremental)
+    return await pipeline.run(files)
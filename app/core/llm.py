@@ -1,11 +1,18 @@
+import asyncio
 import os
-from typing import Optional
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Sequence
 from app.core.config import get_settings
+from app.core.embedding_cache import get_embedding_cache
+from app.utils.chunking import estimate_tokens
 from llama_index.llms.google_genai import GoogleGenAI
 from llama_index.embeddings.google_genai import GoogleGenAIEmbedding
 
 _llm: Optional[GoogleGenAI] = None
 _embed_model: Optional[GoogleGenAIEmbedding] = None
+_embedding_scheduler: Optional["EmbeddingScheduler"] = None
 
 
 def get_llm() -> GoogleGenAI:
@@ -24,7 +31,14 @@ def get_embed_model() -> GoogleGenAIEmbedding:
         settings = get_settings()
         if settings.google_api_key:
             os.environ.setdefault("GOOGLE_API_KEY", settings.google_api_key)
-        _embed_model = GoogleGenAIEmbedding(model_name=settings.embed_model_name)
+        kwargs = {"embed_batch_size": settings.embed_batch_max_size}
+        if "retries" in GoogleGenAIEmbedding.model_fields:
+            # Let 429s reach the embedding scheduler instead of being
+            # retried blindly inside the client
+            kwargs["retries"] = 0
+        _embed_model = GoogleGenAIEmbedding(
+            model_name=settings.embed_model_name, **kwargs
+        )
     return _embed_model
 
 
@@ -34,3 +48,211 @@ def get_embedding_dimension() -> int:
     # Google GenAI embeddings typically have 768 dimensions
     # This is a fallback if the model doesn't expose embed_dim
     return getattr(embed_model, "embed_dim", 768)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    if getattr(error, "code", None) == 429:
+        return True
+    message = str(error)
+    return "429" in message or "RESOURCE_EXHAUSTED" in message
+
+
+class EmbeddingScheduler:
+    """
+    Packs texts into token-bounded batches and embeds them concurrently.
+
+    Concurrency adapts AIMD-style: a 429 halves the number of batches in
+    flight, a batch slower than twice the target latency removes one slot,
+    and a full window of fast batches adds one back, always within
+    [min_concurrency, max_concurrency].
+    """
+
+    def __init__(
+        self,
+        max_batch_tokens: int,
+        max_batch_size: int,
+        min_concurrency: int,
+        max_concurrency: int,
+        target_latency: float,
+        max_retries: int,
+    ):
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.concurrency = max(self.min_concurrency, self.max_concurrency // 2)
+
+        self.texts = 0
+        self.batches = 0
+        self.throttled = 0
+        self.busy_seconds = 0.0
+        self.avg_latency = 0.0
+        self._fast_streak = 0
+        # One condition per event loop - the MCP server runs its own loop
+        self._slots: "weakref.WeakKeyDictionary[Any, List[Any]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def pack(
+        self, texts: List[str], token_counts: Optional[Sequence[Optional[int]]] = None
+    ) -> List[List[int]]:
+        """Group text indices into batches bounded by tokens and size
+
+        token_counts, aligned to texts, are the chunker's counts; texts
+        without one fall back to estimate_tokens.
+        """
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, text in enumerate(texts):
+            tokens = token_counts[i] if token_counts else None
+            if tokens is None:
+                tokens = estimate_tokens(text)
+            if current and (
+                current_tokens + tokens > self.max_batch_tokens
+                or len(current) >= self.max_batch_size
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    @asynccontextmanager
+    async def _slot(self):
+        loop = asyncio.get_running_loop()
+        state = self._slots.get(loop)
+        if state is None:
+            state = self._slots[loop] = [asyncio.Condition(), 0]
+        condition = state[0]
+        async with condition:
+            await condition.wait_for(lambda: state[1] < self.concurrency)
+            state[1] += 1
+        try:
+            yield
+        finally:
+            async with condition:
+                state[1] -= 1
+                condition.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        self.avg_latency = (
+            latency if not self.batches else 0.8 * self.avg_latency + 0.2 * latency
+        )
+        if latency > 2 * self.target_latency:
+            self._fast_streak = 0
+            self.concurrency = max(self.min_concurrency, self.concurrency - 1)
+        elif latency <= self.target_latency:
+            self._fast_streak += 1
+            if self._fast_streak >= self.concurrency:
+                self._fast_streak = 0
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def _on_throttle(self) -> None:
+        self.throttled += 1
+        self._fast_streak = 0
+        self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        embed_model = get_embed_model()
+        for attempt in range(self.max_retries + 1):
+            async with self._slot():
+                t0 = time.perf_counter()
+                try:
+                    vectors = await embed_model.aget_text_embedding_batch(texts)
+                except Exception as e:
+                    if not _is_rate_limited(e) or attempt == self.max_retries:
+                        raise
+                    self._on_throttle()
+                    error = e
+                else:
+                    latency = time.perf_counter() - t0
+                    self._on_success(latency)
+                    self.busy_seconds += latency
+                    self.batches += 1
+                    self.texts += len(texts)
+                    return vectors
+            delay = min(30.0, 2**attempt)
+            print(
+                f"Embedding rate limited ({error}), concurrency now "
+                f"{self.concurrency}, retrying in {delay}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def embed(
+        self, texts: List[str], token_counts: Optional[Sequence[Optional[int]]] = None
+    ) -> List[List[float]]:
+        """Embed texts in packed batches, returning vectors aligned to inputs"""
+        batches = self.pack(texts, token_counts)
+        results = await asyncio.gather(
+            *(self._embed_batch([texts[i] for i in batch]) for batch in batches)
+        )
+        embeddings: List[List[float]] = [[] for _ in texts]
+        for batch, vectors in zip(batches, results):
+            for i, vector in zip(batch, vectors):
+                embeddings[i] = vector
+        return embeddings
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "texts": self.texts,
+            "batches": self.batches,
+            "throttled": self.throttled,
+            "concurrency": self.concurrency,
+            "min_concurrency": self.min_concurrency,
+            "max_concurrency": self.max_concurrency,
+            "avg_batch_latency": round(self.avg_latency, 4),
+            "texts_per_busy_second": (
+                round(self.texts / self.busy_seconds, 1) if self.busy_seconds else 0.0
+            ),
+        }
+
+
+def get_embedding_scheduler() -> EmbeddingScheduler:
+    global _embedding_scheduler
+    if _embedding_scheduler is None:
+        settings = get_settings()
+        _embedding_scheduler = EmbeddingScheduler(
+            max_batch_tokens=settings.embed_batch_max_tokens,
+            max_batch_size=settings.embed_batch_max_size,
+            min_concurrency=settings.embed_min_concurrency,
+            max_concurrency=settings.embed_max_concurrency,
+            target_latency=settings.embed_target_latency,
+            max_retries=settings.embed_max_retries,
+        )
+    return _embedding_scheduler
+
+
+async def embed_texts(
+    texts: List[str], token_counts: Optional[Sequence[Optional[int]]] = None
+) -> List[List[float]]:
+    """Embed a batch of texts, serving repeats from the embedding cache
+
+    token_counts (aligned to texts) saves re-estimating chunk sizes when
+    packing batches.
+    """
+    scheduler = get_embedding_scheduler()
+    cache = get_embedding_cache()
+    if cache is None:
+        return await scheduler.embed(texts, token_counts)
+
+    embeddings = await asyncio.to_thread(cache.get_many, texts)
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        fresh = await scheduler.embed(
+            missing_texts, [token_counts[i] for i in missing] if token_counts else None
+        )
+        for i, embedding in zip(missing, fresh):
+            embeddings[i] = embedding
+        await asyncio.to_thread(cache.put_many, missing_texts, fresh)
+    return embeddings
+
+
+async def embed_query(query: str) -> List[float]:
+    """Embed a single search query through the same cache as ingest"""
+    return (await embed_texts([query]))[0]
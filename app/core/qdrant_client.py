@@ -1,7 +1,15 @@
+import asyncio
+import hashlib
+import importlib.util
 import json
+import threading
 import time
-from typing import List, Dict, Any, Optional
-from qdrant_client import QdrantClient
+import uuid
+import weakref
+from dataclasses import dataclass
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+import httpx
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import (
     Distance,
     VectorParams,
@@ -9,110 +17,865 @@ from qdrant_client.models import (
     Filter,
     FieldCondition,
     MatchValue,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Fusion,
+    FusionQuery,
+    HnswConfigDiff,
+    KeywordIndexParams,
+    KeywordIndexType,
+    MatchAny,
+    Modifier,
+    PointIdsList,
+    Prefetch,
+    QuantizationSearchParams,
+    QueryRequest,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    SetPayload,
+    SetPayloadOperation,
+    SparseVector,
+    SparseVectorParams,
 )
 from app.core.config import get_settings
 from app.core.llm import get_embedding_dimension
+from app.utils.chunk_windows import (
+    chunk_position,
+    merge_adjacent_chunks,
+    neighbour_chunk_ids,
+)
+from app.utils.mmr import mmr_select, scale_scores
+from app.utils.sparse import document_vector, query_vector
+from app.core.embedding_cache import normalize_text
+from app.core.retrieval_cache import (
+    bump_collection_version,
+    get_collection_version,
+    get_retrieval_cache,
+)
+
+# One client per event loop: the MCP server runs its own loop in a thread,
+# and pooled connections cannot be shared between loops
+_qdrant_clients: "weakref.WeakKeyDictionary[Any, AsyncQdrantClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
 
-_qdrant_client = None
+def _transport_options() -> Dict[str, Any]:
+    """Connection pool and protocol options for AsyncQdrantClient"""
+    settings = get_settings()
+    http2 = settings.qdrant_http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        print("QDRANT_HTTP2 needs the h2 package (httpx[http2]); using HTTP/1.1")
+        http2 = False
+    return {
+        "prefer_grpc": settings.qdrant_prefer_grpc,
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=settings.qdrant_max_connections,
+            max_keepalive_connections=settings.qdrant_max_connections,
+        ),
+    }
+
+
+# qdrant: a Qdrant server at QDRANT_URL. qdrant_local: qdrant_client's
+# embedded mode on QDRANT_LOCAL_PATH (":memory:" for a throwaway store).
+# numpy: the memory-mapped LocalVectorIndex on VECTOR_INDEX_PATH.
+VECTOR_BACKENDS = ("qdrant", "qdrant_local", "numpy")
 
+# Embedded backends are not tied to an event loop, and a storage folder can
+# only be opened once per process, so they share a single instance
+_embedded_client: Optional[Any] = None
+_embedded_lock = threading.Lock()
 
-async def get_qdrant_client():
-    global _qdrant_client
-    if _qdrant_client is None:
+
+def _get_embedded_client() -> Any:
+    global _embedded_client
+    with _embedded_lock:
+        if _embedded_client is not None:
+            return _embedded_client
         settings = get_settings()
+        if settings.vector_backend == "numpy":
+            from app.core.vector_index import LocalVectorIndex
+
+            _embedded_client = LocalVectorIndex(settings.vector_index_path)
+        elif settings.qdrant_local_path == ":memory:":
+            _embedded_client = AsyncQdrantClient(location=":memory:")
+        else:
+            _embedded_client = AsyncQdrantClient(path=settings.qdrant_local_path)
+        print(f"Using embedded vector backend '{settings.vector_backend}'")
+        return _embedded_client
+
+
+async def get_qdrant_client() -> AsyncQdrantClient:
+    """Client for the configured vector backend (see VECTOR_BACKENDS)"""
+    settings = get_settings()
+    if settings.vector_backend not in VECTOR_BACKENDS:
+        raise ValueError(
+            f"VECTOR_BACKEND must be one of {', '.join(VECTOR_BACKENDS)}, "
+            f"got '{settings.vector_backend}'"
+        )
+    if settings.vector_backend != "qdrant":
+        return _get_embedded_client()
+
+    loop = asyncio.get_running_loop()
+    client = _qdrant_clients.get(loop)
+    if client is None:
         if not settings.qdrant_url:
-            raise RuntimeError("QDRANT_URL is required in environment")
+            raise RuntimeError(
+                "QDRANT_URL is required in environment "
+                "(or set VECTOR_BACKEND=numpy or qdrant_local)"
+            )
 
-        # Create QdrantClient with URL and API key
-        _qdrant_client = QdrantClient(
-            url=settings.qdrant_url, api_key=settings.qdrant_api_key
+        # Create AsyncQdrantClient with URL, API key and a pooled transport
+        client = _qdrant_clients[loop] = AsyncQdrantClient(
+            url=settings.qdrant_url,
+            api_key=settings.qdrant_api_key,
+            **_transport_options(),
         )
 
-    return _qdrant_client
+    return client
 
 
-async def create_collection(collection_name: str, dimension: int = 768):
-    """Create Qdrant collection with simplified schema for RAG documents"""
-    qdrant_client = await get_qdrant_client()
+# Payload indexes every collection should have, by field name; source and
+# chunk_id serve the neighbour chunk lookups of RETRIEVAL_WINDOW
+_PAYLOAD_INDEXES = {
+    "metadata.namespace": "keyword",
+    "metadata.source": "keyword",
+    "metadata.chunk_id": "integer",
+}
+
+# With QDRANT_MULTITENANCY the namespace is Qdrant's tenant key: points are
+# stored grouped by namespace and each one gets its own HNSW subgraph
+TENANT_FIELD = "metadata.namespace"
+
+# Qdrant's default HNSW m, restored when the global graph is re-enabled
+_DEFAULT_HNSW_M = 16
+
+# Named vectors of collections created by create_collection
+DENSE_VECTOR = "dense"
+SPARSE_VECTOR = "sparse"
+
+RETRIEVAL_MODES = ("dense", "hybrid")
+
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+
+@dataclass(frozen=True)
+class StorageOptions:
+    """How a new collection stores vectors and payload"""
+
+    quantization: str = "none"
+    vectors_on_disk: bool = False
+    payload_on_disk: bool = False
+
+    @classmethod
+    def from_settings(cls) -> "StorageOptions":
+        settings = get_settings()
+        return cls(
+            quantization=settings.qdrant_quantization,
+            vectors_on_disk=settings.qdrant_vectors_on_disk,
+            payload_on_disk=settings.qdrant_payload_on_disk,
+        )
+
+    def quantization_config(self):
+        """Quantized copies kept in RAM; originals stay wherever vectors live"""
+        if self.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        if self.quantization == "none":
+            return None
+        raise ValueError(
+            f"Quantization must be one of {', '.join(QUANTIZATION_MODES)}, "
+            f"got '{self.quantization}'"
+        )
+
+
+@dataclass(frozen=True)
+class CollectionInfo:
+    """Cached metadata of a Qdrant collection"""
+
+    name: str
+    vector_size: Optional[int]
+    distance: Optional[str]
+    payload_indexes: Tuple[str, ...]
+    # None for collections with a single unnamed dense vector
+    vector_name: Optional[str] = None
+    sparse_vector_name: Optional[str] = None
+    quantization: Optional[str] = None
+    # Payload index marked is_tenant, if any
+    tenant_field: Optional[str] = None
+    # Live HNSW config; None for backends without one
+    hnsw_config: Optional[Any] = None
+
+
+class CollectionRegistry:
+    """
+    Process-wide cache of collection metadata.
+
+    A collection is looked up (and created or given its missing payload
+    indexes) once; afterwards callers get the cached entry without a round
+    trip. Entries are invalidated only when this process creates or drops
+    the collection. First lookups are serialized per event loop (the MCP
+    server shares the registry from its own loop).
+    """
 
+    def __init__(self):
+        self._entries: Dict[str, CollectionInfo] = {}
+        self._locks: "weakref.WeakKeyDictionary[Any, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get(self, name: str) -> Optional[CollectionInfo]:
+        return self._entries.get(name)
+
+    def invalidate(self, name: str) -> None:
+        self._entries.pop(name, None)
+
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        return lock
+
+    async def ensure(self, client: AsyncQdrantClient, name: str) -> CollectionInfo:
+        """Return cached metadata, loading or creating the collection once"""
+        info = self._entries.get(name)
+        if info is not None:
+            return info
+
+        async with self._lock():
+            info = self._entries.get(name)
+            if info is not None:
+                return info
+
+            expected = get_embedding_dimension()
+            if not await client.collection_exists(name):
+                await _create_collection(client, name, expected)
+            info = await self._load(client, name)
+
+            if info.vector_size is not None and info.vector_size != expected:
+                print(
+                    f"Warning: collection '{name}' stores {info.vector_size}-d "
+                    f"vectors but the embed model produces {expected}-d vectors"
+                )
+            missing = [f for f in _PAYLOAD_INDEXES if f not in info.payload_indexes]
+            if (
+                get_settings().qdrant_multitenancy
+                and info.tenant_field != TENANT_FIELD
+                and TENANT_FIELD in info.payload_indexes
+            ):
+                # Re-creating the index with is_tenant converts it in place
+                missing.append(TENANT_FIELD)
+            if missing:
+                await _create_payload_indexes(client, name, missing)
+                info = await self._load(client, name)
+            hnsw_config = _hnsw_update(info.hnsw_config)
+            if hnsw_config is not None:
+                await _update_hnsw_config(client, name, hnsw_config)
+                info = await self._load(client, name)
+
+            self._entries[name] = info
+            print(f"Registered collection '{name}': {info}")
+            return info
+
+    @staticmethod
+    async def _load(client: AsyncQdrantClient, name: str) -> CollectionInfo:
+        collection = await client.get_collection(name)
+        params = collection.config.params
+        vectors, vector_name = params.vectors, None
+        if isinstance(vectors, dict):
+            vector_name = (
+                DENSE_VECTOR if DENSE_VECTOR in vectors else next(iter(vectors))
+            )
+            vectors = vectors[vector_name]
+        sparse_vectors = params.sparse_vectors or {}
+        quantization = (
+            getattr(vectors, "quantization_config", None)
+            or collection.config.quantization_config
+        )
+        return CollectionInfo(
+            name=name,
+            vector_size=getattr(vectors, "size", None),
+            distance=str(vectors.distance) if hasattr(vectors, "distance") else None,
+            payload_indexes=tuple(sorted((collection.payload_schema or {}).keys())),
+            vector_name=vector_name,
+            sparse_vector_name=(
+                SPARSE_VECTOR if SPARSE_VECTOR in sparse_vectors else None
+            ),
+            quantization=_quantization_kind(quantization),
+            tenant_field=next(
+                (
+                    field
+                    for field, index in (collection.payload_schema or {}).items()
+                    if getattr(getattr(index, "params", None), "is_tenant", False)
+                ),
+                None,
+            ),
+            hnsw_config=getattr(collection.config, "hnsw_config", None),
+        )
+
+
+def _quantization_kind(config: Any) -> Optional[str]:
+    if isinstance(config, ScalarQuantization):
+        return "scalar"
+    if isinstance(config, BinaryQuantization):
+        return "binary"
+    return None if config is None else type(config).__name__
+
+
+_collection_registry = CollectionRegistry()
+
+
+def get_collection_registry() -> CollectionRegistry:
+    return _collection_registry
+
+
+def _payload_index_schema(field_name: str) -> Any:
+    if field_name == TENANT_FIELD and get_settings().qdrant_multitenancy:
+        return KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True)
+    return _PAYLOAD_INDEXES[field_name]
+
+
+def _hnsw_config() -> Optional[HnswConfigDiff]:
+    """Per-tenant HNSW subgraphs (payload_m) when QDRANT_MULTITENANCY is on
+
+    QDRANT_GLOBAL_HNSW=false also drops the collection-wide graph (m=0), which
+    saves memory and indexing time when every search names a namespace;
+    searches without one then scan.
+    """
+    settings = get_settings()
+    if not settings.qdrant_multitenancy:
+        return None
+    return HnswConfigDiff(
+        payload_m=settings.qdrant_tenant_hnsw_m,
+        m=None if settings.qdrant_global_hnsw else 0,
+    )
+
+
+def _hnsw_update(live: Any) -> Optional[HnswConfigDiff]:
+    """The change that brings an existing collection to _hnsw_config(), if any"""
+    wanted = _hnsw_config()
+    if wanted is None or live is None:
+        return None
+    m = wanted.m
+    if m is None:
+        # Turning QDRANT_GLOBAL_HNSW back on rebuilds the global graph
+        m = _DEFAULT_HNSW_M if live.m == 0 else live.m
+    if (live.m, live.payload_m) == (m, wanted.payload_m):
+        return None
+    return HnswConfigDiff(m=m, payload_m=wanted.payload_m)
+
+
+async def _update_hnsw_config(
+    qdrant_client: AsyncQdrantClient, collection_name: str, hnsw_config: HnswConfigDiff
+) -> None:
+    try:
+        await qdrant_client.update_collection(
+            collection_name=collection_name, hnsw_config=hnsw_config
+        )
+        print(f"Updated HNSW config of {collection_name}: {hnsw_config}")
+    except Exception as e:
+        print(f"Warning: Could not update HNSW config of {collection_name}: {e}")
+
+
+async def _create_payload_indexes(
+    qdrant_client: AsyncQdrantClient, collection_name: str, fields: Iterable[str]
+) -> None:
+    for field_name in fields:
+        try:
+            await qdrant_client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=_payload_index_schema(field_name),
+            )
+            print(f"Created index on {field_name} field")
+        except Exception as e:
+            print(f"Warning: Could not create index on {field_name}: {e}")
+
+
+async def _create_collection(
+    qdrant_client: AsyncQdrantClient,
+    collection_name: str,
+    dimension: int,
+    options: Optional[StorageOptions] = None,
+) -> None:
+    options = options or StorageOptions.from_settings()
+    quantization_config = options.quantization_config()
     # Check if collection exists and delete it
     try:
-        qdrant_client.delete_collection(collection_name)
+        await qdrant_client.delete_collection(collection_name)
         print(f"Deleted existing collection {collection_name}")
     except:
         pass
+    await _forget_collection(collection_name)
 
-    print(f"Creating collection schema for {collection_name}")
+    print(f"Creating collection schema for {collection_name}: {options}")
 
-    # Create collection with vector configuration
-    qdrant_client.create_collection(
+    # Named dense vector plus a BM25 sparse vector; Qdrant applies the IDF
+    # part of BM25 from its own collection statistics. With quantization the
+    # float32 originals can live on disk and are only read for rescoring.
+    await qdrant_client.create_collection(
         collection_name=collection_name,
-        vectors_config=VectorParams(size=dimension, distance=Distance.COSINE),
+        vectors_config={
+            DENSE_VECTOR: VectorParams(
+                size=dimension,
+                distance=Distance.COSINE,
+                on_disk=options.vectors_on_disk,
+            )
+        },
+        sparse_vectors_config={
+            SPARSE_VECTOR: SparseVectorParams(modifier=Modifier.IDF)
+        },
+        quantization_config=quantization_config,
+        on_disk_payload=options.payload_on_disk,
+        hnsw_config=_hnsw_config(),
     )
 
-    # Create index on metadata.namespace for filtering
-    try:
-        qdrant_client.create_payload_index(
-            collection_name=collection_name,
-            field_name="metadata.namespace",
-            field_schema="keyword",
-        )
-        print(f"Created index on metadata.namespace field")
-    except Exception as e:
-        print(f"Warning: Could not create index on metadata.namespace: {e}")
+    # Payload indexes for namespace filters and neighbour chunk lookups
+    await _create_payload_indexes(qdrant_client, collection_name, _PAYLOAD_INDEXES)
 
     print(f"Collection created successfully: {collection_name}")
+
+
+async def create_collection(
+    collection_name: str,
+    dimension: int = 768,
+    options: Optional[StorageOptions] = None,
+):
+    """Create Qdrant collection with simplified schema for RAG documents
+
+    Storage (quantization, on-disk vectors and payload) defaults to the
+    QDRANT_QUANTIZATION / QDRANT_VECTORS_ON_DISK / QDRANT_PAYLOAD_ON_DISK
+    settings.
+    """
+    qdrant_client = await get_qdrant_client()
+    await _create_collection(qdrant_client, collection_name, dimension, options)
     return collection_name
 
 
+async def _forget_collection(collection_name: str) -> None:
+    """Drop cached metadata and the near-duplicate index of a deleted collection"""
+    from app.core.dedup_index import get_near_duplicate_index
+
+    _collection_registry.invalidate(collection_name)
+    bump_collection_version()
+    # The signature index describes the configured collection only, so
+    # dropping a scratch collection (e.g. a benchmark's) must leave it alone
+    if collection_name != get_settings().qdrant_collection:
+        return
+    dedup_index = get_near_duplicate_index()
+    if dedup_index is not None:
+        await asyncio.to_thread(dedup_index.clear)
+        print(f"Cleared near-duplicate index for {collection_name}")
+
+
+async def drop_collection(collection_name: str) -> None:
+    """Delete a collection and forget its cached metadata"""
+    qdrant_client = await get_qdrant_client()
+    await qdrant_client.delete_collection(collection_name)
+    await _forget_collection(collection_name)
+    print(f"Deleted collection {collection_name}")
+
+
 async def get_collection(collection_name: str) -> str:
-    """Get existing collection or create if doesn't exist"""
+    """Get existing collection or create if doesn't exist
+
+    Served from the collection registry after the first call, so the hot
+    path does not round-trip to Qdrant.
+    """
+    await get_collection_info(collection_name)
+    return collection_name
+
+
+async def get_collection_info(collection_name: str) -> CollectionInfo:
+    """Cached metadata of a collection, creating it if it doesn't exist"""
+    info = _collection_registry.get(collection_name)
+    if info is not None:
+        return info
+
     qdrant_client = await get_qdrant_client()
+    return await _collection_registry.ensure(qdrant_client, collection_name)
 
-    try:
-        # Check if collection exists
-        collection_info = qdrant_client.get_collection(collection_name)
-        print(f"Collection '{collection_name}' already exists")
-        return collection_name
-    except:
-        # Get embedding dimension from the model
-        dimension = get_embedding_dimension()
-        return await create_collection(collection_name, dimension)
 
+def make_point_id(namespace: Optional[str], source: Optional[str], text: str) -> str:
+    """Derive a deterministic point ID from namespace, source and chunk text"""
+    key = "\x1f".join([namespace or "", source or "", text])
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return str(uuid.UUID(bytes=digest[:16]))
 
-async def insert_documents(
-    texts: List[str],
-    metadatas: List[Dict[str, Any]],
-):
-    """Insert documents directly into Qdrant with simplified schema"""
+
+def point_ids_for(texts: List[str], metadatas: List[Dict[str, Any]]) -> List[str]:
+    """Content-addressed IDs for a batch of chunks and their metadata"""
+    return [
+        make_point_id(metadata.get("namespace"), metadata.get("source"), text)
+        for text, metadata in zip(texts, metadatas)
+    ]
+
+
+# Chunk metadata that changes when a revision shifts unchanged chunks
+_POSITION_FIELDS = ("chunk_id", "total_chunks")
+
+
+async def stored_document_points(
+    documents: Iterable[Tuple[Optional[str], str]],
+) -> Dict[Tuple[Optional[str], str], Dict[str, Dict[str, Any]]]:
+    """Points stored for each (namespace, source), with their chunk positions
+
+    Returns {document: {point_id: {"chunk_id": ..., "total_chunks": ...}}}.
+    Every document is covered by one paginated scroll on the source index.
+    """
+    documents = set(documents)
+    stored: Dict[Tuple[Optional[str], str], Dict[str, Dict[str, Any]]] = {
+        document: {} for document in documents
+    }
+    if not documents:
+        return stored
+
+    settings = get_settings()
+    collection_name = await get_collection(settings.qdrant_collection)
+    qdrant_client = await get_qdrant_client()
+
+    should = []
+    for namespace, source in documents:
+        conditions = [
+            FieldCondition(key="metadata.source", match=MatchValue(value=source))
+        ]
+        if namespace:
+            conditions.append(
+                FieldCondition(
+                    key="metadata.namespace", match=MatchValue(value=namespace)
+                )
+            )
+        should.append(Filter(must=conditions))
+    offset = None
+    while True:
+        records, offset = await qdrant_client.scroll(
+            collection_name=collection_name,
+            scroll_filter=Filter(should=should),
+            limit=1000,
+            offset=offset,
+            with_payload=[
+                "metadata.source",
+                "metadata.namespace",
+                *(f"metadata.{field}" for field in _POSITION_FIELDS),
+            ],
+            with_vectors=False,
+        )
+        for record in records:
+            metadata = (record.payload or {}).get("metadata", {})
+            # Points without a namespace only belong to namespace-less documents
+            document = (metadata.get("namespace"), metadata.get("source"))
+            if document in stored:
+                stored[document][str(record.id)] = {
+                    field: metadata.get(field) for field in _POSITION_FIELDS
+                }
+        if offset is None:
+            return stored
+
+
+async def update_chunk_positions(positions: Dict[str, Dict[str, Any]]) -> None:
+    """Rewrite chunk_id/total_chunks of stored points, {point_id: fields}"""
+    if not positions:
+        return
+    settings = get_settings()
+    collection_name = await get_collection(settings.qdrant_collection)
+    qdrant_client = await get_qdrant_client()
+    await qdrant_client.batch_update_points(
+        collection_name=collection_name,
+        update_operations=[
+            SetPayloadOperation(
+                set_payload=SetPayload(
+                    payload=fields, points=[point_id], key="metadata"
+                )
+            )
+            for point_id, fields in positions.items()
+        ],
+    )
+    bump_collection_version()
+
+
+async def delete_points(ids: Iterable[str]) -> None:
+    """Delete points by ID, and their near-duplicate signatures"""
+    from app.core.dedup_index import get_near_duplicate_index
+
+    ids = list(ids)
+    if not ids:
+        return
+    settings = get_settings()
+    collection_name = await get_collection(settings.qdrant_collection)
+    qdrant_client = await get_qdrant_client()
+    await qdrant_client.delete(
+        collection_name=collection_name,
+        points_selector=PointIdsList(points=ids),
+        wait=True,
+    )
+    bump_collection_version()
+    dedup_index = get_near_duplicate_index()
+    if dedup_index is not None:
+        await asyncio.to_thread(dedup_index.remove, ids)
+    print(f"Deleted {len(ids)} points from '{collection_name}'")
+
+
+class DocumentRevisions:
+    """
+    Tracks re-ingested documents so their superseded chunks can be retired.
+
+    Before a document's chunks are filtered, load() fetches the point IDs
+    already stored for it. Chunks whose ID is stored are unchanged; if a
+    revision moved them, refresh() updates their stored chunk_id and
+    total_chunks. Once every chunk of the new revision has been seen,
+    retire() deletes the stored points it no longer contains.
+    """
+
+    def __init__(self):
+        self._stored: Dict[Tuple[Optional[str], str], Dict[str, Dict[str, Any]]] = {}
+        self._current: Dict[Tuple[Optional[str], str], Set[str]] = {}
+
+    @staticmethod
+    def _document(metadata: Dict[str, Any]) -> Tuple[Optional[str], str]:
+        return metadata.get("namespace"), metadata.get("source")
+
+    async def load(self, metadatas: List[Dict[str, Any]]) -> None:
+        """Fetch the stored points of documents not seen before, in one scroll"""
+        new = {self._document(m) for m in metadatas} - self._stored.keys()
+        if new:
+            self._stored.update(await stored_document_points(new))
+
+    def superseded(self, metadatas: List[Dict[str, Any]]) -> Set[str]:
+        """Stored IDs of the batch's documents, which may be about to go
+
+        Near-duplicate checks ignore them: a revised chunk must not be
+        suppressed in favour of the version it replaces.
+        """
+        return {
+            point_id
+            for document in {self._document(m) for m in metadatas}
+            for point_id in self._stored.get(document, ())
+        }
+
+    async def unchanged(
+        self, ids: List[str], metadatas: List[Dict[str, Any]]
+    ) -> Set[str]:
+        """IDs already stored, refreshing the positions of any that moved"""
+        unchanged: Set[str] = set()
+        moved: Dict[str, Dict[str, Any]] = {}
+        for point_id, metadata in zip(ids, metadatas):
+            document = self._document(metadata)
+            self._current.setdefault(document, set()).add(point_id)
+            stored = self._stored[document].get(point_id)
+            if stored is None:
+                continue
+            unchanged.add(point_id)
+            fields = {field: metadata.get(field) for field in _POSITION_FIELDS}
+            if stored != fields:
+                moved[point_id] = self._stored[document][point_id] = fields
+        await update_chunk_positions(moved)
+        return unchanged
+
+    async def retire(self, namespace: Optional[str], source: str) -> int:
+        """Delete a finished document's points that the new revision dropped"""
+        document = (namespace, source)
+        current = self._current.pop(document, set())
+        stale = [
+            point_id
+            for point_id in self._stored.pop(document, {})
+            if point_id not in current
+        ]
+        await delete_points(stale)
+        return len(stale)
+
+
+@dataclass
+class UpsertReport:
+    """Outcome of a bulk upsert"""
+
+    points: int = 0
+    batches: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def points_per_second(self) -> float:
+        return self.points / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "points": self.points,
+            "batches": self.batches,
+            "retries": self.retries,
+            "seconds": round(self.seconds, 4),
+            "points_per_second": round(self.points_per_second, 1),
+        }
+
+
+async def upsert_points(
+    points: List[PointStruct],
+    batch_size: Optional[int] = None,
+    parallelism: Optional[int] = None,
+    wait: Optional[bool] = None,
+) -> UpsertReport:
+    """
+    Write points in batches with bounded parallelism.
+
+    Each batch is retried on its own with exponential backoff. With wait=False
+    every batch except the last is sent without waiting for it to be applied;
+    the last one goes out afterwards with wait=True, and since Qdrant applies
+    updates in order, its acknowledgement confirms the whole write.
+    """
     settings = get_settings()
+    batch_size = batch_size or settings.qdrant_upsert_batch_size
+    parallelism = parallelism or settings.qdrant_upsert_parallelism
+    wait = settings.qdrant_upsert_wait if wait is None else wait
+
     collection_name = await get_collection(settings.qdrant_collection)
     qdrant_client = await get_qdrant_client()
 
-    # Generate embeddings
-    from app.core.llm import get_embed_model
+    batches = [points[i : i + batch_size] for i in range(0, len(points), batch_size)]
+    report = UpsertReport(points=len(points), batches=len(batches))
+    if not batches:
+        return report
 
-    embed_model = get_embed_model()
-    embeddings = embed_model.get_text_embedding_batch(texts)
+    semaphore = asyncio.Semaphore(parallelism)
+
+    async def send(batch: List[PointStruct], wait_for_batch: bool) -> None:
+        async with semaphore:
+            for attempt in range(settings.qdrant_upsert_retries + 1):
+                try:
+                    await qdrant_client.upsert(
+                        collection_name=collection_name,
+                        points=batch,
+                        wait=wait_for_batch,
+                    )
+                    return
+                except Exception as e:
+                    if attempt == settings.qdrant_upsert_retries:
+                        raise
+                    report.retries += 1
+                    delay = 0.5 * 2**attempt
+                    print(
+                        f"Upsert of {len(batch)} points failed ({e}), retrying in {delay}s"
+                    )
+                    await asyncio.sleep(delay)
+
+    t0 = time.perf_counter()
+    try:
+        if wait:
+            await asyncio.gather(*(send(batch, True) for batch in batches))
+        else:
+            await asyncio.gather(*(send(batch, False) for batch in batches[:-1]))
+            await send(batches[-1], True)
+    finally:
+        # Even a partial write changes what searches return
+        bump_collection_version()
+    report.seconds = time.perf_counter() - t0
+
+    print(
+        f"Upserted {report.points} points into '{collection_name}' in "
+        f"{report.batches} batches ({round(report.points_per_second, 1)} points/s)"
+    )
+    return report
+
+
+async def upsert_chunks(
+    texts: List[str],
+    metadatas: List[Dict[str, Any]],
+    embeddings: List[List[float]],
+    ids: Optional[List[str]] = None,
+) -> UpsertReport:
+    """Upsert already-embedded chunks into Qdrant
+
+    Collections with a sparse vector also get each chunk's BM25 term
+    weights, computed locally.
+    """
+    settings = get_settings()
+    info = await get_collection_info(settings.qdrant_collection)
+    if ids is None:
+        ids = point_ids_for(texts, metadatas)
 
     # Prepare data for insertion using Qdrant format
     points = []
-    for i, (text, metadata, embedding) in enumerate(zip(texts, metadatas, embeddings)):
+    for point_id, text, metadata, embedding in zip(ids, texts, metadatas, embeddings):
+        vector: Any = embedding
+        if info.vector_name is not None or info.sparse_vector_name is not None:
+            vector = {info.vector_name or "": embedding}
+        if info.sparse_vector_name is not None:
+            indices, values = document_vector(text, settings.sparse_avg_doc_tokens)
+            vector[info.sparse_vector_name] = SparseVector(
+                indices=indices, values=values
+            )
         points.append(
             PointStruct(
-                id=i, vector=embedding, payload={"text": text, "metadata": metadata}
+                id=point_id,
+                vector=vector,
+                payload={"text": text, "metadata": metadata},
             )
         )
 
-    print(f"Inserting {len(texts)} entities into collection '{collection_name}'")
+    return await upsert_points(points)
 
-    # Insert data
-    t0 = time.time()
-    qdrant_client.upsert(collection_name=collection_name, points=points)
-    insert_time = time.time() - t0
 
-    print(f"Insert completed in {round(insert_time, 4)} seconds")
-    print(f"Successfully inserted {len(texts)} documents")
+async def insert_documents(
+    texts: List[str],
+    metadatas: List[Dict[str, Any]],
+    incremental: bool = False,
+):
+    """Insert documents directly into Qdrant with simplified schema
+
+    With incremental=True, chunks whose content-addressed ID is already stored
+    are skipped before embedding, and the stored chunks of each source that
+    the new texts no longer contain are deleted afterwards (texts must then
+    hold every chunk of their sources). Near-duplicates of stored chunks are
+    suppressed unless DEDUP_MODE=off.
+    """
+    from app.core.dedup_index import get_near_duplicate_filter
+    from app.core.llm import embed_texts
+
+    ids = point_ids_for(texts, metadatas)
+    documents = {DocumentRevisions._document(metadata) for metadata in metadatas}
+
+    revisions = None
+    if incremental:
+        revisions = DocumentRevisions()
+        await revisions.load(metadatas)
+        existing = await revisions.unchanged(ids, metadatas)
+        keep = [i for i, point_id in enumerate(ids) if point_id not in existing]
+        print(f"Skipping {len(ids) - len(keep)} unchanged chunks")
+        ids = [ids[i] for i in keep]
+        texts = [texts[i] for i in keep]
+        metadatas = [metadatas[i] for i in keep]
+
+    dedup = get_near_duplicate_filter()
+    if dedup is not None and texts:
+        ignore = revisions.superseded(metadatas) if revisions is not None else set()
+        canonical = await asyncio.to_thread(dedup.check, ids, texts, metadatas, ignore)
+        keep = [i for i, point_id in enumerate(canonical) if point_id is None]
+        print(f"Suppressed {len(ids) - len(keep)} near-duplicate chunks")
+        ids = [ids[i] for i in keep]
+        texts = [texts[i] for i in keep]
+        metadatas = [metadatas[i] for i in keep]
+
+    report = None
+    if texts:
+        embeddings = await embed_texts(
+            texts, [metadata.get("token_count") for metadata in metadatas]
+        )
+        report = await upsert_chunks(texts, metadatas, embeddings, ids=ids)
+        if dedup is not None:
+            await asyncio.to_thread(dedup.commit, ids)
+        print(f"Successfully inserted {report.points} documents")
+    if revisions is not None:
+        # Only once the new revision is stored
+        for namespace, source in documents:
+            await revisions.retire(namespace, source)
+    return report
 
 
 async def get_collection_stats(collection_name: str = None):
@@ -125,7 +888,7 @@ async def get_collection_stats(collection_name: str = None):
 
     try:
         # Get collection information
-        collection_info = qdrant_client.get_collection(collection_name)
+        collection_info = await qdrant_client.get_collection(collection_name)
         print(f"Collection '{collection_name}' details:")
         print(f"  - Vectors count: {collection_info.vectors_count}")
         print(f"  - Points count: {collection_info.points_count}")
@@ -152,80 +915,419 @@ async def get_collection_stats(collection_name: str = None):
         return None
 
 
-async def search_similar(
-    query: str, top_k: int = 5, namespace: Optional[str] = None
-) -> List[Dict[str, Any]]:
-    """Search for similar documents using vector similarity"""
+def _namespace_filter(namespace: Optional[str]) -> Optional[Filter]:
+    if not namespace:
+        return None
+    return Filter(
+        must=[
+            FieldCondition(key="metadata.namespace", match=MatchValue(value=namespace))
+        ]
+    )
+
+
+def _quantization_search_params(info: CollectionInfo) -> Optional[SearchParams]:
+    """Oversample on the quantized vectors, then rescore with the originals"""
+    if info.quantization is None:
+        return None
     settings = get_settings()
-    collection_name = await get_collection(settings.qdrant_collection)
-    qdrant_client = await get_qdrant_client()
+    return SearchParams(
+        quantization=QuantizationSearchParams(
+            rescore=settings.qdrant_search_rescore,
+            oversampling=settings.qdrant_search_oversampling,
+        )
+    )
 
-    # Generate query embedding
-    from app.core.llm import get_embed_model
 
-    embed_model = get_embed_model()
-    query_embedding = embed_model.get_text_embedding(query)
+# Metadata that places a chunk in its document (see chunk_position)
+_SPAN_FIELDS = ("source", "chunk_id", "namespace")
 
-    print(f"Searching for similar documents with query: {query[:50]}...")
 
-    t0 = time.time()
-    try:
-        # Use the correct search method with proper parameters
-        search_params = {
-            "collection_name": collection_name,
-            "query_vector": query_embedding,
-            "limit": top_k,
-            "with_payload": True,
+def _payload_selector() -> Any:
+    """Fetch only the chunk text and the RETRIEVAL_PAYLOAD_FIELDS metadata
+
+    source, chunk_id and namespace are always fetched when adjacent chunks
+    are merged, since spans are built from them; _with_neighbours drops a
+    namespace that was not asked for once they are.
+    """
+    settings = get_settings()
+    fields = settings.retrieval_payload_fields
+    if "*" in fields:
+        return True
+    if settings.retrieval_merge_adjacent or settings.retrieval_window > 0:
+        fields = (*fields, *(f for f in _SPAN_FIELDS if f not in fields))
+    return ["text", *(f"metadata.{field}" for field in fields)]
+
+
+def _fuses(info: CollectionInfo, mode: str) -> bool:
+    """Whether a search in this mode is a hybrid RRF fusion on this collection"""
+    return mode == "hybrid" and info.sparse_vector_name is not None
+
+
+def _search_params(
+    info: CollectionInfo,
+    mode: str,
+    query: str,
+    query_embedding: List[float],
+    top_k: int,
+    query_filter: Optional[Filter],
+) -> Dict[str, Any]:
+    """query_points arguments for a dense or hybrid (RRF-fused) search"""
+    params: Dict[str, Any] = {
+        "collection_name": info.name,
+        "limit": top_k,
+        "with_payload": _payload_selector(),
+    }
+    if _fuses(info, mode):
+        indices, values = query_vector(query)
+        prefetch_k = top_k * get_settings().hybrid_prefetch_factor
+        # Both candidate lists come back from one request and are fused
+        # server-side with reciprocal rank fusion
+        params["prefetch"] = [
+            Prefetch(
+                query=query_embedding,
+                using=info.vector_name,
+                filter=query_filter,
+                params=_quantization_search_params(info),
+                limit=prefetch_k,
+            ),
+            Prefetch(
+                query=SparseVector(indices=indices, values=values),
+                using=info.sparse_vector_name,
+                filter=query_filter,
+                limit=prefetch_k,
+            ),
+        ]
+        params["query"] = FusionQuery(fusion=Fusion.RRF)
+        return params
+
+    params["query"] = query_embedding
+    params["using"] = info.vector_name
+    params["query_filter"] = query_filter
+    params["search_params"] = _quantization_search_params(info)
+    return params
+
+
+def _query_request(params: Dict[str, Any]) -> QueryRequest:
+    """The query_batch_points form of _search_params' arguments"""
+    return QueryRequest(
+        prefetch=params.get("prefetch"),
+        query=params["query"],
+        using=params.get("using"),
+        filter=params.get("query_filter"),
+        params=params.get("search_params"),
+        limit=params["limit"],
+        with_payload=params["with_payload"],
+        with_vector=params.get("with_vectors", False),
+    )
+
+
+def _mmr_lambda(
+    diversify: Optional[bool], mmr_lambda: Optional[float]
+) -> Optional[float]:
+    """The MMR trade-off to apply, or None when diversification is off"""
+    settings = get_settings()
+    if not (settings.retrieval_mmr if diversify is None else diversify):
+        return None
+    return settings.mmr_lambda if mmr_lambda is None else mmr_lambda
+
+
+def _candidate_params(
+    info: CollectionInfo,
+    mode: str,
+    query: str,
+    query_embedding: List[float],
+    top_k: int,
+    query_filter: Optional[Filter],
+    lambda_mult: Optional[float],
+) -> Dict[str, Any]:
+    """_search_params, widened to MMR_FETCH_FACTOR * top_k hits with their
+    dense vectors when the results are diversified"""
+    if lambda_mult is None:
+        return _search_params(info, mode, query, query_embedding, top_k, query_filter)
+    params = _search_params(
+        info,
+        mode,
+        query,
+        query_embedding,
+        top_k * get_settings().mmr_fetch_factor,
+        query_filter,
+    )
+    params["with_vectors"] = [info.vector_name] if info.vector_name else True
+    return params
+
+
+def _diversify(
+    hits,
+    query_embedding: List[float],
+    top_k: int,
+    lambda_mult: Optional[float],
+    vector_name: Optional[str],
+    fused: bool = False,
+):
+    """Reduce the candidate hits to top_k by maximal marginal relevance
+
+    Fused (hybrid) hits keep their RRF ranking as the relevance term, so
+    exact-term matches found by the sparse search are not re-ranked by
+    dense similarity alone; dense vectors only measure redundancy.
+    """
+    if lambda_mult is None or len(hits) <= top_k:
+        return hits[:top_k]
+    vectors = [
+        hit.vector.get(vector_name) if isinstance(hit.vector, dict) else hit.vector
+        for hit in hits
+    ]
+    if any(vector is None for vector in vectors):
+        return hits[:top_k]
+    relevance = scale_scores([hit.score for hit in hits]) if fused else None
+    selected = mmr_select(query_embedding, vectors, top_k, lambda_mult, relevance)
+    return [hits[i] for i in selected]
+
+
+def _format_hits(hits) -> List[Dict[str, Any]]:
+    return [
+        {
+            "text": hit.payload.get("text"),
+            "score": hit.score,
+            "metadata": hit.payload.get("metadata", {}),
         }
+        for hit in hits
+    ]
 
-        # Add namespace filtering if provided
-        if namespace:
-            search_params["query_filter"] = Filter(
-                must=[
-                    FieldCondition(
-                        key="metadata.namespace", match=MatchValue(value=namespace)
-                    )
-                ]
+
+def _neighbour_filter(
+    wanted: Dict[Any, Set[int]], query_filter: Optional[Filter]
+) -> Filter:
+    """Match the wanted chunk_ids of each (namespace, source)"""
+    documents = []
+    for (namespace, source), chunk_ids in wanted.items():
+        conditions = [
+            FieldCondition(key="metadata.source", match=MatchValue(value=source)),
+            FieldCondition(
+                key="metadata.chunk_id", match=MatchAny(any=sorted(chunk_ids))
+            ),
+        ]
+        if namespace is not None:
+            conditions.append(
+                FieldCondition(
+                    key="metadata.namespace", match=MatchValue(value=namespace)
+                )
             )
+        documents.append(Filter(must=conditions))
+    return Filter(must=[query_filter] if query_filter else None, should=documents)
 
-        # Perform search using the search method (which is still supported)
-        results = qdrant_client.search(**search_params)
-        search_time = time.time() - t0
 
-        # Format results
-        formatted_results = []
-        for hit in results:
-            formatted_results.append(
+async def _with_neighbours(
+    qdrant_client: AsyncQdrantClient,
+    info: CollectionInfo,
+    result_lists: List[List[Dict[str, Any]]],
+    query_filter: Optional[Filter],
+) -> List[List[Dict[str, Any]]]:
+    """Merge hits of consecutive chunks into spans, first adding the chunks
+    within RETRIEVAL_WINDOW of every hit
+
+    The neighbours of all result lists are fetched with a single scroll on
+    the source and chunk_id payload indexes; if it fails the hits are merged
+    without them.
+    """
+    settings = get_settings()
+    window = settings.retrieval_window
+    if window <= 0 and not settings.retrieval_merge_adjacent:
+        return result_lists
+
+    wanted_per_list = [
+        neighbour_chunk_ids(results, window) if window > 0 else {}
+        for results in result_lists
+    ]
+    wanted: Dict[Any, Set[int]] = {}
+    for list_wanted in wanted_per_list:
+        for document, chunk_ids in list_wanted.items():
+            wanted.setdefault(document, set()).update(chunk_ids)
+
+    neighbours: List[Dict[str, Any]] = []
+    if wanted:
+        try:
+            records, _ = await qdrant_client.scroll(
+                collection_name=info.name,
+                scroll_filter=_neighbour_filter(wanted, query_filter),
+                limit=sum(len(chunk_ids) for chunk_ids in wanted.values()),
+                with_payload=_payload_selector(),
+                with_vectors=False,
+            )
+            neighbours = [
                 {
-                    "text": hit.payload.get("text"),
-                    "score": hit.score,
-                    "metadata": hit.payload.get("metadata", {}),
+                    "text": record.payload.get("text"),
+                    "score": None,
+                    "metadata": record.payload.get("metadata", {}),
                 }
+                for record in records
+            ]
+        except Exception as e:
+            print(f"Warning: could not fetch neighbour chunks: {e}")
+
+    merged = []
+    for results, list_wanted in zip(result_lists, wanted_per_list):
+        context = []
+        for neighbour in neighbours:
+            position = chunk_position(neighbour)
+            if position is not None and position[2] in list_wanted.get(
+                position[:2], ()
+            ):
+                context.append(neighbour)
+        merged.append(merge_adjacent_chunks(results + context))
+
+    fields = settings.retrieval_payload_fields
+    if "*" in fields or "namespace" in fields:
+        return merged
+    # The namespace was fetched only to keep same-named sources apart
+    return [
+        [
+            {
+                **result,
+                "metadata": {
+                    key: value
+                    for key, value in (result.get("metadata") or {}).items()
+                    if key != "namespace"
+                },
+            }
+            for result in results
+        ]
+        for results in merged
+    ]
+
+
+async def search_similar(
+    query: str,
+    top_k: int = 5,
+    namespace: Optional[str] = None,
+    mode: Optional[str] = None,
+    diversify: Optional[bool] = None,
+    mmr_lambda: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Search for similar documents using vector similarity
+
+    mode="hybrid" (the RETRIEVAL_MODE default) fuses dense and BM25 sparse
+    results with RRF in a single Qdrant query, which ranks exact terms such
+    as scheme names and variety codes far better; collections without a
+    sparse vector fall back to dense search.
+
+    Results are served from the retrieval cache when the same (or, in dense
+    mode, a nearly identical by embedding) query was answered since the
+    last write. Hits carry the chunk text and only the metadata fields in
+    RETRIEVAL_PAYLOAD_FIELDS.
+
+    diversify (RETRIEVAL_MMR by default) fetches MMR_FETCH_FACTOR * top_k
+    candidates with their vectors and keeps the top_k chosen by maximal
+    marginal relevance with trade-off mmr_lambda (MMR_LAMBDA), so
+    overlapping chunks and repeated documents do not fill the context.
+
+    Hits of consecutive chunks of a document are then merged into one span
+    (RETRIEVAL_MERGE_ADJACENT), optionally widened by the RETRIEVAL_WINDOW
+    chunks on either side of each hit.
+    """
+    settings = get_settings()
+    mode = mode or settings.retrieval_mode
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode '{mode}'")
+    lambda_mult = _mmr_lambda(diversify, mmr_lambda)
+    cache_mode = mode if lambda_mult is None else f"{mode}+mmr{lambda_mult:g}"
+
+    cache = get_retrieval_cache()
+    version = get_collection_version()
+    cache_key = cache.make_key(query, namespace, top_k, cache_mode) if cache else None
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            print(f"Retrieval cache hit for query: {query[:50]}")
+            return cached
+
+    info = await get_collection_info(settings.qdrant_collection)
+    qdrant_client = await get_qdrant_client()
+
+    # Generate query embedding (served from the embedding cache when possible)
+    from app.core.llm import embed_query
+
+    query_embedding = await embed_query(query)
+    # Near-identical embeddings can still differ in the exact terms hybrid
+    # search exists for (HD-2967 vs HD-3086), so only dense mode reuses them
+    if cache is not None and mode == "dense":
+        cached = cache.get_similar(namespace, top_k, query_embedding, cache_mode)
+        if cached is not None:
+            print(f"Semantic retrieval cache hit for query: {query[:50]}")
+            return cached
+
+    print(f"Searching ({mode}) for similar documents with query: {query[:50]}...")
+
+    t0 = time.time()
+    query_filter = _namespace_filter(namespace)
+    try:
+        search_params = _candidate_params(
+            info,
+            mode,
+            query,
+            query_embedding,
+            top_k,
+            query_filter,
+            lambda_mult,
+        )
+        # query_points runs on the async client, so concurrent searches
+        # overlap instead of blocking the event loop
+        results = (await qdrant_client.query_points(**search_params)).points
+        results = _diversify(
+            results,
+            query_embedding,
+            top_k,
+            lambda_mult,
+            info.vector_name,
+            _fuses(info, mode),
+        )
+
+        # Format results
+        formatted_results = (
+            await _with_neighbours(
+                qdrant_client, info, [_format_hits(results)], query_filter
             )
+        )[0]
+        search_time = time.time() - t0
 
         print(f"Search completed in {round(search_time, 4)} seconds")
         print(f"Found {len(formatted_results)} results")
+        if cache is not None:
+            cache.put(
+                cache_key,
+                namespace,
+                top_k,
+                query_embedding,
+                formatted_results,
+                version,
+                cache_mode,
+            )
         return formatted_results
 
     except Exception as e:
         print(f"Error during search: {str(e)}")
-        # If namespace filtering fails, try without it
-        if namespace:
+        # If namespace filtering fails, try without it (never across tenants)
+        if namespace and not settings.qdrant_multitenancy:
             print(f"Namespace filtering failed, trying without namespace filter...")
             try:
-                # Remove filter and try again
-                search_params.pop("query_filter", None)
-                results = qdrant_client.search(**search_params)
-
-                formatted_results = []
-                for hit in results:
-                    formatted_results.append(
-                        {
-                            "text": hit.payload.get("text"),
-                            "score": hit.score,
-                            "metadata": hit.payload.get("metadata", {}),
-                        }
+                # Rebuild the query without the filter and try again
+                search_params = _candidate_params(
+                    info, mode, query, query_embedding, top_k, None, lambda_mult
+                )
+                results = (await qdrant_client.query_points(**search_params)).points
+                results = _diversify(
+                    results,
+                    query_embedding,
+                    top_k,
+                    lambda_mult,
+                    info.vector_name,
+                    _fuses(info, mode),
+                )
+
+                formatted_results = (
+                    await _with_neighbours(
+                        qdrant_client, info, [_format_hits(results)], None
                     )
+                )[0]
 
                 print(f"Search without namespace filter completed successfully")
                 print(f"Found {len(formatted_results)} results")
@@ -235,3 +1337,145 @@ async def search_similar(
                 print(f"Fallback search also failed: {str(fallback_error)}")
 
         raise e
+
+
+async def search_similar_batch(
+    queries: List[str],
+    top_k: int = 5,
+    namespace: Optional[str] = None,
+    mode: Optional[str] = None,
+    diversify: Optional[bool] = None,
+    mmr_lambda: Optional[float] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Search for several queries at once, returning results aligned to them
+
+    Queries not served by the retrieval cache are embedded in one batch and
+    sent to Qdrant as a single query_batch_points request, so n sub-queries
+    cost one embedding round trip and one search round trip instead of n.
+    diversify and mmr_lambda apply MMR per query as in search_similar.
+    """
+    settings = get_settings()
+    mode = mode or settings.retrieval_mode
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode '{mode}'")
+    lambda_mult = _mmr_lambda(diversify, mmr_lambda)
+    cache_mode = mode if lambda_mult is None else f"{mode}+mmr{lambda_mult:g}"
+
+    cache = get_retrieval_cache()
+    version = get_collection_version()
+    results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+    cache_keys = [
+        cache.make_key(query, namespace, top_k, cache_mode) if cache else None
+        for query in queries
+    ]
+
+    # Repeated queries in the batch are only searched once
+    pending: Dict[str, List[int]] = {}
+    for i, query in enumerate(queries):
+        cached = cache.get(cache_keys[i]) if cache is not None else None
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.setdefault(normalize_text(query).lower(), []).append(i)
+    if not pending:
+        print(f"Retrieval cache served all {len(queries)} queries")
+        return results
+
+    from app.core.llm import embed_texts
+
+    positions = [indices[0] for indices in pending.values()]
+    embeddings = await embed_texts([queries[i] for i in positions])
+    searched: List[Tuple[List[int], List[float]]] = []
+    for indices, embedding in zip(pending.values(), embeddings):
+        cached = None
+        if cache is not None and mode == "dense":
+            cached = cache.get_similar(
+                namespace, top_k, embedding, cache_mode, lookups=len(indices)
+            )
+        if cached is not None:
+            for i in indices:
+                results[i] = cached
+        else:
+            searched.append((indices, embedding))
+    if not searched:
+        return results
+
+    info = await get_collection_info(settings.qdrant_collection)
+    qdrant_client = await get_qdrant_client()
+
+    def requests(query_filter: Optional[Filter]) -> List[QueryRequest]:
+        return [
+            _query_request(
+                _candidate_params(
+                    info,
+                    mode,
+                    queries[indices[0]],
+                    embedding,
+                    top_k,
+                    query_filter,
+                    lambda_mult,
+                )
+            )
+            for indices, embedding in searched
+        ]
+
+    served = sum(1 for result in results if result is not None)
+    print(
+        f"Searching ({mode}) for {len(searched)} distinct queries in one batch "
+        f"({served}/{len(queries)} served from cache)"
+    )
+    t0 = time.time()
+    # Unfiltered fallback results are not cached under the namespace's key
+    cacheable = cache is not None
+    query_filter = _namespace_filter(namespace)
+    try:
+        responses = await qdrant_client.query_batch_points(
+            collection_name=info.name, requests=requests(query_filter)
+        )
+    except Exception as e:
+        print(f"Error during batch search: {str(e)}")
+        if not namespace or settings.qdrant_multitenancy:
+            raise
+        # Same fallback as search_similar: retry without the namespace filter
+        print(f"Namespace filtering failed, trying without namespace filter...")
+        responses = await qdrant_client.query_batch_points(
+            collection_name=info.name, requests=requests(None)
+        )
+        cacheable = False
+        query_filter = None
+
+    # Neighbour chunks for every query come back in one scroll
+    formatted = await _with_neighbours(
+        qdrant_client,
+        info,
+        [
+            _format_hits(
+                _diversify(
+                    response.points,
+                    embedding,
+                    top_k,
+                    lambda_mult,
+                    info.vector_name,
+                    _fuses(info, mode),
+                )
+            )
+            for (_, embedding), response in zip(searched, responses)
+        ],
+        query_filter,
+    )
+    print(f"Batch search completed in {round(time.time() - t0, 4)} seconds")
+
+    for (indices, embedding), formatted_results in zip(searched, formatted):
+        for i in indices:
+            results[i] = formatted_results
+        if cacheable:
+            cache.put(
+                cache_keys[indices[0]],
+                namespace,
+                top_k,
+                embedding,
+                formatted_results,
+                version,
+                cache_mode,
+            )
+    return results
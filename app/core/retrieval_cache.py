@@ -0,0 +1,345 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.core.config import get_settings
+from app.core.embedding_cache import normalize_text, text_hash
+
+_retrieval_cache: Optional["RetrievalCache"] = None
+_collection_version: Optional["SharedVersion"] = None
+
+
+class SharedVersion:
+    """
+    Collection version shared between processes through a small file.
+
+    Every write to the collection stores a fresh random token in the file,
+    so a write made by another uvicorn worker, replica on the same volume or
+    bulk_ingest run invalidates this process's cache as well. The file is
+    re-read at most every `check_interval` seconds; writes made by this
+    process are seen immediately.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version = ""
+        self._version = self._read()
+        self._checked = time.monotonic()
+
+    def _read(self) -> str:
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                return fh.read().strip()
+        except FileNotFoundError:
+            return ""
+        except OSError as e:
+            print(f"Warning: could not read collection version: {e}")
+            return self._version
+
+    def get(self) -> str:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked >= self.check_interval:
+                self._version = self._read()
+                self._checked = now
+            return self._version
+
+    def bump(self) -> str:
+        version = uuid.uuid4().hex
+        with self._lock:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # Replace atomically so readers never see a torn token
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as fh:
+                    fh.write(version)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Warning: could not share collection version: {e}")
+            self._version = version
+            self._checked = time.monotonic()
+        return version
+
+
+def _get_collection_version() -> SharedVersion:
+    global _collection_version
+    if _collection_version is None:
+        settings = get_settings()
+        _collection_version = SharedVersion(
+            settings.retrieval_cache_version_path,
+            settings.retrieval_cache_version_check,
+        )
+    return _collection_version
+
+
+def get_collection_version() -> str:
+    return _get_collection_version().get()
+
+
+def bump_collection_version() -> str:
+    """Mark the collection as changed so cached retrievals are invalidated"""
+    return _get_collection_version().bump()
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of key frequencies for TinyLFU admission.
+
+    Counters are halved every `sample_size` increments so old popularity
+    fades and new hot queries can win admission.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4, sample_size: int = 40960):
+        self.width = width
+        self.depth = depth
+        self.sample_size = sample_size
+        self._table = np.zeros((depth, width), dtype=np.uint32)
+        self._additions = 0
+
+    def _cells(self, key: str) -> List[int]:
+        digest = bytes.fromhex(key)
+        return [
+            int.from_bytes(digest[4 * row : 4 * row + 4], "little") % self.width
+            for row in range(self.depth)
+        ]
+
+    def increment(self, key: str) -> None:
+        for row, cell in enumerate(self._cells(key)):
+            self._table[row, cell] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._table >>= 1
+            self._additions //= 2
+
+    def estimate(self, key: str) -> int:
+        return int(
+            min(self._table[row, cell] for row, cell in enumerate(self._cells(key)))
+        )
+
+
+@dataclass
+class _Entry:
+    key: str
+    bucket: Tuple[Optional[str], int, str]
+    vector: Optional[np.ndarray]
+    results: List[Dict[str, Any]]
+    size: int
+    created: float
+
+
+class RetrievalCache:
+    """
+    In-memory cache of search_similar results.
+
+    Entries are keyed by (normalized query, namespace, top_k, retrieval
+    mode). When the exact query misses, a semantic lookup reuses an entry
+    for the same namespace, top_k and mode whose query embedding is within `semantic_threshold` cosine
+    similarity. search_similar only does the semantic lookup in dense mode:
+    in hybrid mode two nearly identical embeddings can still differ in the
+    exact terms the sparse side matches, so those queries reuse exact hits
+    only. Every lookup is counted once, as a hit, a semantic hit or a miss. The cache is bounded by an estimate of its size in bytes:
+    eviction is LRU, and TinyLFU admission keeps a one-off query from
+    displacing an entry that is asked for more often. Everything is dropped
+    as soon as the shared collection version changes, and entries older
+    than `max_age` seconds (0 = no limit) are misses either way.
+    """
+
+    def __init__(
+        self, max_bytes: int, semantic_threshold: float = 0.95, max_age: float = 300
+    ):
+        self.max_bytes = max_bytes
+        self.semantic_threshold = semantic_threshold
+        self.max_age = max_age
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.invalidations = 0
+        self._bytes = 0
+        self._version = get_collection_version()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Stacked query vectors per (namespace, top_k, mode), rebuilt on change
+        self._matrices: Dict[Tuple[Optional[str], int, str], Tuple[List[str], Any]] = {}
+        self._sketch = FrequencySketch()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        query: str, namespace: Optional[str], top_k: int, mode: str = "dense"
+    ) -> str:
+        normalized = normalize_text(query).lower()
+        return text_hash(f"{normalized}\x1f{namespace or ''}\x1f{top_k}\x1f{mode}")
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Exact lookup by cache key, counted as a miss when absent"""
+        with self._lock:
+            self._sync_version()
+            self._sketch.increment(key)
+            entry = self._entries.get(key)
+            if entry is None or self._expire(entry):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.results
+
+    def get_similar(
+        self,
+        namespace: Optional[str],
+        top_k: int,
+        vector: Sequence[float],
+        mode: str = "dense",
+        lookups: int = 1,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Semantic lookup after `lookups` exact misses for the same query.
+
+        A hit turns those misses into semantic hits; a miss stays counted
+        once, by get().
+        """
+        query = _unit(vector)
+        bucket = (namespace, top_k, mode)
+        with self._lock:
+            self._sync_version()
+            if bucket not in self._matrices:
+                keys = [
+                    entry.key
+                    for entry in self._entries.values()
+                    if entry.bucket == bucket and entry.vector is not None
+                ]
+                matrix = (
+                    np.stack([self._entries[k].vector for k in keys]) if keys else None
+                )
+                self._matrices[bucket] = (keys, matrix)
+            keys, matrix = self._matrices[bucket]
+
+            if matrix is not None and matrix.shape[1] == query.shape[0]:
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.semantic_threshold and not self._expire(
+                    self._entries[keys[best]]
+                ):
+                    self._entries.move_to_end(keys[best])
+                    self.misses -= lookups
+                    self.semantic_hits += lookups
+                    return self._entries[keys[best]].results
+            return None
+
+    def put(
+        self,
+        key: str,
+        namespace: Optional[str],
+        top_k: int,
+        vector: Optional[Sequence[float]],
+        results: List[Dict[str, Any]],
+        version: str,
+        mode: str = "dense",
+    ) -> None:
+        """Store results that were computed against collection `version`"""
+        unit = _unit(vector) if vector is not None else None
+        size = len(json.dumps(results, default=str))
+        size += unit.nbytes if unit is not None else 0
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._sync_version()
+            if version != self._version:
+                # The collection changed while this search was in flight
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._forget(old)
+
+            frequency = self._sketch.estimate(key)
+            while self._bytes + size > self.max_bytes and self._entries:
+                victim = next(iter(self._entries.values()))
+                if self._sketch.estimate(victim.key) > frequency:
+                    self.rejections += 1
+                    return
+                del self._entries[victim.key]
+                self._forget(victim)
+                self.evictions += 1
+
+            entry = _Entry(
+                key, (namespace, top_k, mode), unit, results, size, time.monotonic()
+            )
+            self._entries[key] = entry
+            self._bytes += size
+            self._matrices.pop(entry.bucket, None)
+
+    def _expire(self, entry: _Entry) -> bool:
+        """Drop an entry older than max_age; True if it was dropped"""
+        if not self.max_age or time.monotonic() - entry.created < self.max_age:
+            return False
+        del self._entries[entry.key]
+        self._forget(entry)
+        return True
+
+    def _forget(self, entry: _Entry) -> None:
+        self._bytes -= entry.size
+        self._matrices.pop(entry.bucket, None)
+
+    def _sync_version(self) -> None:
+        version = get_collection_version()
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._matrices.clear()
+            self._bytes = 0
+            self._version = version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.semantic_hits + self.misses
+        hits = self.hits + self.semantic_hits
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "rejections": self.rejections,
+            "invalidations": self.invalidations,
+            "collection_version": self._version,
+        }
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+def get_retrieval_cache() -> Optional[RetrievalCache]:
+    """Return the process-wide retrieval cache, or None when it is disabled"""
+    global _retrieval_cache
+    settings = get_settings()
+    if not settings.retrieval_cache_enabled:
+        return None
+    if _retrieval_cache is None:
+        _retrieval_cache = RetrievalCache(
+            max_bytes=settings.retrieval_cache_max_bytes,
+            semantic_threshold=settings.retrieval_cache_semantic_threshold,
+            max_age=settings.retrieval_cache_max_age,
+        )
+    return _retrieval_cache
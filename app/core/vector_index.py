@@ -0,0 +1,980 @@
+import asyncio
+import json
+import math
+import os
+import shutil
+import sqlite3
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from qdrant_client.http.models import QueryResponse
+from qdrant_client.hybrid.fusion import reciprocal_rank_fusion
+from qdrant_client.models import (
+    CountResult,
+    Distance,
+    FieldCondition,
+    Filter,
+    FusionQuery,
+    KeywordIndexParams,
+    MatchAny,
+    MatchExcept,
+    MatchValue,
+    Modifier,
+    PayloadIndexInfo,
+    QueryRequest,
+    PayloadSelectorExclude,
+    PayloadSelectorInclude,
+    PointIdsList,
+    Record,
+    SetPayloadOperation,
+    ScoredPoint,
+    SparseVector,
+    SparseVectorParams,
+    UpdateResult,
+    UpdateStatus,
+    VectorParams,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process lock
+    fcntl = None
+
+_CONFIG_FILE = "collection.json"
+_POINTS_FILE = "points.sqlite3"
+_LOCK_FILE = ".lock"
+_INITIAL_CAPACITY = 1024
+
+# Payload fields kept out of memory; they are read from SQLite for results only
+_COLD_FIELDS = ("text",)
+
+
+def _get_path(payload: Dict[str, Any], key: str) -> Any:
+    value: Any = payload
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _set_path(payload: Dict[str, Any], key: str, value: Any) -> None:
+    parts = key.split(".")
+    for part in parts[:-1]:
+        payload = payload.setdefault(part, {})
+    payload[parts[-1]] = value
+
+
+def _without_path(payload: Dict[str, Any], key: str) -> Dict[str, Any]:
+    head, _, rest = key.partition(".")
+    if head not in payload:
+        return payload
+    payload = dict(payload)
+    if rest and isinstance(payload[head], dict):
+        payload[head] = _without_path(payload[head], rest)
+    elif not rest:
+        del payload[head]
+    return payload
+
+
+def select_payload(payload: Dict[str, Any], with_payload: Any) -> Optional[Dict]:
+    """Apply a Qdrant with_payload selector (bool, key list, include/exclude)"""
+    if with_payload is True:
+        return payload
+    if not with_payload:
+        return None
+    if isinstance(with_payload, PayloadSelectorExclude):
+        for key in with_payload.exclude:
+            payload = _without_path(payload, key)
+        return payload
+    keys = (
+        with_payload.include
+        if isinstance(with_payload, PayloadSelectorInclude)
+        else with_payload
+    )
+    selected: Dict[str, Any] = {}
+    for key in keys:
+        value = _get_path(payload, key)
+        if value is not None:
+            _set_path(selected, key, value)
+    return selected
+
+
+def _match(value: Any, condition: FieldCondition) -> bool:
+    values = value if isinstance(value, list) else [value]
+    match = condition.match
+    if isinstance(match, MatchValue):
+        return match.value in values
+    if isinstance(match, MatchAny):
+        return any(v in match.any for v in values)
+    if isinstance(match, MatchExcept):
+        return value is not None and not any(v in match.except_ for v in values)
+    if condition.range is not None:
+        bounds = condition.range
+        return any(
+            isinstance(v, (int, float))
+            and (bounds.gt is None or v > bounds.gt)
+            and (bounds.gte is None or v >= bounds.gte)
+            and (bounds.lt is None or v < bounds.lt)
+            and (bounds.lte is None or v <= bounds.lte)
+            for v in values
+        )
+    raise ValueError(f"Unsupported condition for the local vector index: {condition}")
+
+
+class _Collection:
+    """
+    One collection: dense vectors in memory-mapped float32 files, payloads
+    and sparse vectors in SQLite.
+
+    Rows are assigned in insertion order and reused when a point ID is
+    upserted again. Dense search is an exact batched dot product over the
+    mapped matrix; sparse search walks in-memory postings lists and applies
+    the IDF modifier from live document frequencies, as Qdrant does.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, _CONFIG_FILE)) as f:
+            self.config = json.load(f)
+        # Collections created before is_tenant was recorded store the type only
+        self.config["payload_indexes"] = {
+            field: (
+                {"type": spec, "is_tenant": False} if isinstance(spec, str) else spec
+            )
+            for field, spec in self.config["payload_indexes"].items()
+        }
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            os.path.join(path, _POINTS_FILE), check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS points ("
+            "row INTEGER PRIMARY KEY, point_id TEXT UNIQUE NOT NULL, "
+            "payload TEXT NOT NULL, sparse TEXT)"
+        )
+        self.conn.commit()
+
+        self.ids: List[Any] = []
+        self.rows: Dict[str, int] = {}
+        self.payloads: List[Dict[str, Any]] = []
+        self.sparse_rows: List[Dict[str, Tuple[List[int], List[float]]]] = []
+        self.postings: Dict[str, Dict[int, Dict[int, float]]] = {
+            name: {} for name in self.config["sparse_vectors"]
+        }
+        self.keyword_indexes: Dict[str, Dict[Any, Set[int]]] = {}
+        self.matrices: Dict[str, np.memmap] = {}
+
+        for row, point_id, payload, sparse in self.conn.execute(
+            "SELECT row, point_id, payload, sparse FROM points ORDER BY row"
+        ):
+            self.ids.append(json.loads(point_id))
+            self.rows[point_id] = row
+            self.payloads.append(self._hot(json.loads(payload)))
+            self.sparse_rows.append({})
+            self._set_sparse(row, json.loads(sparse) if sparse else {})
+        for name in self.config["vectors"]:
+            self.matrices[name] = self._open_matrix(name, max(len(self.ids), 1))
+        for field in self.config["payload_indexes"]:
+            self._build_keyword_index(field)
+
+    @staticmethod
+    def create(
+        path: str,
+        vectors: Dict[str, Dict[str, Any]],
+        sparse_vectors: Dict[str, Dict[str, Any]],
+    ) -> "_Collection":
+        os.makedirs(path)
+        with open(os.path.join(path, _CONFIG_FILE), "w") as f:
+            json.dump(
+                {
+                    "vectors": vectors,
+                    "sparse_vectors": sparse_vectors,
+                    "payload_indexes": {},
+                },
+                f,
+            )
+        return _Collection(path)
+
+    def _save_config(self) -> None:
+        tmp = os.path.join(self.path, _CONFIG_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.config, f)
+        os.replace(tmp, os.path.join(self.path, _CONFIG_FILE))
+
+    @staticmethod
+    def _hot(payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in payload.items() if k not in _COLD_FIELDS}
+
+    # Dense vectors
+
+    def _matrix_file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name or 'vector'}.f32")
+
+    def _open_matrix(self, name: str, rows: int) -> np.memmap:
+        dimension = self.config["vectors"][name]["size"]
+        filename = self._matrix_file(name)
+        capacity = _INITIAL_CAPACITY
+        if os.path.exists(filename):
+            capacity = max(capacity, os.path.getsize(filename) // (4 * dimension))
+        while capacity < rows:
+            capacity *= 2
+        size = capacity * dimension * 4
+        with open(filename, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(
+            filename, dtype=np.float32, mode="r+", shape=(capacity, dimension)
+        )
+
+    def _reserve(self, rows: int) -> None:
+        for name, matrix in list(self.matrices.items()):
+            if matrix.shape[0] < rows:
+                matrix.flush()
+                del self.matrices[name]
+                self.matrices[name] = self._open_matrix(name, rows)
+
+    def _prepare_dense(self, name: str, vector: Sequence[float]) -> np.ndarray:
+        params = self.config["vectors"][name]
+        array = np.asarray(vector, dtype=np.float32)
+        if array.shape != (params["size"],):
+            raise ValueError(
+                f"Vector '{name}' must have {params['size']} dimensions, "
+                f"got {array.shape}"
+            )
+        if params["distance"] == Distance.COSINE:
+            norm = np.linalg.norm(array)
+            if norm:
+                array = array / norm
+        return array
+
+    # Sparse vectors and payload indexes
+
+    def _set_sparse(
+        self, row: int, sparse: Dict[str, Tuple[List[int], List[float]]]
+    ) -> None:
+        for name, (indices, _) in self.sparse_rows[row].items():
+            for index in indices:
+                posting = self.postings[name].get(index)
+                if posting is not None:
+                    posting.pop(row, None)
+        for name, (indices, values) in sparse.items():
+            postings = self.postings[name]
+            for index, value in zip(indices, values):
+                postings.setdefault(index, {})[row] = value
+        self.sparse_rows[row] = sparse
+
+    def _build_keyword_index(self, field: str) -> None:
+        index: Dict[Any, Set[int]] = {}
+        for row, payload in enumerate(self.payloads):
+            self._index_value(index, row, _get_path(payload, field))
+        self.keyword_indexes[field] = index
+
+    @staticmethod
+    def _index_value(index: Dict[Any, Set[int]], row: int, value: Any) -> None:
+        for v in value if isinstance(value, list) else [value]:
+            if isinstance(v, (str, int, bool)):
+                index.setdefault(v, set()).add(row)
+
+    def _unindex(self, row: int) -> None:
+        for field, index in self.keyword_indexes.items():
+            value = _get_path(self.payloads[row], field)
+            for v in value if isinstance(value, list) else [value]:
+                rows = index.get(v) if isinstance(v, (str, int, bool)) else None
+                if rows is not None:
+                    rows.discard(row)
+
+    def create_payload_index(self, field: str, schema: Any) -> None:
+        # A plain type name or index params such as KeywordIndexParams
+        kind = getattr(schema, "type", schema)
+        self.config["payload_indexes"][field] = {
+            "type": str(getattr(kind, "value", kind)),
+            "is_tenant": bool(getattr(schema, "is_tenant", False)),
+        }
+        self._save_config()
+        self._build_keyword_index(field)
+
+    # Writes
+
+    def upsert(self, points: Iterable[Any]) -> None:
+        rows: List[Tuple[int, str, Dict[str, Any], Dict[str, Any]]] = []
+        dense: Dict[str, List[Tuple[int, np.ndarray]]] = {n: [] for n in self.matrices}
+        assigned: Dict[str, int] = {}
+        next_row = len(self.ids)
+        for point in points:
+            key = json.dumps(point.id)
+            row = self.rows.get(key, assigned.get(key))
+            if row is None:
+                row = assigned[key] = next_row
+                next_row += 1
+            vectors = (
+                point.vector if isinstance(point.vector, dict) else {"": point.vector}
+            )
+            sparse: Dict[str, Any] = {}
+            for name, vector in vectors.items():
+                if isinstance(vector, SparseVector):
+                    if name not in self.postings:
+                        raise ValueError(f"Unknown sparse vector '{name}'")
+                    sparse[name] = (list(vector.indices), list(vector.values))
+                elif name in self.matrices:
+                    dense[name].append((row, self._prepare_dense(name, vector)))
+                else:
+                    raise ValueError(f"Unknown vector '{name}'")
+            rows.append((row, key, point.payload or {}, sparse))
+
+        self._reserve(next_row)
+        for name, items in dense.items():
+            matrix = self.matrices[name]
+            for row, vector in items:
+                matrix[row] = vector
+            matrix.flush()
+        # Vectors are on disk before the rows that reference them are committed
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO points (row, point_id, payload, sparse) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (row, key, json.dumps(payload), json.dumps(sparse) if sparse else None)
+                for row, key, payload, sparse in rows
+            ],
+        )
+        self.conn.commit()
+
+        for row, key, payload, sparse in rows:
+            if row == len(self.ids):
+                self.ids.append(json.loads(key))
+                self.rows[key] = row
+                self.payloads.append({})
+                self.sparse_rows.append({})
+            else:
+                self._unindex(row)
+            self.payloads[row] = self._hot(payload)
+            self._set_sparse(row, sparse)
+            for field, index in self.keyword_indexes.items():
+                self._index_value(index, row, _get_path(self.payloads[row], field))
+
+    def set_payload(
+        self, point_id: Any, payload: Dict[str, Any], key: Optional[str]
+    ) -> None:
+        """Merge payload into a point's payload, or into its object at key"""
+        row = self.rows.get(json.dumps(point_id))
+        if row is None:
+            return
+        full = self.full_payloads([row])[row]
+        target = full
+        for part in key.split(".") if key else ():
+            target = target.setdefault(part, {})
+        target.update(payload)
+        self.conn.execute(
+            "UPDATE points SET payload = ? WHERE row = ?", (json.dumps(full), row)
+        )
+        self._unindex(row)
+        self.payloads[row] = self._hot(full)
+        for field, index in self.keyword_indexes.items():
+            self._index_value(index, row, _get_path(self.payloads[row], field))
+
+    def delete(self, point_ids: Iterable[Any]) -> None:
+        """Delete points, moving the last rows into the freed ones"""
+        keys = [json.dumps(point_id) for point_id in point_ids]
+        # Highest first, so the row moved into a gap is never one still to go
+        for row in sorted({self.rows[k] for k in keys if k in self.rows}, reverse=True):
+            last = len(self.ids) - 1
+            self._unindex(row)
+            self._set_sparse(row, {})
+            del self.rows[json.dumps(self.ids[row])]
+            self.conn.execute("DELETE FROM points WHERE row = ?", (row,))
+            if row != last:
+                sparse = self.sparse_rows[last]
+                self._unindex(last)
+                self._set_sparse(last, {})
+                for matrix in self.matrices.values():
+                    matrix[row] = matrix[last]
+                self.ids[row] = self.ids[last]
+                self.rows[json.dumps(self.ids[row])] = row
+                self.payloads[row] = self.payloads[last]
+                self._set_sparse(row, sparse)
+                for field, index in self.keyword_indexes.items():
+                    self._index_value(index, row, _get_path(self.payloads[row], field))
+                self.conn.execute(
+                    "UPDATE points SET row = ? WHERE row = ?", (row, last)
+                )
+            self.ids.pop()
+            self.payloads.pop()
+            self.sparse_rows.pop()
+        for matrix in self.matrices.values():
+            matrix.flush()
+        self.conn.commit()
+
+    # Reads
+
+    def mask(self, query_filter: Optional[Filter]) -> Optional[np.ndarray]:
+        """Boolean row mask of a filter, or None when every row matches"""
+        if query_filter is None:
+            return None
+        count = len(self.ids)
+        mask = np.ones(count, dtype=bool)
+        for condition in query_filter.must or []:
+            mask &= self._condition_mask(condition)
+        if query_filter.should:
+            should = np.zeros(count, dtype=bool)
+            for condition in query_filter.should:
+                should |= self._condition_mask(condition)
+            mask &= should
+        for condition in query_filter.must_not or []:
+            mask &= ~self._condition_mask(condition)
+        return mask
+
+    def _condition_mask(self, condition: Any) -> np.ndarray:
+        count = len(self.ids)
+        if isinstance(condition, Filter):
+            mask = self.mask(condition)
+            return np.ones(count, dtype=bool) if mask is None else mask
+        if not isinstance(condition, FieldCondition):
+            raise ValueError(
+                f"Unsupported condition for the local vector index: {condition}"
+            )
+        index = self.keyword_indexes.get(condition.key)
+        match = condition.match
+        if index is not None and isinstance(match, (MatchValue, MatchAny)):
+            values = [match.value] if isinstance(match, MatchValue) else match.any
+            mask = np.zeros(count, dtype=bool)
+            for value in values:
+                rows = index.get(value)
+                if rows:
+                    mask[list(rows)] = True
+            return mask
+        return np.fromiter(
+            (
+                _match(_get_path(payload, condition.key), condition)
+                for payload in self.payloads
+            ),
+            dtype=bool,
+            count=count,
+        )
+
+    def search_dense(
+        self, name: str, vector: Sequence[float], mask: Optional[np.ndarray], limit: int
+    ) -> List[Tuple[int, float]]:
+        count = len(self.ids)
+        if name not in self.matrices:
+            raise ValueError(f"Unknown vector '{name}'")
+        if not count:
+            return []
+        query = self._prepare_dense(name, vector)
+        if mask is not None:
+            rows = np.flatnonzero(mask)
+            if len(rows) < count // 2:
+                # Selective filters (one namespace of many) only read and
+                # score their own rows, so cost follows the namespace size
+                scores = self.matrices[name][rows] @ query
+                return [
+                    (int(rows[i]), score) for i, score in self._top(scores, None, limit)
+                ]
+        scores = self.matrices[name][:count] @ query
+        return self._top(scores, mask, limit)
+
+    def search_sparse(
+        self,
+        name: str,
+        vector: SparseVector,
+        mask: Optional[np.ndarray],
+        limit: int,
+    ) -> List[Tuple[int, float]]:
+        postings = self.postings.get(name)
+        if postings is None:
+            raise ValueError(f"Unknown sparse vector '{name}'")
+        use_idf = self.config["sparse_vectors"][name].get("modifier") == "idf"
+        documents = sum(1 for sparse in self.sparse_rows if sparse.get(name))
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        matched = np.zeros(len(self.ids), dtype=bool)
+        for index, weight in zip(vector.indices, vector.values):
+            posting = postings.get(index)
+            if not posting:
+                continue
+            rows = np.fromiter(posting.keys(), dtype=np.int64, count=len(posting))
+            values = np.fromiter(posting.values(), dtype=np.float32, count=len(posting))
+            if use_idf:
+                frequency = len(posting)
+                weight *= math.log(
+                    (documents - frequency + 0.5) / (frequency + 0.5) + 1.0
+                )
+            scores[rows] += weight * values
+            matched[rows] = True
+        return self._top(scores, matched if mask is None else matched & mask, limit)
+
+    @staticmethod
+    def _top(
+        scores: np.ndarray, mask: Optional[np.ndarray], limit: int
+    ) -> List[Tuple[int, float]]:
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        limit = min(limit, len(scores))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(row), float(scores[row])) for row in top if scores[row] > -np.inf]
+
+    def full_payloads(self, rows: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        if not rows:
+            return {}
+        placeholders = ",".join("?" * len(rows))
+        return {
+            row: json.loads(payload)
+            for row, payload in self.conn.execute(
+                f"SELECT row, payload FROM points WHERE row IN ({placeholders})",
+                list(rows),
+            )
+        }
+
+    def vectors(self, row: int, with_vectors: Any) -> Any:
+        if not with_vectors:
+            return None
+        names = (
+            with_vectors
+            if isinstance(with_vectors, list)
+            else list(self.matrices) + list(self.postings)
+        )
+        vectors: Dict[str, Any] = {}
+        for name in names:
+            if name in self.matrices:
+                vectors[name] = self.matrices[name][row].tolist()
+            elif name in self.sparse_rows[row]:
+                indices, values = self.sparse_rows[row][name]
+                vectors[name] = SparseVector(indices=indices, values=values)
+        if list(vectors) == [""]:
+            return vectors[""]
+        return vectors
+
+    def describe(self) -> SimpleNamespace:
+        vectors: Any = {
+            name: VectorParams(size=params["size"], distance=params["distance"])
+            for name, params in self.config["vectors"].items()
+        }
+        if list(vectors) == [""]:
+            vectors = vectors[""]
+        sparse_vectors = {
+            name: SparseVectorParams(modifier=params.get("modifier"))
+            for name, params in self.config["sparse_vectors"].items()
+        }
+        count = len(self.ids)
+        # The subset of qdrant_client's CollectionInfo the app reads
+        return SimpleNamespace(
+            status="green",
+            optimizers_status="ok",
+            vectors_count=count,
+            indexed_vectors_count=count,
+            points_count=count,
+            config=SimpleNamespace(
+                params=SimpleNamespace(
+                    vectors=vectors, sparse_vectors=sparse_vectors or None
+                ),
+                quantization_config=None,
+            ),
+            payload_schema={
+                field: PayloadIndexInfo(
+                    data_type=spec["type"],
+                    params=(
+                        KeywordIndexParams(type="keyword", is_tenant=True)
+                        if spec["is_tenant"]
+                        else None
+                    ),
+                    points=count,
+                )
+                for field, spec in self.config["payload_indexes"].items()
+            },
+        )
+
+    def close(self) -> None:
+        for matrix in self.matrices.values():
+            matrix.flush()
+        self.matrices.clear()
+        self.conn.close()
+
+
+class LocalVectorIndex:
+    """
+    Embedded vector store with the subset of the AsyncQdrantClient API that
+    the app uses, for deployments without a Qdrant server.
+
+    Each collection is a directory under `path`. Search is exact (no
+    quantization or HNSW), which stays fast for the few hundred thousand
+    chunks a single node holds. Hybrid queries fuse dense and sparse
+    prefetches with the same RRF as qdrant_client's local mode. Work runs in
+    a thread so the event loop stays responsive.
+
+    Like qdrant_client's path mode, only one process may open `path` at a
+    time: an exclusive lock file is taken on open and released by close().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = self._acquire(path)
+        self._collections: Dict[str, _Collection] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _acquire(path: str) -> Any:
+        """Lock the storage folder against other processes"""
+        lock_file = open(os.path.join(path, _LOCK_FILE), "w")
+        if fcntl is None:
+            return lock_file
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(
+                f"Storage folder {path} is already accessed by another instance "
+                f"of the local vector index. Use one process (e.g. a single "
+                f"uvicorn worker) or a Qdrant server for concurrent access."
+            ) from None
+        return lock_file
+
+    def _dir(self, name: str) -> str:
+        if not name or os.sep in name or name.startswith("."):
+            raise ValueError(f"Invalid collection name '{name}'")
+        return os.path.join(self.path, name)
+
+    def _get(self, name: str) -> _Collection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                if not os.path.exists(os.path.join(self._dir(name), _CONFIG_FILE)):
+                    raise ValueError(f"Collection {name} not found")
+                collection = self._collections[name] = _Collection(self._dir(name))
+            return collection
+
+    async def collection_exists(self, collection_name: str) -> bool:
+        return os.path.exists(os.path.join(self._dir(collection_name), _CONFIG_FILE))
+
+    async def get_collection(self, collection_name: str) -> SimpleNamespace:
+        collection = self._get(collection_name)
+
+        def read() -> SimpleNamespace:
+            with collection.lock:
+                return collection.describe()
+
+        return await asyncio.to_thread(read)
+
+    async def create_collection(
+        self,
+        collection_name: str,
+        vectors_config: Any,
+        sparse_vectors_config: Optional[Dict[str, SparseVectorParams]] = None,
+        **kwargs: Any,
+    ) -> bool:
+        """Create a collection; storage and quantization options are ignored"""
+        if await self.collection_exists(collection_name):
+            raise ValueError(f"Collection {collection_name} already exists")
+        named = (
+            vectors_config if isinstance(vectors_config, dict) else {"": vectors_config}
+        )
+        vectors = {}
+        for name, params in named.items():
+            distance = Distance(params.distance)
+            if distance not in (Distance.COSINE, Distance.DOT):
+                raise ValueError(f"Unsupported distance {distance} for '{name}'")
+            vectors[name] = {"size": params.size, "distance": distance.value}
+        sparse_vectors = {
+            name: {"modifier": "idf" if params.modifier == Modifier.IDF else None}
+            for name, params in (sparse_vectors_config or {}).items()
+        }
+
+        def write() -> None:
+            with self._lock:
+                self._collections[collection_name] = _Collection.create(
+                    self._dir(collection_name), vectors, sparse_vectors
+                )
+
+        await asyncio.to_thread(write)
+        return True
+
+    async def delete_collection(self, collection_name: str, **kwargs: Any) -> bool:
+        def write() -> bool:
+            with self._lock:
+                collection = self._collections.pop(collection_name, None)
+                if collection is not None:
+                    with collection.lock:
+                        collection.close()
+                path = self._dir(collection_name)
+                if not os.path.exists(path):
+                    return False
+                shutil.rmtree(path)
+                return True
+
+        return await asyncio.to_thread(write)
+
+    async def create_payload_index(
+        self,
+        collection_name: str,
+        field_name: str,
+        field_schema: Any = None,
+        **kwargs: Any,
+    ) -> UpdateResult:
+        collection = self._get(collection_name)
+
+        def write() -> None:
+            with collection.lock:
+                collection.create_payload_index(field_name, field_schema)
+
+        await asyncio.to_thread(write)
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    async def upsert(
+        self, collection_name: str, points: Sequence[Any], **kwargs: Any
+    ) -> UpdateResult:
+        collection = self._get(collection_name)
+
+        def write() -> None:
+            with collection.lock:
+                collection.upsert(points)
+
+        await asyncio.to_thread(write)
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    async def delete(
+        self, collection_name: str, points_selector: Any, **kwargs: Any
+    ) -> UpdateResult:
+        """Delete points by ID (a list or PointIdsList)"""
+        if isinstance(points_selector, PointIdsList):
+            points_selector = points_selector.points
+        if not isinstance(points_selector, list):
+            raise ValueError(
+                f"The local vector index only deletes points by ID: {points_selector}"
+            )
+        collection = self._get(collection_name)
+
+        def write() -> None:
+            with collection.lock:
+                collection.delete(points_selector)
+
+        await asyncio.to_thread(write)
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    async def batch_update_points(
+        self, collection_name: str, update_operations: Sequence[Any], **kwargs: Any
+    ) -> List[UpdateResult]:
+        """Apply set_payload operations on point IDs in one transaction"""
+        collection = self._get(collection_name)
+        for operation in update_operations:
+            if not (
+                isinstance(operation, SetPayloadOperation)
+                and operation.set_payload.points is not None
+            ):
+                raise ValueError(
+                    f"Unsupported update for the local vector index: {operation}"
+                )
+
+        def write() -> None:
+            with collection.lock:
+                for operation in update_operations:
+                    update = operation.set_payload
+                    for point_id in update.points:
+                        collection.set_payload(point_id, update.payload, update.key)
+                collection.conn.commit()
+
+        await asyncio.to_thread(write)
+        return [
+            UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+            for _ in update_operations
+        ]
+
+    def _records(
+        self,
+        collection: _Collection,
+        hits: Sequence[Tuple[int, float]],
+        with_payload: Any,
+        with_vectors: Any,
+    ) -> List[ScoredPoint]:
+        payloads = (
+            collection.full_payloads([row for row, _ in hits]) if with_payload else {}
+        )
+        return [
+            ScoredPoint(
+                id=collection.ids[row],
+                version=0,
+                score=score,
+                payload=select_payload(payloads.get(row, {}), with_payload),
+                vector=collection.vectors(row, with_vectors),
+            )
+            for row, score in hits
+        ]
+
+    def _search(
+        self,
+        collection: _Collection,
+        query: Any,
+        using: Optional[str],
+        query_filter: Optional[Filter],
+        limit: int,
+    ) -> List[Tuple[int, float]]:
+        mask = collection.mask(query_filter)
+        if isinstance(query, SparseVector):
+            return collection.search_sparse(using or "", query, mask, limit)
+        return collection.search_dense(using or "", query, mask, limit)
+
+    def _query(self, collection: _Collection, request: QueryRequest) -> QueryResponse:
+        """Run one query request; the caller holds the collection lock"""
+        limit = request.limit if request.limit is not None else 10
+        offset = request.offset or 0
+        if request.prefetch:
+            if not isinstance(request.query, FusionQuery):
+                raise ValueError(
+                    "The local vector index only fuses prefetches with RRF"
+                )
+            prefetches = (
+                request.prefetch
+                if isinstance(request.prefetch, list)
+                else [request.prefetch]
+            )
+            candidates = [
+                [
+                    ScoredPoint(id=row, version=0, score=score)
+                    for row, score in self._search(
+                        collection,
+                        p.query,
+                        p.using,
+                        p.filter or request.filter,
+                        p.limit or limit,
+                    )
+                ]
+                for p in prefetches
+            ]
+            fused = reciprocal_rank_fusion(candidates, limit + offset)
+            hits = [(int(point.id), point.score) for point in fused]
+        else:
+            hits = self._search(
+                collection, request.query, request.using, request.filter, limit + offset
+            )
+        hits = hits[offset:]
+        if request.score_threshold is not None:
+            hits = [hit for hit in hits if hit[1] >= request.score_threshold]
+        return QueryResponse(
+            points=self._records(
+                collection, hits, request.with_payload, request.with_vector
+            )
+        )
+
+    async def query_points(
+        self,
+        collection_name: str,
+        query: Any = None,
+        using: Optional[str] = None,
+        prefetch: Any = None,
+        query_filter: Optional[Filter] = None,
+        search_params: Any = None,
+        limit: int = 10,
+        offset: Optional[int] = None,
+        with_payload: Any = True,
+        with_vectors: Any = False,
+        score_threshold: Optional[float] = None,
+        **kwargs: Any,
+    ) -> QueryResponse:
+        request = QueryRequest(
+            prefetch=prefetch,
+            query=query,
+            using=using,
+            filter=query_filter,
+            params=search_params,
+            limit=limit,
+            offset=offset,
+            with_payload=with_payload,
+            with_vector=with_vectors,
+            score_threshold=score_threshold,
+        )
+        return (await self.query_batch_points(collection_name, [request]))[0]
+
+    async def query_batch_points(
+        self, collection_name: str, requests: Sequence[QueryRequest], **kwargs: Any
+    ) -> List[QueryResponse]:
+        """Run several query requests under one lock acquisition"""
+        collection = self._get(collection_name)
+
+        def run() -> List[QueryResponse]:
+            with collection.lock:
+                return [self._query(collection, request) for request in requests]
+
+        return await asyncio.to_thread(run)
+
+    async def retrieve(
+        self,
+        collection_name: str,
+        ids: Sequence[Any],
+        with_payload: Any = True,
+        with_vectors: Any = False,
+        **kwargs: Any,
+    ) -> List[Record]:
+        collection = self._get(collection_name)
+
+        def read() -> List[Record]:
+            with collection.lock:
+                rows = [collection.rows.get(json.dumps(point_id)) for point_id in ids]
+                hits = [(row, 0.0) for row in rows if row is not None]
+                return [
+                    Record(id=point.id, payload=point.payload, vector=point.vector)
+                    for point in self._records(
+                        collection, hits, with_payload, with_vectors
+                    )
+                ]
+
+        return await asyncio.to_thread(read)
+
+    async def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[Filter] = None,
+        limit: int = 10,
+        offset: Any = None,
+        with_payload: Any = True,
+        with_vectors: Any = False,
+        **kwargs: Any,
+    ) -> Tuple[List[Record], Any]:
+        """Page through points in insertion order; offsets are point IDs"""
+        collection = self._get(collection_name)
+
+        def read() -> Tuple[List[Record], Any]:
+            with collection.lock:
+                start = 0 if offset is None else collection.rows[json.dumps(offset)]
+                mask = collection.mask(scroll_filter)
+                rows = np.arange(start, len(collection.ids))
+                if mask is not None:
+                    rows = rows[mask[start:]]
+                page = [(int(row), 0.0) for row in rows[:limit]]
+                next_offset = (
+                    collection.ids[int(rows[limit])] if len(rows) > limit else None
+                )
+                records = [
+                    Record(id=point.id, payload=point.payload, vector=point.vector)
+                    for point in self._records(
+                        collection, page, with_payload, with_vectors
+                    )
+                ]
+                return records, next_offset
+
+        return await asyncio.to_thread(read)
+
+    async def count(
+        self,
+        collection_name: str,
+        count_filter: Optional[Filter] = None,
+        **kwargs: Any,
+    ) -> CountResult:
+        collection = self._get(collection_name)
+
+        def read() -> int:
+            with collection.lock:
+                mask = collection.mask(count_filter)
+                return len(collection.ids) if mask is None else int(mask.sum())
+
+        return CountResult(count=await asyncio.to_thread(read))
+
+    async def close(self, **kwargs: Any) -> None:
+        with self._lock:
+            for collection in self._collections.values():
+                with collection.lock:
+                    collection.close()
+            self._collections.clear()
+            # Closing the file releases the inter-process lock
+            self._lock_file.close()
@@ -1,7 +1,12 @@
 from fastmcp import FastMCP
-from app.core.qdrant_client import search_similar
+from typing import List
+from app.core.qdrant_client import search_similar, search_similar_batch
 import json
 from app.agents.tools import build_web_search_tool
+from app.utils.search_results import (
+    format_batch_search_results,
+    format_search_results,
+)
 
 # Create MCP instance
 mcp = FastMCP(name="Agents MCP Server")
@@ -14,7 +19,19 @@ mcp = FastMCP(name="Agents MCP Server")
 async def search_knowledgebase(query: str) -> str:
     try:
         results = await search_similar(query, top_k=5)
-        return json.dumps(results)
+        return format_search_results(results)
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+
+@mcp.tool(
+    name="search_knowledgebase_batch",
+    description="Search the knowledgebase for several queries in one call.",
+)
+async def search_knowledgebase_batch(queries: List[str]) -> str:
+    try:
+        results = await search_similar_batch(queries, top_k=5)
+        return format_batch_search_results(queries, results)
     except Exception as e:
         return json.dumps({"error": str(e)})
 
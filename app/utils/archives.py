@@ -0,0 +1,158 @@
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Tuple
+from fastapi import UploadFile
+from app.core.config import get_settings
+from app.utils.parsing import is_supported_file
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+
+# Members larger than this spill from memory to a temporary file
+_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+class ArchiveLimitError(ValueError):
+    """An archive has more members or decompressed bytes than allowed"""
+
+
+class _ArchiveBudget:
+    """Tracks members and declared decompressed bytes against the limits"""
+
+    def __init__(self, archive_name: str):
+        settings = get_settings()
+        self.archive_name = archive_name
+        self.max_members = settings.archive_max_members
+        self.max_bytes = settings.archive_max_bytes
+        self.members = 0
+        self.bytes = 0
+
+    def charge(self, size: int) -> None:
+        self.members += 1
+        self.bytes += size
+        if self.members > self.max_members:
+            raise ArchiveLimitError(
+                f"{self.archive_name} has more than {self.max_members} files"
+            )
+        if self.bytes > self.max_bytes:
+            raise ArchiveLimitError(
+                f"{self.archive_name} expands to more than {self.max_bytes} bytes"
+            )
+
+
+def is_archive(filename: str) -> bool:
+    return (filename or "").lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _spool(source: BinaryIO) -> BinaryIO:
+    """Copy a member into its own temporary file, rewound for reading"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_MEMORY)
+    shutil.copyfileobj(source, spooled, length=1024 * 1024)
+    spooled.seek(0)
+    return spooled
+
+
+def check_archive_limits(
+    fileobj: BinaryIO,
+    archive_name: str,
+    include: Optional[Callable[[str], bool]] = None,
+) -> None:
+    """
+    Raise ArchiveLimitError if the selected members of an archive exceed
+    ARCHIVE_MAX_MEMBERS or ARCHIVE_MAX_BYTES, without extracting anything.
+
+    Zip archives are checked from their central directory. Tar archives are
+    scanned header by header (decompressing .tar.gz once) and then rewound,
+    so the file must be seekable.
+    """
+    budget = _ArchiveBudget(archive_name)
+    start = fileobj.tell()
+    try:
+        if archive_name.lower().endswith(".zip"):
+            with zipfile.ZipFile(fileobj) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir() and (not include or include(info.filename)):
+                        budget.charge(info.file_size)
+            return
+
+        with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+            for info in archive:
+                if info.isfile() and (not include or include(info.name)):
+                    budget.charge(info.size)
+    finally:
+        fileobj.seek(start)
+
+
+def check_archive_uploads(files: Iterable[UploadFile]) -> None:
+    """Check the limits of every archive among the uploads
+
+    Only members with a supported extension count, as only those are
+    ingested.
+    """
+    for f in files:
+        if is_archive(f.filename):
+            check_archive_limits(f.file, f.filename, is_supported_file)
+
+
+def iter_archive_members(
+    fileobj: BinaryIO,
+    archive_name: str,
+    include: Optional[Callable[[str], bool]] = None,
+) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Yield (member name, readable file) for every regular file in an archive.
+
+    Each member is copied into its own spooled temporary file (in memory up
+    to 8 MiB) before the next one is read, and must be closed by the caller.
+    Members therefore stay readable after the archive is closed and can be
+    parsed concurrently, without extracting the whole archive at once.
+    Members rejected by `include` are skipped without being read.
+
+    Raises ArchiveLimitError before yielding anything if the selected
+    members exceed ARCHIVE_MAX_MEMBERS or ARCHIVE_MAX_BYTES, so an oversized
+    archive is never partially ingested. The one exception is a tar stream
+    that cannot be rewound: it is checked as it is read, so the members
+    before the one over the limit have already been yielded. Both formats
+    record each member's uncompressed size and never read past it, so the
+    declared sizes are hard bounds.
+    """
+    if archive_name.lower().endswith(".zip") or fileobj.seekable():
+        check_archive_limits(fileobj, archive_name, include)
+    budget = _ArchiveBudget(archive_name)
+    if archive_name.lower().endswith(".zip"):
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or (include and not include(info.filename)):
+                    continue
+                budget.charge(info.file_size)
+                with archive.open(info) as source:
+                    yield info.filename, _spool(source)
+        return
+
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for info in archive:
+            if not info.isfile() or (include and not include(info.name)):
+                continue
+            budget.charge(info.size)
+            source = archive.extractfile(info)
+            if source is None:
+                continue
+            yield info.name, _spool(source)
+
+
+def member_upload_name(archive_name: str, member_name: str) -> str:
+    return f"{os.path.basename(archive_name)}/{member_name}"
+
+
+def iter_archive_uploads(
+    fileobj: BinaryIO,
+    archive_name: str,
+    include: Optional[Callable[[str], bool]] = None,
+) -> Iterator[UploadFile]:
+    """Wrap archive members as UploadFiles named '<archive>/<member>'"""
+    for member_name, member in iter_archive_members(fileobj, archive_name, include):
+        yield UploadFile(
+            file=member, filename=member_upload_name(archive_name, member_name)
+        )
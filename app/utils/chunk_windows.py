@@ -0,0 +1,111 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def join_overlapping(first: str, second: str, probe: int = 16) -> str:
+    """Concatenate two chunks, dropping the text repeated by chunk overlap
+
+    The overlap is the longest tail of first that starts second; tails
+    shorter than probe characters are not treated as overlap.
+    """
+    head = second[:probe]
+    start = first.find(head) if head else -1
+    while start != -1:
+        if second.startswith(first[start:]):
+            return first[:start] + second
+        start = first.find(head, start + 1)
+    return f"{first}\n…\n{second}"
+
+
+def chunk_position(result: Dict[str, Any]) -> Optional[Tuple[Any, str, int]]:
+    """(namespace, source, chunk_id) of a hit, or None when it lacks them"""
+    metadata = result.get("metadata") or {}
+    source, chunk_id = metadata.get("source"), metadata.get("chunk_id")
+    if not source or not isinstance(chunk_id, int):
+        return None
+    return metadata.get("namespace"), source, chunk_id
+
+
+def neighbour_chunk_ids(results: List[Dict[str, Any]], window: int) -> Dict[Any, set]:
+    """
+    Chunk IDs within ±window of each hit that are not hits themselves,
+    keyed by (namespace, source).
+    """
+    present: Dict[Any, set] = {}
+    for result in results:
+        position = chunk_position(result)
+        if position is not None:
+            present.setdefault(position[:2], set()).add(position[2])
+
+    wanted: Dict[Any, set] = {}
+    for key, chunk_ids in present.items():
+        ids = {
+            neighbour
+            for chunk_id in chunk_ids
+            for neighbour in range(max(chunk_id - window, 0), chunk_id + window + 1)
+        }
+        if ids - chunk_ids:
+            wanted[key] = ids - chunk_ids
+    return wanted
+
+
+def merge_adjacent_chunks(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge hits of the same document with consecutive chunk_ids into spans.
+
+    A span's text is its chunks in order without the overlap they share,
+    its score the best of its hits, and its metadata the first chunk's with
+    chunk_end set to the last chunk_id. Hits without a score (neighbours
+    fetched for context) only survive as part of a span with a scored hit.
+    Spans are ordered by score; hits without a source or chunk_id are kept
+    as they are.
+    """
+    by_document: Dict[Any, List[Dict[str, Any]]] = {}
+    spans: List[Dict[str, Any]] = []
+    for result in results:
+        position = chunk_position(result)
+        if position is None:
+            spans.append(result)
+        else:
+            by_document.setdefault(position[:2], []).append(result)
+
+    for hits in by_document.values():
+        hits.sort(key=lambda hit: hit["metadata"]["chunk_id"])
+        run: List[Dict[str, Any]] = []
+        for hit in hits + [None]:
+            if (
+                hit is not None
+                and run
+                and hit["metadata"]["chunk_id"] <= run[-1]["metadata"]["chunk_id"] + 1
+            ):
+                if hit["metadata"]["chunk_id"] > run[-1]["metadata"]["chunk_id"]:
+                    run.append(hit)
+                continue
+            if run:
+                span = _span(run)
+                if span.get("score") is not None:
+                    spans.append(span)
+            run = [hit]
+
+    def score(result: Dict[str, Any]) -> float:
+        value = result.get("score")
+        return float("-inf") if value is None else value
+
+    spans.sort(key=score, reverse=True)
+    return spans
+
+
+def _span(run: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if len(run) == 1:
+        return run[0]
+    text = run[0].get("text") or ""
+    for hit in run[1:]:
+        text = join_overlapping(text, hit.get("text") or "")
+    scores = [hit["score"] for hit in run if hit.get("score") is not None]
+    return {
+        "text": text,
+        "score": max(scores) if scores else None,
+        "metadata": {
+            **run[0]["metadata"],
+            "chunk_end": run[-1]["metadata"]["chunk_id"],
+        },
+    }
@@ -1,4 +1,10 @@
-from typing import List
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Sequence
 
 try:
     from chonkie import TokenChunker
@@ -6,11 +12,122 @@ except Exception:
     TokenChunker = None  # type: ignore
 
 from llama_index.core.node_parser import TokenTextSplitter
+from llama_index.core.utils import get_tokenizer
+from app.core.config import get_settings
 
+_chunk_pool: Optional[ProcessPoolExecutor] = None
+_chunk_pool_lock = threading.Lock()
 
-def chunk_text(text: str) -> List[str]:
+
+@dataclass(frozen=True)
+class TextChunk:
+    """A chunk of text and the number of tokens the chunker counted for it"""
+
+    text: str
+    token_count: int
+
+
+@lru_cache(maxsize=8)
+def get_chunker(chunk_size: int, chunk_overlap: int):
+    """Build one chunker per (size, overlap) and reuse it across calls"""
     if TokenChunker is not None:
-        chunker = TokenChunker(chunk_size=800, chunk_overlap=120)
-        return [c.text for c in chunker.chunk(text) if c.text.strip()]
-    splitter = TokenTextSplitter(chunk_size=800, chunk_overlap=120)
-    return splitter.split_text(text)
+        return TokenChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return TokenTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+def _chunk_document(text: str, chunk_size: int, chunk_overlap: int) -> List[TextChunk]:
+    chunker = get_chunker(chunk_size, chunk_overlap)
+    if TokenChunker is not None:
+        return [
+            TextChunk(c.text, c.token_count)
+            for c in chunker.chunk(text)
+            if c.text.strip()
+        ]
+    tokenizer = get_tokenizer()
+    return [
+        TextChunk(chunk, len(tokenizer(chunk))) for chunk in chunker.split_text(text)
+    ]
+
+
+def get_chunk_pool() -> ProcessPoolExecutor:
+    global _chunk_pool
+    with _chunk_pool_lock:
+        if _chunk_pool is None:
+            settings = get_settings()
+            _chunk_pool = ProcessPoolExecutor(
+                max_workers=settings.chunk_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _chunk_pool
+
+
+def _recycle_chunk_pool(pool: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    """Replace a broken pool, if it is still current, and return the current one"""
+    global _chunk_pool
+    with _chunk_pool_lock:
+        if _chunk_pool is pool:
+            _chunk_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+    return get_chunk_pool()
+
+
+def chunk_texts(
+    texts: Sequence[str],
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+) -> List[List[TextChunk]]:
+    """
+    Chunk many documents in one call, returning chunks aligned to the inputs.
+
+    Documents longer than CHUNK_PARALLEL_THRESHOLD characters are fanned out
+    to the chunking process pool (each worker keeps its own cached chunker);
+    the rest are chunked in-process with the shared chunker. If a worker
+    dies the pool is replaced and its documents are submitted once more.
+    """
+    settings = get_settings()
+    chunk_size = chunk_size or settings.chunk_size
+    chunk_overlap = settings.chunk_overlap if chunk_overlap is None else chunk_overlap
+
+    large = [
+        i
+        for i, text in enumerate(texts)
+        if len(text) > settings.chunk_parallel_threshold
+    ]
+    futures = {}
+    if large:
+        pool = get_chunk_pool()
+        try:
+            futures = {
+                i: pool.submit(_chunk_document, texts[i], chunk_size, chunk_overlap)
+                for i in large
+            }
+        except (BrokenProcessPool, RuntimeError):
+            # Broken, or shut down by a concurrent call since we fetched it
+            pool = _recycle_chunk_pool(pool)
+            futures = {
+                i: pool.submit(_chunk_document, texts[i], chunk_size, chunk_overlap)
+                for i in large
+            }
+
+    results = [
+        [] if i in futures else _chunk_document(text, chunk_size, chunk_overlap)
+        for i, text in enumerate(texts)
+    ]
+    for i, future in futures.items():
+        try:
+            results[i] = future.result()
+        except BrokenProcessPool:
+            retry = _recycle_chunk_pool(pool)
+            results[i] = retry.submit(
+                _chunk_document, texts[i], chunk_size, chunk_overlap
+            ).result()
+    return results
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for budgeting"""
+    return max(1, (len(text) + 3) // 4)
+
+
+def chunk_text(text: str) -> List[str]:
+    return [chunk.text for chunk in chunk_texts([text])[0]]
@@ -0,0 +1,83 @@
+import hashlib
+from functools import lru_cache
+from typing import List, Set, Tuple
+import numpy as np
+from app.core.embedding_cache import normalize_text
+
+# Universal hashing of 61-bit shingle hashes modulo a Mersenne prime
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_SEED = 1
+
+
+def shingles(text: str, size: int = 5) -> Set[bytes]:
+    """Word n-gram shingles of the normalized, lower-cased text"""
+    words = normalize_text(text).lower().split()
+    if len(words) <= size:
+        return {" ".join(words).encode("utf-8")}
+    return {
+        " ".join(words[i : i + size]).encode("utf-8")
+        for i in range(len(words) - size + 1)
+    }
+
+
+@lru_cache(maxsize=4)
+def _permutations(num_perm: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.RandomState(_SEED)
+    a = rng.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash(text: str, num_perm: int = 128, shingle_size: int = 5) -> np.ndarray:
+    """MinHash signature (num_perm uint32 values) of a text's shingles"""
+    hashes = np.array(
+        [
+            int.from_bytes(hashlib.blake2b(s, digest_size=8).digest(), "little")
+            & ((1 << 61) - 1)
+            for s in shingles(text, shingle_size)
+        ],
+        dtype=np.uint64,
+    )
+    a, b = _permutations(num_perm)
+    # uint64 products wrap around, as in the usual numpy MinHash formulation
+    with np.errstate(over="ignore"):
+        permuted = (np.outer(hashes, a) + b) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimate_similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    return float(np.count_nonzero(left == right)) / len(left)
+
+
+@lru_cache(maxsize=16)
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) so the LSH S-curve switches just below `threshold`.
+
+    Pairs with similarity s collide in at least one band with probability
+    1 - (1 - s^rows)^bands, which crosses 0.5 near (1 / bands)^(1 / rows).
+    Erring low trades a few extra verified candidates for better recall.
+    """
+    best = (num_perm, 1)
+    best_gap = float("inf")
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        knee = (1.0 / bands) ** (1.0 / rows)
+        if knee <= threshold and threshold - knee < best_gap:
+            best, best_gap = (bands, rows), threshold - knee
+    return best
+
+
+def band_keys(signature: np.ndarray, bands: int, rows: int) -> List[bytes]:
+    """One bucket key per band; similar signatures share at least one"""
+    return [
+        band.to_bytes(2, "little")
+        + hashlib.blake2b(
+            signature[band * rows : (band + 1) * rows].tobytes(), digest_size=8
+        ).digest()
+        for band in range(bands)
+    ]
@@ -0,0 +1,65 @@
+from typing import List, Optional, Sequence
+import numpy as np
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def scale_scores(scores: Sequence[float]) -> np.ndarray:
+    """Min-max scale ranking scores (e.g. RRF) to [0, 1], best = 1"""
+    scores = np.asarray(scores, dtype=np.float32)
+    if len(scores) == 0:
+        return scores
+    spread = scores.max() - scores.min()
+    if spread <= 0:
+        return np.ones_like(scores)
+    return (scores - scores.min()) / spread
+
+
+def mmr_select(
+    query_vector: Optional[Sequence[float]],
+    candidate_vectors: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float = 0.5,
+    relevance: Optional[Sequence[float]] = None,
+) -> List[int]:
+    """
+    Pick k candidates by maximal marginal relevance.
+
+    Each step takes the candidate maximizing
+    lambda_mult * sim(query, c) - (1 - lambda_mult) * max sim(c, selected),
+    so near-copies of an already selected chunk lose to distinct content.
+    lambda_mult=1 is plain relevance order, 0 is maximal diversity. Returns
+    candidate indices in selection order.
+
+    `relevance` replaces sim(query, c) when the candidates were ranked by
+    something other than dense similarity, such as hybrid RRF scores (see
+    scale_scores); query_vector is then unused.
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    if k <= 0 or len(candidates) == 0:
+        return []
+    candidates = _unit_rows(candidates)
+
+    if relevance is None:
+        query = _unit_rows(np.asarray(query_vector, dtype=np.float32))
+        relevance = candidates @ query
+    else:
+        relevance = np.asarray(relevance, dtype=np.float32)
+    # Pairwise similarities are computed once; the loop only takes maxima
+    similarity = candidates @ candidates.T
+    redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+
+    selected = [int(np.argmax(relevance))]
+    available[selected[0]] = False
+    while len(selected) < min(k, len(candidates)):
+        redundancy = np.maximum(redundancy, similarity[selected[-1]])
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+    return selected
@@ -1,19 +1,365 @@
-import io
+import codecs
+import mmap
+import multiprocessing
+import os
+import re
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import (
+    CancelledError,
+    Future,
+    ProcessPoolExecutor,
+    TimeoutError as FutureTimeout,
+)
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Iterator, List, Optional, Tuple
 from fastapi import UploadFile
 from pypdf import PdfReader
+from app.core.config import get_settings
 
+# PDFs, and plain text decoded as UTF-8 (latin-1 for invalid bytes)
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".md", ".csv")
 
-def read_file_to_text(upload: UploadFile) -> str:
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+# Read size for streaming copies and incremental text decoding
+_BLOCK_SIZE = 1024 * 1024
+
+# surrogateescape decodes each byte that is not valid UTF-8 to U+DC80-U+DCFF
+_ESCAPED_BYTES = re.compile("[\udc80-\udcff]+")
+_LATIN1_BYTES = {0xDC00 + byte: byte for byte in range(0x80, 0x100)}
+
+# How often a range that has not started yet is checked on
+_RANGE_POLL_SECONDS = 0.5
+
+
+def is_supported_file(filename: Optional[str]) -> bool:
+    return (filename or "").lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            settings = get_settings()
+            # spawn avoids forking the threaded uvicorn process
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=settings.pdf_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_pool
+
+
+def _recycle_pdf_pool(pool: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    """
+    Replace a broken or stuck pool and return the current one.
+
+    Only the pool that is still current is torn down, so ingests that hit
+    the same failure at once replace it a single time. Its workers are
+    terminated: shutdown() alone leaves a worker stuck on a page running.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+            processes = list((getattr(pool, "_processes", None) or {}).values())
+            pool.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.terminate()
+    return get_pdf_pool()
+
+
+def _submit_range(
+    path: str, start: int, end: int
+) -> Tuple[ProcessPoolExecutor, "Future[List[Optional[str]]]"]:
+    """Submit a page range to the current pool, replacing it if it broke"""
+    page_timeout = get_settings().pdf_page_timeout
+    pool = get_pdf_pool()
+    try:
+        return pool, pool.submit(_extract_page_range, path, start, end, page_timeout)
+    except (BrokenProcessPool, RuntimeError):
+        # Broken, or shut down by a concurrent ingest since we fetched it
+        pool = _recycle_pdf_pool(pool)
+        return pool, pool.submit(_extract_page_range, path, start, end, page_timeout)
+
+
+@contextmanager
+def _mapped_file(path: str) -> Iterator[mmap.mmap]:
+    """Memory-map a file read-only so PdfReader pages it in on demand"""
+    with open(path, "rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+class _PageTimeout(Exception):
+    pass
+
+
+def _raise_page_timeout(signum, frame) -> None:
+    raise _PageTimeout()
+
+
+def _extract_page_range(
+    path: str, start: int, end: int, page_timeout: float = 0
+) -> List[Optional[str]]:
+    """
+    Extract text for pages [start, end) - runs inside a pool worker.
+
+    With a page_timeout, each page gets that many seconds from the moment
+    its own extraction starts (where SIGALRM is available), and a page that
+    runs out comes back as None. Only a pool worker's main thread can take
+    signals, so in-process calls leave it at 0.
+    """
+    timed = page_timeout > 0 and hasattr(signal, "setitimer")
+    if timed:
+        previous = signal.signal(signal.SIGALRM, _raise_page_timeout)
+    try:
+        with _mapped_file(path) as mapped:
+            reader = PdfReader(mapped)
+            pages: List[Optional[str]] = []
+            for i in range(start, end):
+                try:
+                    if timed:
+                        signal.setitimer(signal.ITIMER_REAL, page_timeout)
+                    pages.append(reader.pages[i].extract_text() or "")
+                except _PageTimeout:
+                    pages.append(None)
+                finally:
+                    if timed:
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+            return pages
+    finally:
+        if timed:
+            signal.signal(signal.SIGALRM, previous)
+
+
+def _range_result(future: "Future[List[Optional[str]]]", budget: float):
+    """
+    Wait for a submitted range, timing it from when it started running.
+
+    A range is marked running once it enters the pool's call queue, which
+    holds at most one range beyond those the workers are busy with. Workers
+    bound every page themselves, so a running range starts within one
+    range budget; it only overruns twice its budget when a page hangs where
+    the worker's timer cannot interrupt it (e.g. inside C code).
+    """
+    started = None
+    while True:
+        now = time.monotonic()
+        if started is None and (future.running() or future.done()):
+            started = now
+        if started is None:
+            wait = _RANGE_POLL_SECONDS
+        else:
+            wait = started + 2 * budget - now
+            if wait <= 0:
+                raise FutureTimeout()
+        try:
+            return future.result(timeout=min(wait, _RANGE_POLL_SECONDS))
+        except FutureTimeout:
+            continue
+
+
+def iter_pdf_pages(
+    path: str, skipped_pages: Optional[List[int]] = None
+) -> Iterator[str]:
+    """
+    Yield the text of each PDF page, in page order.
+
+    Large documents are split into page ranges that are extracted in parallel
+    on the PDF process pool; small ones are read in-process to skip the pool
+    round trip. Pool workers give each page PDF_PAGE_TIMEOUT seconds from the
+    moment they start on it; a page over budget yields empty text and its
+    1-based number is appended to skipped_pages. A range that hangs beyond
+    the workers' own timer is skipped whole and the pool is recycled to free
+    the stuck worker. Ranges lost to a crashed or recycled pool are
+    resubmitted.
+    """
+    settings = get_settings()
+    with _mapped_file(path) as mapped:
+        page_count = len(PdfReader(mapped).pages)
+    step = max(1, settings.pdf_pages_per_task)
+
+    if page_count <= step:
+        yield from _extract_page_range(path, 0, page_count)
+        return
+
+    ranges = [(i, min(i + step, page_count)) for i in range(0, page_count, step)]
+    # Keep a bounded number of ranges in flight so memory stays flat
+    window = settings.pdf_workers * 2
+    pending: List[list] = []
+    next_range = 0
+
+    def resubmit(dead_pool: ProcessPoolExecutor) -> None:
+        # Every range still queued on a replaced pool is lost with it
+        for entry in pending:
+            if entry[2] is dead_pool:
+                entry[2:] = _submit_range(path, entry[0], entry[1])
+
+    while next_range < len(ranges) or pending:
+        while next_range < len(ranges) and len(pending) < window:
+            start, end = ranges[next_range]
+            pending.append([start, end, *_submit_range(path, start, end)])
+            next_range += 1
+
+        start, end, pool, future = pending[0]
+        try:
+            if settings.pdf_page_timeout > 0:
+                budget = settings.pdf_page_timeout * (end - start)
+                pages = _range_result(future, budget)
+            else:
+                pages = future.result()
+        except FutureTimeout:
+            print(f"Timed out extracting pages {start + 1}-{end} of {path}")
+            pending.pop(0)
+            _recycle_pdf_pool(pool)
+            resubmit(pool)
+            pages = [None] * (end - start)
+        except (BrokenProcessPool, CancelledError):
+            if pool is not get_pdf_pool():
+                # Replaced by another ingest; this range never ran to the end
+                resubmit(pool)
+                continue
+            print(f"PDF worker crashed on pages {start + 1}-{end}, retrying inline")
+            pending.pop(0)
+            _recycle_pdf_pool(pool)
+            resubmit(pool)
+            pages = _extract_page_range(path, start, end)
+        else:
+            pending.pop(0)
+
+        for number, page in enumerate(pages, start + 1):
+            if page is None:
+                print(f"Timed out extracting page {number} of {path}")
+                if skipped_pages is not None:
+                    skipped_pages.append(number)
+            yield page or ""
+
+
+def _local_path(upload: UploadFile) -> Optional[str]:
+    """Return the on-disk path backing an upload, if it has one"""
+    name = getattr(upload.file, "name", None)
+    if not isinstance(name, str):
+        return None
+    try:
+        # Archive members expose a name too, but aren't backed by that file
+        upload.file.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+    return name if os.path.isfile(name) else None
+
+
+@contextmanager
+def spooled_upload_path(upload: UploadFile, suffix: str = "") -> Iterator[str]:
+    """
+    Yield a filesystem path holding the upload's bytes.
+
+    Uploads already backed by a named file are used in place; anything else
+    is streamed block by block into a temporary file that is removed
+    afterwards, so the upload is never materialised in memory.
+    """
+    path = _local_path(upload)
+    if path is not None:
+        yield path
+        return
+
+    upload.file.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        shutil.copyfileobj(upload.file, tmp, length=_BLOCK_SIZE)
+    try:
+        yield tmp.name
+    finally:
+        os.unlink(tmp.name)
+
+
+def iter_decoded_text(stream: BinaryIO) -> Iterator[str]:
+    """
+    Decode a byte stream incrementally, one block at a time.
+
+    Text is decoded as UTF-8. Bytes that are not valid UTF-8 are read as
+    latin-1 one at a time, so a stray byte does not garble the UTF-8 text
+    around it and latin-1 files still decode. A multi-byte sequence cut off
+    at the end of an otherwise valid UTF-8 stream becomes U+FFFD.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="surrogateescape")
+    mixed = False
+
+    while True:
+        block = stream.read(_BLOCK_SIZE)
+        final = not block
+        text = decoder.decode(block, final=final)
+        if _ESCAPED_BYTES.search(text):
+            if final and not mixed:
+                text = _ESCAPED_BYTES.sub("\ufffd", text)
+            else:
+                mixed = True
+                text = text.translate(_LATIN1_BYTES)
+        if text:
+            yield text
+        if final:
+            break
+
+
+def iter_file_text(
+    upload: UploadFile, skipped_pages: Optional[List[int]] = None
+) -> Iterator[str]:
+    """
+    Yield an upload's text as consecutive pieces.
+
+    PDFs yield one piece per page (separated by newlines) from a
+    memory-mapped file; other files are decoded incrementally, so neither
+    path needs the raw bytes and the decoded text in memory at once. PDF
+    pages that timed out are collected in skipped_pages.
+    """
     filename = upload.filename or ""
-    content = upload.file.read()
     if filename.lower().endswith(".pdf"):
-        with io.BytesIO(content) as buf:
-            reader = PdfReader(buf)
-            texts = []
-            for page in reader.pages:
-                texts.append(page.extract_text() or "")
-            return "\n".join(texts)
-    try:
-        return content.decode("utf-8")
-    except Exception:
-        return content.decode("latin-1", errors="ignore")
+        # Pool workers open the PDF by path, so make sure it has one
+        with spooled_upload_path(upload, suffix=".pdf") as path:
+            for i, page in enumerate(iter_pdf_pages(path, skipped_pages)):
+                if i:
+                    yield "\n"
+                yield page
+        return
+
+    upload.file.seek(0)
+    yield from iter_decoded_text(upload.file)
+
+
+def iter_text_segments(
+    upload: UploadFile,
+    skipped_pages: Optional[List[int]] = None,
+    min_chars: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yield an upload's text in groups of pages or blocks.
+
+    Pieces from iter_file_text (PDF pages, decoded blocks) are joined and
+    cut into groups of min_chars (INGEST_SEGMENT_CHARS) characters, so the
+    ingest pipeline can chunk the start of a document while the rest is
+    still parsed. The last group may be shorter; empty files yield nothing.
+    """
+    min_chars = min_chars or get_settings().ingest_segment_chars
+    pieces: List[str] = []
+    size = 0
+    for piece in iter_file_text(upload, skipped_pages):
+        pieces.append(piece)
+        size += len(piece)
+        if size >= min_chars:
+            text = "".join(pieces)
+            cut = size - size % min_chars
+            for start in range(0, cut, min_chars):
+                yield text[start : start + min_chars]
+            pieces, size = [text[cut:]], size - cut
+    if size:
+        yield "".join(pieces)
+
+
+def read_file_to_text(
+    upload: UploadFile, skipped_pages: Optional[List[int]] = None
+) -> str:
+    return "".join(iter_file_text(upload, skipped_pages))
@@ -0,0 +1,255 @@
+import json
+from typing import Any, Dict, List, Optional
+from app.core.config import get_settings
+from app.utils.chunk_windows import join_overlapping
+from app.utils.chunking import estimate_tokens
+
+TOOL_RESULT_FORMATS = ("compact", "json")
+
+# Estimated cost of a block header ("[1] source#3 (score 0.912)") and the
+# smallest cut-down hit worth appending when the budget runs out
+HEADER_TOKENS = 10
+MIN_PARTIAL_TOKENS = 40
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """Cut text to at most max_chars (0 = no limit), preferring a word boundary"""
+    if not max_chars or len(text) <= max_chars:
+        return text
+    cut = text[: max_chars - 1]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def _chunk_label(metadata: Dict[str, Any]) -> Optional[str]:
+    chunk_id = metadata.get("chunk_id")
+    if chunk_id is None:
+        return None
+    chunk_end = metadata.get("chunk_end")
+    return f"{chunk_id}-{chunk_end}" if chunk_end is not None else str(chunk_id)
+
+
+def _reference(metadata: Dict[str, Any]) -> str:
+    source = metadata.get("source") or "unknown"
+    label = _chunk_label(metadata)
+    return f"{source}#{label}" if label is not None else source
+
+
+def _options(fmt: Optional[str], max_chars: Optional[int], max_tokens: Optional[int]):
+    settings = get_settings()
+    fmt = fmt or settings.tool_result_format
+    if fmt not in TOOL_RESULT_FORMATS:
+        raise ValueError(
+            f"TOOL_RESULT_FORMAT must be one of {', '.join(TOOL_RESULT_FORMATS)}, "
+            f"got '{fmt}'"
+        )
+    return (
+        fmt,
+        settings.tool_result_max_chars if max_chars is None else max_chars,
+        settings.tool_result_max_tokens if max_tokens is None else max_tokens,
+    )
+
+
+def _merge_by_source(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One block per source, in chunk order, ranked by its best hit"""
+    groups: Dict[Any, List[Dict[str, Any]]] = {}
+    for i, result in enumerate(results):
+        source = (result.get("metadata") or {}).get("source")
+        groups.setdefault(source if source else i, []).append(result)
+
+    merged = []
+    for hits in groups.values():
+        if len(hits) == 1:
+            merged.append(hits[0])
+            continue
+        chunk_ids = [(hit.get("metadata") or {}).get("chunk_id") for hit in hits]
+        if all(isinstance(chunk_id, int) for chunk_id in chunk_ids):
+            hits = [hit for _, hit in sorted(zip(chunk_ids, hits), key=lambda x: x[0])]
+        labels = [_chunk_label(hit.get("metadata") or {}) for hit in hits]
+        text = hits[0].get("text") or ""
+        for hit in hits[1:]:
+            text = join_overlapping(text, hit.get("text") or "")
+        scores = [hit["score"] for hit in hits if hit.get("score") is not None]
+        merged.append(
+            {
+                "text": text,
+                "score": max(scores) if scores else None,
+                "metadata": {
+                    **(hits[0].get("metadata") or {}),
+                    "chunk_id": ",".join(label for label in labels if label) or None,
+                    "chunk_end": None,
+                },
+            }
+        )
+    return merged
+
+
+def pack_search_results(
+    results: List[Dict[str, Any]], max_tokens: int
+) -> List[Dict[str, Any]]:
+    """
+    Fit search hits into a token budget (0 = no limit).
+
+    Hits are taken in score order while they fit, the last one cut down to
+    the tokens left, so the lowest-scored hits are dropped first. Hits from
+    the same source are then merged into one block in chunk order, without
+    the text repeated by chunk overlap.
+    """
+
+    def score(result: Dict[str, Any]) -> float:
+        value = result.get("score")
+        return float("-inf") if value is None else value
+
+    kept: List[Dict[str, Any]] = []
+    remaining = max_tokens
+    for result in sorted(results, key=score, reverse=True):
+        cost = estimate_tokens(result.get("text") or "") + HEADER_TOKENS
+        if max_tokens and cost > remaining:
+            # The best hit is always returned, cut down if needed
+            available = max(
+                remaining - HEADER_TOKENS, 0 if kept else MIN_PARTIAL_TOKENS
+            )
+            if available >= MIN_PARTIAL_TOKENS:
+                text = truncate_text(result.get("text") or "", available * 4)
+                kept.append({**result, "text": text})
+            break
+        kept.append(result)
+        remaining -= cost
+    return _merge_by_source(kept)
+
+
+def _compact(results: List[Dict[str, Any]], max_chars: int) -> str:
+    if not results:
+        return "No results."
+    blocks = []
+    for i, result in enumerate(results, 1):
+        header = f"[{i}] {_reference(result.get('metadata') or {})}"
+        if result.get("score") is not None:
+            header += f" (score {result['score']:.3f})"
+        blocks.append(f"{header}\n{truncate_text(result.get('text') or '', max_chars)}")
+    return "\n\n".join(blocks)
+
+
+def _slim(results: List[Dict[str, Any]], max_chars: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "text": truncate_text(result.get("text") or "", max_chars),
+            "source": _reference(result.get("metadata") or {}),
+            "score": (
+                round(result["score"], 4) if result.get("score") is not None else None
+            ),
+        }
+        for result in results
+    ]
+
+
+def _dumps(value: Any) -> str:
+    # Non-ASCII text (Hindi, Tamil, ...) stays as is instead of \u escapes,
+    # which cost several tokens per character
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def format_search_results(
+    results: List[Dict[str, Any]],
+    fmt: Optional[str] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> str:
+    """
+    Serialize search hits for an LLM tool response.
+
+    "compact" renders one numbered block per hit, headed by its source and
+    chunk; "json" is a minified list of {text, source, score}. Hits are
+    packed into max_tokens (TOOL_RESULT_MAX_TOKENS by default, 0 = no limit)
+    with pack_search_results, and each text is cut to max_chars
+    (TOOL_RESULT_MAX_CHARS by default, 0 = full text).
+    """
+    fmt, max_chars, max_tokens = _options(fmt, max_chars, max_tokens)
+    results = pack_search_results(results, max_tokens)
+    if fmt == "json":
+        return _dumps(_slim(results, max_chars))
+    return _compact(results, max_chars)
+
+
+def format_batch_search_results(
+    queries: List[str],
+    results: List[List[Dict[str, Any]]],
+    fmt: Optional[str] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> str:
+    """
+    Serialize the aligned results of a batch search, grouped by query.
+
+    The max_tokens budget covers the whole call: it is shared evenly between
+    the queries, and what a query leaves unused goes to the following ones.
+    """
+    fmt, max_chars, max_tokens = _options(fmt, max_chars, max_tokens)
+    packed = []
+    remaining = max_tokens
+    for i, query_results in enumerate(results):
+        budget = max(remaining // (len(results) - i), 1) if max_tokens else 0
+        packed.append(pack_search_results(query_results, budget))
+        remaining -= sum(
+            estimate_tokens(result.get("text") or "") + HEADER_TOKENS
+            for result in packed[-1]
+        )
+    if fmt == "json":
+        return _dumps(
+            [
+                {"query": query, "results": _slim(query_results, max_chars)}
+                for query, query_results in zip(queries, packed)
+            ]
+        )
+    return "\n\n".join(
+        f"## {query}\n{_compact(query_results, max_chars)}"
+        for query, query_results in zip(queries, packed)
+    )
+
+
+def format_web_results(
+    query: str,
+    answer: Optional[str],
+    results: List[Dict[str, Any]],
+    max_tokens: Optional[int] = None,
+    max_chars: int = 200,
+) -> str:
+    """
+    Serialize Tavily web search results for an LLM tool response.
+
+    The answer, when present, comes first; the page snippets, cut to
+    max_chars, then share what is left of max_tokens (TOOL_RESULT_MAX_TOKENS
+    by default), packed by score like knowledge base hits.
+    """
+    if max_tokens is None:
+        max_tokens = get_settings().tool_result_max_tokens
+    lines = [f"Answer: {answer}"] if answer else []
+    budget = max_tokens - estimate_tokens(answer or "") if max_tokens else 0
+    hits = pack_search_results(
+        [
+            {
+                "text": truncate_text(result.get("content") or "", max_chars),
+                "score": result.get("score"),
+                "metadata": {"source": result.get("url"), "title": result.get("title")},
+            }
+            for result in results
+        ],
+        max(budget, 1) if max_tokens else 0,
+    )
+    for i, hit in enumerate(hits, 1):
+        metadata = hit["metadata"]
+        lines.append(
+            f"{i}. {metadata.get('title') or 'No title'}\n"
+            f"   Content: {hit['text']}\n"
+            f"   Source: {metadata.get('source') or 'No URL'}"
+        )
+    return _dumps(
+        {
+            "results": lines,
+            "source": "tavily_web_search",
+            "query": query,
+            "total_results": len(hits),
+        }
+    )
@@ -0,0 +1,66 @@
+import re
+import unicodedata
+import zlib
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# Words joined by - . or / (variety codes like HD-2967, doses like 0.5/ha)
+# are kept whole and also split into their parts
+_TOKEN_RE = re.compile(r"[^\W_]+(?:[-./][^\W_]+)*")
+_SPLIT_RE = re.compile(r"[-./]")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were will with what which who how when where why do does can "
+    "i me my we our you your".split()
+)
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens, with compound codes also split into parts"""
+    tokens: List[str] = []
+    for match in _TOKEN_RE.finditer(unicodedata.normalize("NFKC", text).lower()):
+        token = match.group()
+        parts = _SPLIT_RE.split(token)
+        if len(parts) > 1:
+            tokens.append(token)
+        tokens.extend(part for part in parts if part not in _STOPWORDS)
+    return tokens
+
+
+def term_index(token: str) -> int:
+    """Stable 32-bit index of a term in the sparse vector space"""
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def _to_sparse(weights: Dict[int, float]) -> Tuple[List[int], List[float]]:
+    indices = sorted(weights)
+    return indices, [weights[i] for i in indices]
+
+
+def document_vector(text: str, avg_doc_tokens: float) -> Tuple[List[int], List[float]]:
+    """
+    BM25 term weights of a document as sparse (indices, values).
+
+    Only the term-frequency part of BM25 is computed here; the collection's
+    sparse vector uses Qdrant's IDF modifier, so inverse document frequency
+    is applied server-side from live collection statistics.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return [], []
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / max(avg_doc_tokens, 1.0))
+    weights: Dict[int, float] = {}
+    for token, tf in Counter(tokens).items():
+        index = term_index(token)
+        weights[index] = weights.get(index, 0.0) + tf * (BM25_K1 + 1) / (tf + norm)
+    return _to_sparse(weights)
+
+
+def query_vector(text: str) -> Tuple[List[int], List[float]]:
+    """Unit weight per distinct query term, as sparse (indices, values)"""
+    return _to_sparse({term_index(token): 1.0 for token in set(tokenize(text))})
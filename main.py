@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.routers.ingest import router as ingest_router
 from app.api.routers.chat import router as chat_router
 import threading
+from app.core.config import get_settings
+from app.core.qdrant_client import get_collection
 from app.mcp.mcp import mcp
 
 app = FastAPI(title="AgriSaarthi RAG Service", version="0.2.0")
@@ -38,6 +40,14 @@ async def startup_event():
     mcp_thread.start()
 
     print("✅ MCP server started in background on port 8005")
+
+    # Load collection metadata once so retrieval skips the lookup
+    try:
+        await get_collection(get_settings().qdrant_collection)
+        print("✅ Qdrant collection registered")
+    except Exception as e:
+        print(f"⚠️ Could not register Qdrant collection yet, will retry lazily: {e}")
+
     print("✅ FastAPI app ready on port 8000")
 
 
@@ -52,6 +52,25 @@ def run_all_tests() -> None:
         "tests/test_agents.py",
         "tests/test_all_agents.py",
         "tests/test_markdown.py",
+        "tests/test_embedding_cache.py",
+        "tests/test_embedding_scheduler.py",
+        "tests/test_ingest_jobs.py",
+        "tests/test_ingest_pipeline.py",
+        "tests/test_bulk_ingest.py",
+        "tests/test_chunking.py",
+        "tests/test_parsing.py",
+        "tests/test_archives.py",
+        "tests/test_dedup.py",
+        "tests/test_retrieval_cache.py",
+        "tests/test_sparse.py",
+        "tests/test_vector_index.py",
+        "tests/test_upsert_points.py",
+        "tests/test_search_results.py",
+        "tests/test_search_batch.py",
+        "tests/test_multitenancy.py",
+        "tests/test_mmr.py",
+        "tests/test_chunk_windows.py",
+        "tests/test_agent_cache.py",
     ]
 
     passed = 0
@@ -83,6 +102,25 @@ def run_specific_test(test_name: str) -> None:
         print("  - agents (test_agents.py)")
         print("  - all_agents (test_all_agents.py)")
         print("  - markdown (test_markdown.py)")
+        print("  - embedding_cache (test_embedding_cache.py)")
+        print("  - embedding_scheduler (test_embedding_scheduler.py)")
+        print("  - ingest_jobs (test_ingest_jobs.py)")
+        print("  - ingest_pipeline (test_ingest_pipeline.py)")
+        print("  - bulk_ingest (test_bulk_ingest.py)")
+        print("  - chunking (test_chunking.py)")
+        print("  - parsing (test_parsing.py)")
+        print("  - archives (test_archives.py)")
+        print("  - dedup (test_dedup.py)")
+        print("  - retrieval_cache (test_retrieval_cache.py)")
+        print("  - sparse (test_sparse.py)")
+        print("  - vector_index (test_vector_index.py)")
+        print("  - upsert_points (test_upsert_points.py)")
+        print("  - search_results (test_search_results.py)")
+        print("  - search_batch (test_search_batch.py)")
+        print("  - multitenancy (test_multitenancy.py)")
+        print("  - mmr (test_mmr.py)")
+        print("  - chunk_windows (test_chunk_windows.py)")
+        print("  - agent_cache (test_agent_cache.py)")
         sys.exit(1)
 
     success = run_test_file(test_file)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request agent creation with and without the agent cache.
+
+Replays a mix of /chat requests (category, language, markdown) through
+AgentFactory.create_agent and reports the latency percentiles and peak
+memory allocated per request, then the cache's own hit rate. Only agent
+construction is measured: no chat requests are sent, but the shared Gemini
+client fetches its model metadata once when it is first built.
+
+Usage:
+    python scripts/benchmark_agent_cache.py --requests 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+# Add the parent directory to Python path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Building the Gemini client needs a key, even though no chat request is made
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+# Import after loading environment variables
+import app.agents.agent_cache as agent_cache
+from app.agents.agent_factory import AgentFactory
+
+PRIMARY_CATEGORIES = (
+    "crop_info",
+    "fertilizers",
+    "market_prices",
+    "gov_schemes",
+    "other",
+)
+LANGUAGES = ("hi-IN", "en-IN", "pa-IN", "mr-IN", "ta-IN", "te-IN")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def replay(requests: List[tuple], cache: "agent_cache.AgentCache") -> Dict[str, float]:
+    agent_cache._agent_cache = cache
+    latencies: List[float] = []
+    allocations: List[int] = []
+    tracemalloc.start()
+    for category, language, markdown in requests:
+        # High-water mark of memory allocated while creating the agent
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        t0 = time.perf_counter()
+        AgentFactory.create_agent(category, language=language, markdown=markdown)
+        latencies.append(time.perf_counter() - t0)
+        allocations.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "alloc_kib": sum(allocations) / len(allocations) / 1024,
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    """Replay the same request mix without and with the agent cache"""
+    rng = random.Random(args.seed)
+    requests = [
+        (
+            rng.choice(PRIMARY_CATEGORIES),
+            rng.choice(LANGUAGES),
+            rng.random() < args.markdown_share,
+        )
+        for _ in range(args.requests)
+    ]
+    print(
+        f"Replaying {args.requests} requests over "
+        f"{len(set(requests))} (category, language, markdown) combinations"
+    )
+
+    # max_entries=0 evicts every agent right away: a fresh build per request
+    uncached = replay(requests, agent_cache.AgentCache(max_entries=0))
+    cache = agent_cache.AgentCache(max_entries=args.max_entries)
+    cached = replay(requests, cache)
+
+    print(f"\n{'':<10} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8} {'KiB/request':>12}")
+    for label, result in (("uncached", uncached), ("cached", cached)):
+        print(
+            f"{label:<10} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+            f"{result['mean_ms']:>8.3f} {result['alloc_kib']:>12.1f}"
+        )
+    print(
+        f"\nMean latency per request: {uncached['mean_ms'] / cached['mean_ms']:.0f}x lower"
+    )
+    print(f"Agent cache: {cache.stats()}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--markdown-share", type=float, default=0.5)
+    parser.add_argument("--max-entries", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Benchmark MMR diversification of retrieved chunks.
+
+Builds a synthetic corpus shaped like the knowledge base: topical documents
+split into overlapping word windows, with part of the documents re-published
+as lightly edited copies. For random topical queries it compares plain top-k
+retrieval with MMR-diversified top-k (from MMR_FETCH_FACTOR * k candidates)
+and reports the context tokens handed to the LLM (compact tool format), the
+distinct source words those tokens cover, redundancy and mean relevance.
+Embeddings average random word vectors, so no API calls are made.
+
+Usage:
+    python scripts/benchmark_mmr.py --queries 500 --top-k 5 --mmr-top-k 3
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add the parent directory to Python path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Import after loading environment variables
+import numpy as np
+from app.core.config import get_settings
+from app.utils.chunking import estimate_tokens
+from app.utils.mmr import mmr_select
+from app.utils.search_results import format_search_results
+
+COMMON_WORDS = 2000
+TOPIC_WORDS = 400
+
+
+def make_corpus(args: argparse.Namespace) -> Dict[str, object]:
+    rng = np.random.default_rng(args.seed)
+    documents: List[Tuple[int, np.ndarray]] = []
+    for doc_id in range(args.documents):
+        topic = doc_id % args.topics
+        topical = rng.random(args.document_words) < 0.6
+        words = np.where(
+            topical,
+            COMMON_WORDS
+            + topic * TOPIC_WORDS
+            + rng.integers(TOPIC_WORDS, size=topical.size),
+            rng.integers(COMMON_WORDS, size=topical.size),
+        )
+        documents.append((doc_id, words))
+        # Re-published circulars: the same text with a few words changed
+        copies = (
+            rng.integers(1, args.max_copies + 1) if rng.random() < args.copy_rate else 0
+        )
+        for _ in range(copies):
+            copy = words.copy()
+            edits = rng.random(copy.size) < 0.03
+            copy[edits] = rng.integers(COMMON_WORDS, size=int(edits.sum()))
+            documents.append((doc_id, copy))
+
+    vocabulary = COMMON_WORDS + args.topics * TOPIC_WORDS
+    word_vectors = rng.standard_normal((vocabulary, args.dimension)).astype(np.float32)
+
+    step = args.chunk_words - args.overlap_words
+    texts, spans, vectors = [], [], []
+    for doc_id, words in documents:
+        for start in range(0, max(1, len(words) - args.overlap_words), step):
+            window = words[start : start + args.chunk_words]
+            texts.append(" ".join(f"w{word}" for word in window))
+            # Copies map back to the original document's word positions
+            spans.append((doc_id, start, start + len(window)))
+            vectors.append(word_vectors[window].mean(axis=0))
+    vectors = np.asarray(vectors)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return {
+        "texts": texts,
+        "spans": spans,
+        "vectors": vectors,
+        "word_vectors": word_vectors,
+        "rng": rng,
+    }
+
+
+def evaluate(
+    corpus: Dict[str, object], query: np.ndarray, picks: List[int]
+) -> Dict[str, float]:
+    results = [
+        {
+            "text": corpus["texts"][i],
+            "score": float(corpus["vectors"][i] @ query),
+            "metadata": {"source": f"doc{corpus['spans'][i][0]}", "chunk_id": i},
+        }
+        for i in picks
+    ]
+    context = format_search_results(results, fmt="compact", max_chars=0)
+    covered = set()
+    total = 0
+    for i in picks:
+        doc_id, start, end = corpus["spans"][i]
+        covered.update((doc_id, position) for position in range(start, end))
+        total += end - start
+    return {
+        "tokens": estimate_tokens(context),
+        "distinct_words": len(covered),
+        "redundancy": 1 - len(covered) / total if total else 0.0,
+        "relevance": float(np.mean([result["score"] for result in results])),
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    """Compare plain and MMR-diversified retrieval on the same queries"""
+    settings = get_settings()
+    lambda_mult = settings.mmr_lambda if args.mmr_lambda is None else args.mmr_lambda
+    fetch_k = args.top_k * settings.mmr_fetch_factor
+    corpus = make_corpus(args)
+    vectors = corpus["vectors"]
+    rng = corpus["rng"]
+    print(
+        f"{len(vectors)} chunks ({args.chunk_words} words, {args.overlap_words} "
+        f"overlap) from {args.documents} documents plus copies; "
+        f"{args.queries} queries, MMR lambda={lambda_mult}, fetch_k={fetch_k}"
+    )
+
+    runs = {
+        f"top-{args.top_k}": [],
+        f"MMR top-{args.top_k}": [],
+        f"MMR top-{args.mmr_top_k}": [],
+    }
+    for _ in range(args.queries):
+        topic = rng.integers(args.topics)
+        words = COMMON_WORDS + topic * TOPIC_WORDS + rng.integers(TOPIC_WORDS, size=8)
+        query = corpus["word_vectors"][words].mean(axis=0)
+        query /= np.linalg.norm(query)
+
+        candidates = np.argsort(-(vectors @ query))[:fetch_k]
+        for label, picks in (
+            (f"top-{args.top_k}", candidates[: args.top_k].tolist()),
+            (
+                f"MMR top-{args.top_k}",
+                [
+                    int(candidates[i])
+                    for i in mmr_select(
+                        query, vectors[candidates], args.top_k, lambda_mult
+                    )
+                ],
+            ),
+            (
+                f"MMR top-{args.mmr_top_k}",
+                [
+                    int(candidates[i])
+                    for i in mmr_select(
+                        query, vectors[candidates], args.mmr_top_k, lambda_mult
+                    )
+                ],
+            ),
+        ):
+            runs[label].append(evaluate(corpus, query, picks))
+
+    baseline = np.mean([run["tokens"] for run in runs[f"top-{args.top_k}"]])
+    print(
+        f"\n{'retrieval':<12} {'tokens':>8} {'vs top-k':>9} {'distinct':>9} "
+        f"{'tokens/distinct':>16} {'redundancy':>11} {'relevance':>10}"
+    )
+    for label, results in runs.items():
+        tokens = np.mean([result["tokens"] for result in results])
+        distinct = np.mean([result["distinct_words"] for result in results])
+        print(
+            f"{label:<12} {tokens:>8.0f} {tokens / baseline - 1:>+9.1%} "
+            f"{distinct:>9.0f} {tokens / distinct:>16.2f} "
+            f"{np.mean([result['redundancy'] for result in results]):>11.1%} "
+            f"{np.mean([result['relevance'] for result in results]):>10.3f}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=300)
+    parser.add_argument("--topics", type=int, default=20)
+    parser.add_argument("--document-words", type=int, default=1500)
+    parser.add_argument("--chunk-words", type=int, default=400)
+    parser.add_argument("--overlap-words", type=int, default=120)
+    parser.add_argument("--copy-rate", type=float, default=0.4)
+    parser.add_argument("--max-copies", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--mmr-top-k", type=int, default=3)
+    parser.add_argument("--mmr-lambda", type=float, default=None)
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
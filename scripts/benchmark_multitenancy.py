@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Benchmark namespace-filtered search as the number of namespaces grows.
+
+For each namespace count, loads the same number of points spread evenly
+over that many namespaces, once as a plain collection (keyword index on
+metadata.namespace) and once tenant-optimized (is_tenant index plus
+per-namespace HNSW subgraphs via payload_m), then reports p50/p99 latency
+and recall@k of searches filtered to one namespace. Ground truth is brute
+force within the namespace. Query vectors are random, so no embedding API
+calls are made.
+
+--backend qdrant uses the server at QDRANT_URL (HNSW settings only take
+effect there); --backend numpy uses the embedded index in a temp dir.
+
+Usage:
+    python scripts/benchmark_multitenancy.py --points 100000 --namespaces 1,10,100,500
+"""
+
+import argparse
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add the parent directory to Python path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Import after loading environment variables
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    HnswConfigDiff,
+    KeywordIndexParams,
+    KeywordIndexType,
+    MatchValue,
+    PointStruct,
+    VectorParams,
+)
+from app.core.config import get_settings
+from app.core.qdrant_client import DENSE_VECTOR, TENANT_FIELD
+from app.core.vector_index import LocalVectorIndex
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def wait_until_indexed(client: Any, name: str, timeout: float = 600) -> None:
+    """Wait for the server to finish building HNSW graphs"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = await client.get_collection(name)
+        if str(info.status).lower().endswith("green"):
+            return
+        await asyncio.sleep(1)
+    print(f"Warning: '{name}' still indexing after {timeout}s")
+
+
+async def run(
+    client: Any,
+    vectors: np.ndarray,
+    namespaces: int,
+    tenant: bool,
+    args: argparse.Namespace,
+) -> Dict[str, float]:
+    name = f"tenancy_benchmark_{uuid.uuid4().hex[:8]}"
+    labels = np.arange(len(vectors)) % namespaces
+    settings = get_settings()
+
+    await client.create_collection(
+        collection_name=name,
+        vectors_config={
+            DENSE_VECTOR: VectorParams(size=vectors.shape[1], distance=Distance.COSINE)
+        },
+        hnsw_config=(
+            HnswConfigDiff(
+                payload_m=settings.qdrant_tenant_hnsw_m,
+                m=None if settings.qdrant_global_hnsw else 0,
+            )
+            if tenant
+            else None
+        ),
+    )
+    await client.create_payload_index(
+        collection_name=name,
+        field_name=TENANT_FIELD,
+        field_schema=(
+            KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True)
+            if tenant
+            else "keyword"
+        ),
+    )
+
+    try:
+        for start in range(0, len(vectors), args.batch_size):
+            await client.upsert(
+                collection_name=name,
+                points=[
+                    PointStruct(
+                        id=i,
+                        vector={DENSE_VECTOR: vectors[i].tolist()},
+                        payload={"metadata": {"namespace": f"ns-{labels[i]}"}},
+                    )
+                    for i in range(start, min(start + args.batch_size, len(vectors)))
+                ],
+                wait=True,
+            )
+        if args.backend == "qdrant":
+            await wait_until_indexed(client, name)
+
+        rng = np.random.default_rng(args.seed + namespaces)
+        latencies: List[float] = []
+        found = 0
+        for _ in range(args.queries):
+            namespace = int(rng.integers(namespaces))
+            query = rng.standard_normal(vectors.shape[1]).astype(np.float32)
+            rows = np.flatnonzero(labels == namespace)
+            truth = set(rows[np.argsort(-(vectors[rows] @ query))[: args.top_k]])
+
+            t0 = time.perf_counter()
+            response = await client.query_points(
+                collection_name=name,
+                query=query.tolist(),
+                using=DENSE_VECTOR,
+                query_filter=Filter(
+                    must=[
+                        FieldCondition(
+                            key=TENANT_FIELD,
+                            match=MatchValue(value=f"ns-{namespace}"),
+                        )
+                    ]
+                ),
+                limit=args.top_k,
+                with_payload=False,
+            )
+            latencies.append(time.perf_counter() - t0)
+            found += len(truth & {point.id for point in response.points})
+    finally:
+        await client.delete_collection(name)
+
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "recall_at_k": found / (args.top_k * args.queries),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Compare plain and tenant-optimized collections per namespace count"""
+    settings = get_settings()
+    workdir = None
+    if args.backend == "qdrant":
+        if not settings.qdrant_url:
+            print("QDRANT_URL is required for --backend qdrant")
+            return
+        client: Any = AsyncQdrantClient(
+            url=settings.qdrant_url, api_key=settings.qdrant_api_key
+        )
+    else:
+        workdir = tempfile.mkdtemp(prefix="tenancy-benchmark-")
+        client = LocalVectorIndex(workdir)
+
+    rng = np.random.default_rng(args.seed)
+    vectors = rng.standard_normal((args.points, args.dimension), np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    print(
+        f"Backend {args.backend}: {args.points} points ({args.dimension}-d), "
+        f"{args.queries} filtered queries per run, top_k={args.top_k}"
+    )
+
+    try:
+        print(
+            f"\n{'namespaces':>10}  {'layout':<8} {'p50 ms':>8} {'p99 ms':>8} "
+            f"{'recall@k':>9}"
+        )
+        for namespaces in args.namespaces:
+            for tenant in (False, True):
+                result = await run(client, vectors, namespaces, tenant, args)
+                print(
+                    f"{namespaces:>10}  {'tenant' if tenant else 'plain':<8} "
+                    f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                    f"{result['recall_at_k']:>9.4f}"
+                )
+    finally:
+        await client.close()
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=("qdrant", "numpy"), default="qdrant")
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument(
+        "--namespaces",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[1, 10, 100, 500],
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent Qdrant retrieval: blocking sync client vs AsyncQdrantClient.
+
+Simulates many chat streams retrieving at once against a live Qdrant and
+reports, for each client, event loop lag (how late a 10 ms ticker wakes up)
+and per-request latency percentiles. Query vectors are random, so no
+embedding API calls are made and only Qdrant latency is measured.
+
+Usage:
+    python scripts/benchmark_qdrant_concurrency.py --requests 200 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+# Add the parent directory to Python path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Import after loading environment variables
+from qdrant_client import QdrantClient
+from app.core.config import get_settings
+from app.core.qdrant_client import get_collection_info, get_qdrant_client
+
+TICK_SECONDS = 0.01
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def measure(
+    search: Callable[[List[float]], Awaitable[None]],
+    dimension: int,
+    requests: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    """Run `requests` searches, `concurrency` at a time, while sampling loop lag"""
+    lags: List[float] = []
+    latencies: List[float] = []
+    running = True
+
+    async def ticker() -> None:
+        while running:
+            t0 = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append(time.perf_counter() - t0 - TICK_SECONDS)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        vector = [random.uniform(-1, 1) for _ in range(dimension)]
+        async with semaphore:
+            # Timed from when the stream issues the request, so time spent
+            # waiting behind a blocked loop counts towards its latency
+            t0 = time.perf_counter()
+            await asyncio.sleep(0)
+            await search(vector)
+            latencies.append(time.perf_counter() - t0)
+
+    tick_task = asyncio.create_task(ticker())
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - t0
+    running = False
+    await tick_task
+
+    return {
+        "throughput_rps": requests / elapsed,
+        "latency_p50_ms": percentile(latencies, 50) * 1000,
+        "latency_p99_ms": percentile(latencies, 99) * 1000,
+        "loop_lag_p50_ms": statistics.median(lags) * 1000 if lags else 0.0,
+        "loop_lag_max_ms": max(lags) * 1000 if lags else 0.0,
+    }
+
+
+def print_report(name: str, result: Dict[str, float]) -> None:
+    print(f"\n{name}")
+    for key, value in result.items():
+        print(f"  - {key}: {value:.2f}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Benchmark the previous blocking path against the async client"""
+    settings = get_settings()
+    info = await get_collection_info(settings.qdrant_collection)
+    collection_name, dimension = info.name, info.vector_size
+    async_client = await get_qdrant_client()
+    points = (await async_client.count(collection_name)).count
+    print(
+        f"Benchmarking '{collection_name}' ({points} points, "
+        f"{dimension}-d) with {args.requests} requests, "
+        f"concurrency {args.concurrency}"
+    )
+
+    sync_client = QdrantClient(url=settings.qdrant_url, api_key=settings.qdrant_api_key)
+
+    async def sync_search(vector: List[float]) -> None:
+        # The previous code path: a synchronous call inside a coroutine
+        sync_client.query_points(
+            collection_name=collection_name,
+            query=vector,
+            using=info.vector_name,
+            limit=args.top_k,
+        )
+
+    async def async_search(vector: List[float]) -> None:
+        await async_client.query_points(
+            collection_name=collection_name,
+            query=vector,
+            using=info.vector_name,
+            limit=args.top_k,
+        )
+
+    print_report(
+        "Sync QdrantClient (before)",
+        await measure(sync_search, dimension, args.requests, args.concurrency),
+    )
+    print_report(
+        "AsyncQdrantClient (after)",
+        await measure(async_search, dimension, args.requests, args.concurrency),
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--top-k", type=int, default=5)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Benchmark recall and latency of Qdrant quantization settings.
+
+Loads the same vectors into one temporary collection per quantization mode
+(none, scalar int8, binary) and, for each, compares approximate search
+against exact search (ground truth) to report recall@k and latency
+percentiles, with rescoring on and off and a few oversampling factors.
+
+Vectors are sampled from the configured collection when it has any,
+otherwise random Gaussian vectors are used. Needs a Qdrant server
+(QDRANT_URL): local mode ignores quantization.
+
+Usage:
+    python scripts/benchmark_quantization.py --points 20000 --queries 200
+    python scripts/benchmark_quantization.py --vectors-on-disk --payload-on-disk
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# Add the parent directory to Python path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Import after loading environment variables
+import numpy as np
+from qdrant_client.models import (
+    PointStruct,
+    QuantizationSearchParams,
+    SearchParams,
+)
+from app.core.config import get_settings
+from app.core.qdrant_client import (
+    DENSE_VECTOR,
+    QUANTIZATION_MODES,
+    StorageOptions,
+    create_collection,
+    drop_collection,
+    get_collection_info,
+    get_qdrant_client,
+)
+
+OVERSAMPLING = (1.0, 2.0, 4.0)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def sample_vectors(limit: int) -> Optional[np.ndarray]:
+    """Dense vectors of up to `limit` points of the configured collection"""
+    client = await get_qdrant_client()
+    try:
+        info = await get_collection_info(get_settings().qdrant_collection)
+    except Exception as e:
+        print(f"Could not read the configured collection: {e}")
+        return None
+
+    vectors: List[List[float]] = []
+    offset = None
+    while len(vectors) < limit:
+        points, offset = await client.scroll(
+            collection_name=info.name,
+            limit=min(256, limit - len(vectors)),
+            offset=offset,
+            with_payload=False,
+            with_vectors=[info.vector_name] if info.vector_name else True,
+        )
+        for point in points:
+            vector = point.vector
+            if isinstance(vector, dict):
+                vector = vector.get(info.vector_name)
+            if vector:
+                vectors.append(vector)
+        if offset is None:
+            break
+    return np.asarray(vectors, dtype=np.float32) if vectors else None
+
+
+async def load(
+    name: str, vectors: np.ndarray, quantization: str, args: argparse.Namespace
+) -> None:
+    options = StorageOptions(
+        quantization=quantization,
+        vectors_on_disk=args.vectors_on_disk,
+        payload_on_disk=args.payload_on_disk,
+    )
+    await create_collection(name, vectors.shape[1], options)
+    client = await get_qdrant_client()
+    for start in range(0, len(vectors), 512):
+        batch = vectors[start : start + 512]
+        await client.upsert(
+            collection_name=name,
+            points=[
+                PointStruct(
+                    id=start + i,
+                    vector={DENSE_VECTOR: vector.tolist()},
+                    payload={},
+                )
+                for i, vector in enumerate(batch)
+            ],
+            wait=True,
+        )
+
+
+async def search(
+    name: str, queries: Sequence[np.ndarray], top_k: int, params: SearchParams
+) -> Dict[str, object]:
+    """Run every query and return their hit IDs and latencies"""
+    client = await get_qdrant_client()
+    ids: List[List[int]] = []
+    latencies: List[float] = []
+    for query in queries:
+        t0 = time.perf_counter()
+        response = await client.query_points(
+            collection_name=name,
+            query=query.tolist(),
+            using=DENSE_VECTOR,
+            limit=top_k,
+            search_params=params,
+        )
+        latencies.append(time.perf_counter() - t0)
+        ids.append([point.id for point in response.points])
+    return {"ids": ids, "latencies": latencies}
+
+
+def recall(truth: List[List[int]], found: List[List[int]]) -> float:
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    total = sum(len(t) for t in truth)
+    return hits / total if total else 0.0
+
+
+def print_row(label: str, truth: List[List[int]], result: Dict[str, object]) -> None:
+    latencies = result["latencies"]
+    print(
+        f"  {label:<28} recall@k={recall(truth, result['ids']):.4f}  "
+        f"p50={percentile(latencies, 50) * 1000:.2f}ms  "
+        f"p99={percentile(latencies, 99) * 1000:.2f}ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Compare each quantization mode against exact search"""
+    vectors = None if args.random else await sample_vectors(args.points)
+    if vectors is None or len(vectors) < args.top_k:
+        print(f"Using {args.points} random {args.dimension}-d vectors")
+        rng = np.random.default_rng(args.seed)
+        vectors = rng.standard_normal((args.points, args.dimension), np.float32)
+    else:
+        print(f"Using {len(vectors)} vectors sampled from the collection")
+
+    rng = np.random.default_rng(args.seed + 1)
+    # Perturbed copies of stored vectors stand in for real queries
+    picks = rng.choice(len(vectors), size=args.queries, replace=True)
+    noise = rng.standard_normal((args.queries, vectors.shape[1]), np.float32)
+    scale = np.linalg.norm(vectors[picks], axis=1, keepdims=True) * 0.1
+    queries = list(vectors[picks] + noise / np.sqrt(vectors.shape[1]) * scale)
+
+    print(
+        f"Vectors on disk: {args.vectors_on_disk}, "
+        f"payload on disk: {args.payload_on_disk}"
+    )
+    for quantization in QUANTIZATION_MODES:
+        name = f"quantization_benchmark_{quantization}_{uuid.uuid4().hex[:8]}"
+        print(f"\n{quantization}: loading {len(vectors)} points into '{name}'")
+        await load(name, vectors, quantization, args)
+        try:
+            exact = await search(name, queries, args.top_k, SearchParams(exact=True))
+            truth = exact["ids"]
+            print_row("exact (ground truth)", truth, exact)
+
+            if quantization == "none":
+                result = await search(name, queries, args.top_k, SearchParams())
+                print_row("hnsw", truth, result)
+                continue
+
+            result = await search(
+                name,
+                queries,
+                args.top_k,
+                SearchParams(quantization=QuantizationSearchParams(rescore=False)),
+            )
+            print_row("no rescore", truth, result)
+            for oversampling in OVERSAMPLING:
+                params = SearchParams(
+                    quantization=QuantizationSearchParams(
+                        rescore=True, oversampling=oversampling
+                    )
+                )
+                result = await search(name, queries, args.top_k, params)
+                print_row(f"rescore, oversampling {oversampling}", truth, result)
+        finally:
+            await drop_collection(name)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--vectors-on-disk",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Keep original vectors on disk (quantized copies stay in RAM)",
+    )
+    parser.add_argument(
+        "--payload-on-disk", action=argparse.BooleanOptionalAction, default=False
+    )
+    parser.add_argument(
+        "--random",
+        action="store_true",
+        help="Use random vectors even if the collection has points",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
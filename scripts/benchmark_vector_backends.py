@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Benchmark the embedded vector backends against a Qdrant server.
+
+Loads the same synthetic chunks (dense vectors, BM25-like sparse vectors
+and a namespace) into each backend and reports load throughput, recall@k
+of dense search against brute-force ground truth, and latency percentiles
+for dense, namespace-filtered and hybrid (RRF) queries. The Qdrant server
+is included when QDRANT_URL is set; no embedding API calls are made.
+
+Usage:
+    python scripts/benchmark_vector_backends.py --points 50000 --queries 200
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+# Add the parent directory to Python path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Import after loading environment variables
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    Fusion,
+    FusionQuery,
+    MatchValue,
+    Modifier,
+    PointStruct,
+    Prefetch,
+    SparseVector,
+    SparseVectorParams,
+    VectorParams,
+)
+from app.core.config import get_settings
+from app.core.qdrant_client import DENSE_VECTOR, SPARSE_VECTOR
+from app.core.vector_index import LocalVectorIndex
+
+NAMESPACES = ("crops", "schemes", "weather", "markets")
+VOCABULARY = 20000
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def make_corpus(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = np.random.default_rng(args.seed)
+    vectors = rng.standard_normal((args.points, args.dimension), np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    # Zipf-distributed term IDs, like words in chunks
+    terms = [
+        np.unique(np.minimum(rng.zipf(1.3, size=40), VOCABULARY))
+        for _ in range(args.points)
+    ]
+    namespaces = [NAMESPACES[i % len(NAMESPACES)] for i in range(args.points)]
+
+    picks = rng.choice(args.points, size=args.queries)
+    queries = vectors[picks] + 0.5 * rng.standard_normal(
+        (args.queries, args.dimension), np.float32
+    ) / np.sqrt(args.dimension)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    query_terms = [terms[i][:3] for i in picks]
+    query_namespaces = [namespaces[i] for i in picks]
+
+    # Brute-force ground truth for unfiltered dense search
+    truth = [
+        set(np.argsort(-(vectors @ query))[: args.top_k].tolist()) for query in queries
+    ]
+    return {
+        "vectors": vectors,
+        "terms": terms,
+        "namespaces": namespaces,
+        "queries": queries,
+        "query_terms": query_terms,
+        "query_namespaces": query_namespaces,
+        "truth": truth,
+    }
+
+
+async def load(client: Any, name: str, corpus: Dict[str, Any], batch: int) -> float:
+    await client.create_collection(
+        collection_name=name,
+        vectors_config={
+            DENSE_VECTOR: VectorParams(
+                size=corpus["vectors"].shape[1], distance=Distance.COSINE
+            )
+        },
+        sparse_vectors_config={
+            SPARSE_VECTOR: SparseVectorParams(modifier=Modifier.IDF)
+        },
+    )
+    await client.create_payload_index(
+        collection_name=name, field_name="metadata.namespace", field_schema="keyword"
+    )
+
+    t0 = time.perf_counter()
+    total = len(corpus["vectors"])
+    for start in range(0, total, batch):
+        points = [
+            PointStruct(
+                id=i,
+                vector={
+                    DENSE_VECTOR: corpus["vectors"][i].tolist(),
+                    SPARSE_VECTOR: SparseVector(
+                        indices=corpus["terms"][i].tolist(),
+                        values=[1.0] * len(corpus["terms"][i]),
+                    ),
+                },
+                payload={
+                    "text": f"chunk {i}",
+                    "metadata": {"namespace": corpus["namespaces"][i]},
+                },
+            )
+            for i in range(start, min(start + batch, total))
+        ]
+        await client.upsert(collection_name=name, points=points, wait=True)
+    return time.perf_counter() - t0
+
+
+async def timed(
+    queries: int, search: Callable[[int], Awaitable[List[Any]]]
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    results: List[List[Any]] = []
+    for i in range(queries):
+        t0 = time.perf_counter()
+        results.append(await search(i))
+        latencies.append(time.perf_counter() - t0)
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "results": results,
+    }
+
+
+async def run_backend(
+    label: str, client: Any, corpus: Dict[str, Any], args: argparse.Namespace
+) -> Dict[str, Any]:
+    name = f"backend_benchmark_{uuid.uuid4().hex[:8]}"
+    print(f"\n{label}: loading {len(corpus['vectors'])} points...")
+    load_seconds = await load(client, name, corpus, args.batch_size)
+
+    async def dense(i: int, query_filter: Filter = None) -> List[Any]:
+        response = await client.query_points(
+            collection_name=name,
+            query=corpus["queries"][i].tolist(),
+            using=DENSE_VECTOR,
+            query_filter=query_filter,
+            limit=args.top_k,
+            with_payload=True,
+        )
+        return [point.id for point in response.points]
+
+    async def filtered(i: int) -> List[Any]:
+        namespace = corpus["query_namespaces"][i]
+        return await dense(
+            i,
+            Filter(
+                must=[
+                    FieldCondition(
+                        key="metadata.namespace", match=MatchValue(value=namespace)
+                    )
+                ]
+            ),
+        )
+
+    async def hybrid(i: int) -> List[Any]:
+        terms = corpus["query_terms"][i].tolist()
+        prefetch_k = args.top_k * get_settings().hybrid_prefetch_factor
+        response = await client.query_points(
+            collection_name=name,
+            prefetch=[
+                Prefetch(
+                    query=corpus["queries"][i].tolist(),
+                    using=DENSE_VECTOR,
+                    limit=prefetch_k,
+                ),
+                Prefetch(
+                    query=SparseVector(indices=terms, values=[1.0] * len(terms)),
+                    using=SPARSE_VECTOR,
+                    limit=prefetch_k,
+                ),
+            ],
+            query=FusionQuery(fusion=Fusion.RRF),
+            limit=args.top_k,
+            with_payload=True,
+        )
+        return [point.id for point in response.points]
+
+    try:
+        dense_result = await timed(args.queries, dense)
+        filtered_result = await timed(args.queries, filtered)
+        hybrid_result = await timed(args.queries, hybrid)
+    finally:
+        await client.delete_collection(name)
+
+    found = sum(
+        len(truth & set(ids))
+        for truth, ids in zip(corpus["truth"], dense_result["results"])
+    )
+    return {
+        "load_points_per_second": len(corpus["vectors"]) / load_seconds,
+        "dense_recall_at_k": found / (args.top_k * args.queries),
+        "dense_p50_ms": dense_result["p50_ms"],
+        "dense_p99_ms": dense_result["p99_ms"],
+        "filtered_p50_ms": filtered_result["p50_ms"],
+        "filtered_p99_ms": filtered_result["p99_ms"],
+        "hybrid_p50_ms": hybrid_result["p50_ms"],
+        "hybrid_p99_ms": hybrid_result["p99_ms"],
+    }
+
+
+def print_report(name: str, result: Dict[str, float]) -> None:
+    print(f"\n{name}")
+    for key, value in result.items():
+        print(f"  - {key}: {value:.4f}" if value < 1 else f"  - {key}: {value:.2f}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run the same workload against every available backend"""
+    print(
+        f"Generating {args.points} points ({args.dimension}-d), "
+        f"{args.queries} queries, top_k={args.top_k}"
+    )
+    corpus = make_corpus(args)
+    workdir = tempfile.mkdtemp(prefix="vector-backends-")
+
+    try:
+        numpy_path = os.path.join(workdir, "numpy")
+        index = LocalVectorIndex(numpy_path)
+        result = await run_backend("numpy", index, corpus, args)
+        await index.close()
+        print_report("Embedded NumPy index (VECTOR_BACKEND=numpy)", result)
+
+        local_path = os.path.join(workdir, "qdrant_local")
+        local = AsyncQdrantClient(path=local_path)
+        result = await run_backend("qdrant_local", local, corpus, args)
+        await local.close()
+        print_report("Qdrant local mode (VECTOR_BACKEND=qdrant_local)", result)
+
+        settings = get_settings()
+        if settings.qdrant_url and not args.skip_remote:
+            remote = AsyncQdrantClient(
+                url=settings.qdrant_url,
+                api_key=settings.qdrant_api_key,
+            )
+            result = await run_backend("qdrant", remote, corpus, args)
+            await remote.close()
+            print_report(f"Qdrant server at {settings.qdrant_url}", result)
+        else:
+            print("\nQDRANT_URL not set (or --skip-remote): skipping Qdrant server")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-remote", action="store_true")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
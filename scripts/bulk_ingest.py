@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Script to bulk-ingest a directory tree or archive into the Qdrant collection.
+
+Runs the same parse/chunk/embed/upsert pipeline as POST /ingest, parses
+several files at once on worker threads (page ranges of large PDFs fan out
+to the PDF process pool) and records every finished file in a state file,
+so an interrupted run resumes where it stopped. Files that cannot be parsed
+are recorded as failed, skipped on later runs and listed at the end.
+
+Usage:
+    python scripts/bulk_ingest.py ./corpus --namespace advisories
+    python scripts/bulk_ingest.py bulletins.zip --namespace district_bulletins
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# Add the parent directory to Python path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Import after loading environment variables
+from fastapi import UploadFile
+from app.core.embedding_cache import get_embedding_cache
+from app.core.ingest_pipeline import IngestPipeline
+from app.core.llm import get_embedding_scheduler
+from app.utils.archives import is_archive, iter_archive_uploads, member_upload_name
+from app.utils.parsing import SUPPORTED_EXTENSIONS
+
+DEFAULT_EXTENSIONS = ",".join(SUPPORTED_EXTENSIONS)
+DEFAULT_STATE_FILE = ".bulk_ingest_state.json"
+
+
+class CheckpointState:
+    """
+    Per-file checkpoints in an append-only state file.
+
+    Every finished or failed file appends one JSON record, so checkpointing
+    costs the same for the millionth file as for the first; the last record
+    for a file wins. The log is compacted once when it is opened, which also
+    converts a state file written as a single JSON document. Files that
+    failed are skipped on resume until they change, or with retry_failed.
+    """
+
+    def __init__(self, path: str, retry_failed: bool = False):
+        self.path = path
+        self.retry_failed = retry_failed
+        self.files: Dict[str, Dict] = {}
+        self.failed: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            self._load()
+        self._compact()
+        self._log = open(path, "a", encoding="utf-8")  # noqa: SIM115
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as fh:
+            content = fh.read()
+        try:
+            legacy = json.loads(content)
+        except ValueError:
+            legacy = None
+        if isinstance(legacy, dict) and "files" in legacy:
+            self.files = legacy["files"]
+            return
+        for line in content.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line torn by a crash mid-write
+                continue
+            key = record.pop("key")
+            self.files.pop(key, None)
+            self.failed.pop(key, None)
+            if "error" in record:
+                self.failed[key] = record
+            else:
+                self.files[key] = record
+
+    def _compact(self) -> None:
+        # Write to a temporary file first so a crash never leaves a torn state
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            for entries in (self.files, self.failed):
+                for key, entry in entries.items():
+                    fh.write(json.dumps({"key": key, **entry}) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def is_done(self, key: str, fingerprint: str) -> bool:
+        entry = self.files.get(key)
+        if entry is None and not self.retry_failed:
+            entry = self.failed.get(key)
+        return entry is not None and entry["fingerprint"] == fingerprint
+
+    def _append(self, key: str, entry: Dict) -> None:
+        self._log.write(json.dumps({"key": key, **entry}) + "\n")
+        self._log.flush()
+
+    def mark_done(self, key: str, fingerprint: str, chunks: int) -> None:
+        self.failed.pop(key, None)
+        self.files[key] = {
+            "fingerprint": fingerprint,
+            "chunks": chunks,
+            "finished_at": time.time(),
+        }
+        self._append(key, self.files[key])
+
+    def mark_failed(self, key: str, fingerprint: str, error: str) -> None:
+        self.files.pop(key, None)
+        self.failed[key] = {
+            "fingerprint": fingerprint,
+            "error": error,
+            "failed_at": time.time(),
+        }
+        self._append(key, self.failed[key])
+
+    def close(self) -> None:
+        self._log.close()
+
+
+def file_fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def iter_source_files(root: str, extensions: Tuple[str, ...]) -> Iterator[str]:
+    """Yield matching files and archives under root in a stable order"""
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            lowered = filename.lower()
+            if lowered.endswith(extensions) or is_archive(lowered):
+                yield os.path.join(dirpath, filename)
+
+
+def member_filter(
+    path: str,
+    archive_dir: str,
+    fingerprint: str,
+    extensions: Tuple[str, ...],
+    state: CheckpointState,
+) -> Callable[[str], bool]:
+    """Select archive members with a wanted extension not yet checkpointed"""
+
+    def include(member: str) -> bool:
+        key = os.path.join(archive_dir, member_upload_name(path, member))
+        return member.lower().endswith(extensions) and not state.is_done(
+            key, fingerprint
+        )
+
+    return include
+
+
+def iter_uploads(
+    root: str,
+    extensions: Tuple[str, ...],
+    state: CheckpointState,
+    fingerprints: Dict[str, str],
+    on_failed: Callable[[str, str, Exception], None],
+) -> Iterator[UploadFile]:
+    """
+    Lazily open every file not already checkpointed as an UploadFile.
+
+    An archive that cannot be read is passed to on_failed(name, fingerprint,
+    error) under its own name; members read before the error still count.
+    """
+    base = root if os.path.isdir(root) else os.path.dirname(root)
+
+    for path in iter_source_files(root, extensions):
+        name = os.path.relpath(path, base)
+        fingerprint = file_fingerprint(path)
+        if state.is_done(name, fingerprint):
+            continue
+
+        if not is_archive(path):
+            fingerprints[name] = fingerprint
+            # Parsed while the generator moves on; the pipeline closes it
+            # (close_files=True)
+            yield UploadFile(file=open(path, "rb"), filename=name)  # noqa: SIM115
+            continue
+
+        # Archive members are keyed '<dir>/<archive>/<member>' and share the
+        # archive's fingerprint. Members are spooled copies, so closing the
+        # archive never affects one that is still being parsed.
+        archive_dir = os.path.dirname(name)
+        include = member_filter(path, archive_dir, fingerprint, extensions, state)
+        try:
+            with open(path, "rb") as fh:
+                for upload in iter_archive_uploads(fh, path, include):
+                    upload.filename = os.path.join(archive_dir, upload.filename)
+                    fingerprints[upload.filename] = fingerprint
+                    yield upload
+        except Exception as e:
+            on_failed(name, fingerprint, e)
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Ingest every pending file and print a throughput report"""
+    extensions = tuple(
+        ext.strip().lower() for ext in args.extensions.split(",") if ext.strip()
+    )
+
+    if not os.path.exists(args.path):
+        print(f"❌ Path not found: {args.path}")
+        return
+
+    state = CheckpointState(args.state_file, retry_failed=args.retry_failed)
+    fingerprints: Dict[str, str] = {}
+    completed = {"files": 0, "chunks": 0}
+    failures: Dict[str, str] = {}
+    print(
+        f"Bulk-ingesting {args.path} ({len(state.files)} files already done, "
+        f"{len(state.failed)} failed before)"
+    )
+
+    def on_file_done(source: str, chunks: int) -> None:
+        state.mark_done(source, fingerprints.pop(source), chunks)
+        completed["files"] += 1
+        completed["chunks"] += chunks
+        print(f"✓ {source} ({chunks} chunks)")
+
+    def on_failed(source: str, fingerprint: str, error: Exception) -> None:
+        failures[source] = str(error) or type(error).__name__
+        state.mark_failed(source, fingerprint, failures[source])
+        print(f"✗ {source}: {failures[source]}")
+
+    def on_file_failed(source: str, error: Exception) -> None:
+        on_failed(source, fingerprints.pop(source), error)
+
+    # Archives are expanded here rather than by the pipeline so members that
+    # were already checkpointed are skipped without being read
+    pipeline = IngestPipeline(
+        namespace=args.namespace,
+        incremental=args.incremental,
+        parse_workers=args.parse_workers,
+        close_files=True,
+        on_file_done=on_file_done,
+        on_file_failed=on_file_failed,
+    )
+
+    t0 = time.perf_counter()
+    try:
+        stats = await pipeline.run(
+            iter_uploads(args.path, extensions, state, fingerprints, on_failed)
+        )
+    except Exception as e:
+        print(f"❌ Bulk ingest stopped: {e}")
+        print(f"Progress is saved in {args.state_file}; rerun to resume")
+        raise
+    finally:
+        state.close()
+    elapsed = time.perf_counter() - t0
+
+    print("\n🎉 Bulk ingest completed!")
+    print(f"Files ingested: {completed['files']}")
+    print(f"Chunks upserted: {stats.chunks_upserted}")
+    print(f"Chunks unchanged: {stats.chunks_unchanged}")
+    for filename, pages in stats.skipped_pages.items():
+        print(f"⚠️ Skipped pages of {filename} (extraction timed out): {pages}")
+    earlier = {k: v["error"] for k, v in state.failed.items() if k not in failures}
+    if failures or earlier:
+        print(f"Files failed: {len(failures)} now, {len(earlier)} skipped as failed")
+        for filename, error in {**earlier, **failures}.items():
+            print(f"❌ {filename}: {error}")
+        print("Fix or replace them, or rerun with --retry-failed")
+    print(f"Elapsed: {elapsed:.2f}s")
+    if elapsed > 0:
+        print(
+            f"Throughput: {completed['files'] / elapsed:.2f} files/s, "
+            f"{stats.chunks_parsed / elapsed:.2f} chunks/s"
+        )
+    print(f"Stage seconds: {stats.to_dict()['stage_seconds']}")
+
+    cache = get_embedding_cache()
+    if cache is not None:
+        print(f"Embedding cache: {cache.stats()}")
+    print(f"Embedding scheduler: {get_embedding_scheduler().stats()}")
+
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="Directory or archive (.zip/.tar/.tar.gz)")
+    parser.add_argument("--namespace", default=None, help="Namespace for the chunks")
+    parser.add_argument(
+        "--state-file",
+        default=DEFAULT_STATE_FILE,
+        help=f"Checkpoint file (default: {DEFAULT_STATE_FILE})",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip chunks that are already stored in the collection",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Parse files that failed in an earlier run again",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Files parsed at once (default: INGEST_PARSE_WORKERS)",
+    )
+    parser.add_argument(
+        "--extensions",
+        default=DEFAULT_EXTENSIONS,
+        help=f"Comma-separated file extensions (default: {DEFAULT_EXTENSIONS})",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -2,8 +2,13 @@
 """
 Script to create Qdrant collection for RAG application.
 This script sets up the necessary collection structure for storing document embeddings.
+
+Usage:
+    python scripts/create_qdrant_collection.py [--quantization scalar|binary|none]
+        [--no-vectors-on-disk] [--no-payload-on-disk]
 """
 
+import argparse
 import asyncio
 import os
 import sys
@@ -18,15 +23,23 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import after loading environment variables
-from app.core.qdrant_client import create_collection, get_qdrant_client
+from app.core.qdrant_client import (
+    QUANTIZATION_MODES,
+    StorageOptions,
+    create_collection,
+    get_qdrant_client,
+)
+from app.core.llm import get_embedding_dimension
 
 
-async def main():
+async def main(args: argparse.Namespace):
     """Create Qdrant collection with proper schema"""
     print("Setting up Qdrant collection for RAG application...")
 
     # Check required environment variables
-    required_vars = ["QDRANT_URL", "QDRANT_COLLECTION"]
+    required_vars = ["QDRANT_COLLECTION"]
+    if os.getenv("VECTOR_BACKEND", "qdrant").lower() == "qdrant":
+        required_vars.insert(0, "QDRANT_URL")
     missing_vars = [var for var in required_vars if not os.getenv(var)]
 
     if missing_vars:
@@ -44,16 +57,44 @@ async def main():
 
         # Create collection
         collection_name = os.getenv("QDRANT_COLLECTION", "rag_documents")
-        await create_collection(collection_name)
+        options = StorageOptions(
+            quantization=args.quantization,
+            vectors_on_disk=args.vectors_on_disk,
+            payload_on_disk=args.payload_on_disk,
+        )
+        await create_collection(collection_name, get_embedding_dimension(), options)
         print(f"✓ Collection '{collection_name}' created successfully")
 
         print("\n🎉 Qdrant collection setup completed!")
         print(f"Collection name: {collection_name}")
+        print(f"Quantization: {options.quantization}")
+        print(f"Vectors on disk: {options.vectors_on_disk}")
+        print(f"Payload on disk: {options.payload_on_disk}")
 
     except Exception as e:
         print(f"❌ Error setting up Qdrant collection: {e}")
         raise
 
 
+def parse_args() -> argparse.Namespace:
+    defaults = StorageOptions.from_settings()
+    parser = argparse.ArgumentParser(description="Create the Qdrant collection")
+    parser.add_argument(
+        "--quantization", choices=QUANTIZATION_MODES, default=defaults.quantization
+    )
+    parser.add_argument(
+        "--vectors-on-disk",
+        action=argparse.BooleanOptionalAction,
+        default=defaults.vectors_on_disk,
+        help="Keep original vectors on disk (quantized copies stay in RAM)",
+    )
+    parser.add_argument(
+        "--payload-on-disk",
+        action=argparse.BooleanOptionalAction,
+        default=defaults.payload_on_disk,
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,93 @@
+"""
+Shared fakes for tests that run the retrieval and ingest code end to end
+against the embedded NumPy vector index instead of Qdrant and Gemini.
+"""
+
+import dataclasses
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+
+import app.core.config as config
+import app.core.dedup_index as dedup_index
+import app.core.embedding_cache as embedding_cache
+import app.core.llm as llm
+import app.core.qdrant_client as qdrant_client
+import app.core.retrieval_cache as retrieval_cache
+
+
+class FakeEmbedModel:
+    """Deterministic bag-of-words embeddings; texts sharing words are close."""
+
+    embed_dim = 16
+
+    def __init__(self):
+        self.texts = []
+
+    def embed(self, text: str):
+        vector = [0.0] * self.embed_dim
+        vector[0] = 0.1
+        for word in text.lower().split():
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            vector[1 + digest[0] % (self.embed_dim - 1)] += 1.0
+        return vector
+
+    async def aget_text_embedding_batch(self, texts):
+        self.texts.extend(texts)
+        return [self.embed(text) for text in texts]
+
+
+_SINGLETONS = (
+    (config, "_settings"),
+    (llm, "_embed_model"),
+    (llm, "_embedding_scheduler"),
+    (qdrant_client, "_embedded_client"),
+    (qdrant_client, "_collection_registry"),
+    (retrieval_cache, "_retrieval_cache"),
+    (retrieval_cache, "_collection_version"),
+    (dedup_index, "_dedup_index"),
+    (embedding_cache, "_embedding_cache"),
+)
+
+
+@asynccontextmanager
+async def local_backend(**overrides):
+    """
+    Point the app at a fresh NumPy vector index in a temporary folder.
+
+    Yields the FakeEmbedModel in use. Settings can be overridden by field
+    name; every process-wide singleton is restored on exit.
+    """
+    folder = tempfile.mkdtemp()
+    saved = [(module, name, getattr(module, name)) for module, name in _SINGLETONS]
+    options = dict(
+        vector_backend="numpy",
+        vector_index_path=os.path.join(folder, "vectors"),
+        embed_cache_enabled=False,
+        dedup_index_path=os.path.join(folder, "dedup.sqlite3"),
+        retrieval_cache_version_path=os.path.join(folder, "collection_version"),
+        retrieval_cache_version_check=0,
+        retrieval_mode="hybrid",
+    )
+    options.update(overrides)
+    config._settings = dataclasses.replace(config.Settings.load(), **options)
+    fake = llm._embed_model = FakeEmbedModel()
+    llm._embedding_scheduler = None
+    qdrant_client._embedded_client = None
+    qdrant_client._collection_registry = qdrant_client.CollectionRegistry()
+    retrieval_cache._retrieval_cache = None
+    retrieval_cache._collection_version = None
+    dedup_index._dedup_index = None
+    embedding_cache._embedding_cache = None
+    try:
+        yield fake
+    finally:
+        if qdrant_client._embedded_client is not None:
+            await qdrant_client._embedded_client.close()
+        if dedup_index._dedup_index is not None:
+            dedup_index._dedup_index.close()
+        for module, name, value in saved:
+            setattr(module, name, value)
+        shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the agent instance cache.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from app.agents.agent_cache import AgentCache
+
+
+class StubAgent:
+    """Stands in for a BaseAgent subclass; counts how often it is built."""
+
+    built = 0
+
+    def __init__(self, language: str = "en-US", markdown: bool = False):
+        StubAgent.built += 1
+        self.language = language
+        self.markdown = markdown
+
+
+class OtherStubAgent(StubAgent):
+    pass
+
+
+def test_hits_and_keys():
+    """Test that agents are shared per (class, language, markdown)."""
+    print("Testing agent cache hits...")
+    StubAgent.built = 0
+    cache = AgentCache(max_entries=8)
+
+    first = cache.get_or_create(StubAgent, "hi-IN", False)
+    assert cache.get_or_create(StubAgent, "hi-IN", False) is first
+    assert cache.get_or_create(StubAgent, "hi-IN", True) is not first
+    assert cache.get_or_create(StubAgent, "en-IN", False).language == "en-IN"
+    assert isinstance(
+        cache.get_or_create(OtherStubAgent, "hi-IN", False), OtherStubAgent
+    )
+    assert StubAgent.built == 4
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 4, stats
+    assert stats["hit_rate"] == 0.2
+    assert stats["entries"] == 4
+
+    print("✅ One agent is built per class, language and markdown preference")
+
+
+def test_eviction():
+    """Test that the least recently used agent is evicted first."""
+    print("\nTesting eviction...")
+    cache = AgentCache(max_entries=2)
+
+    hindi = cache.get_or_create(StubAgent, "hi-IN", False)
+    cache.get_or_create(StubAgent, "ta-IN", False)
+    cache.get_or_create(StubAgent, "hi-IN", False)
+    cache.get_or_create(StubAgent, "te-IN", False)  # evicts ta-IN
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_create(StubAgent, "hi-IN", False) is hindi
+    misses = cache.stats()["misses"]
+    cache.get_or_create(StubAgent, "ta-IN", False)
+    assert cache.stats()["misses"] == misses + 1
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+    print("✅ Least recently used agents are evicted")
+
+
+def test_concurrent_lookups():
+    """Test that concurrent requests end up sharing one agent."""
+    print("\nTesting concurrent lookups...")
+    cache = AgentCache(max_entries=8)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        agents = list(
+            pool.map(lambda _: cache.get_or_create(StubAgent, "mr-IN", True), range(64))
+        )
+    assert all(agent is agents[-1] for agent in agents)
+    assert cache.stats()["hits"] + cache.stats()["misses"] == 64
+
+    print("✅ Concurrent requests share the cached agent")
+
+
+if __name__ == "__main__":
+    test_hits_and_keys()
+    test_eviction()
+    test_concurrent_lookups()
+    print("\n🎉 All agent cache tests passed!")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming zip/tar archive members.
+"""
+
+import dataclasses
+import io
+import tarfile
+import zipfile
+
+from app.core.config import get_settings
+from app.utils import archives
+from app.utils.archives import ArchiveLimitError, iter_archive_uploads
+
+
+def _zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def test_zip_and_tar_members():
+    """Test that zip and tar.gz members stream as named uploads."""
+    print("Testing archive members...")
+
+    zipped = _zip_bytes({"a.txt": "Kharif sowing", "dir/b.md": "Urea dose"})
+    uploads = list(iter_archive_uploads(zipped, "uploads/bulletins.zip"))
+    assert [u.filename for u in uploads] == [
+        "bulletins.zip/a.txt",
+        "bulletins.zip/dir/b.md",
+    ]
+    # Members are independent copies that outlive the archive file
+    zipped.close()
+    assert uploads[1].file.read() == b"Urea dose"
+
+    tarred = io.BytesIO()
+    with tarfile.open(fileobj=tarred, mode="w:gz") as archive:
+        data = b"Drip irrigation"
+        info = tarfile.TarInfo("c.txt")
+        info.size = len(data)
+        archive.addfile(info, io.BytesIO(data))
+    tarred.seek(0)
+    uploads = list(iter_archive_uploads(tarred, "more.tar.gz"))
+    assert [u.filename for u in uploads] == ["more.tar.gz/c.txt"]
+    assert uploads[0].file.read() == data
+
+    print("✅ Archive members stream as named uploads")
+
+
+def test_archive_limits():
+    """Test that member count and decompressed size limits are enforced."""
+    print("\nTesting archive limits...")
+
+    limited = dataclasses.replace(
+        get_settings(), archive_max_members=3, archive_max_bytes=1024
+    )
+    original = archives.get_settings
+    archives.get_settings = lambda: limited
+    try:
+        too_many = _zip_bytes({f"{i}.txt": "x" for i in range(4)})
+        try:
+            list(iter_archive_uploads(too_many, "many.zip"))
+            assert False, "Member limit was not enforced"
+        except ArchiveLimitError as e:
+            print(f"Rejected: {e}")
+
+        # Nothing is yielded from a tar that would exceed the limit later on
+        tarred = io.BytesIO()
+        with tarfile.open(fileobj=tarred, mode="w:gz") as archive:
+            for i in range(4):
+                info = tarfile.TarInfo(f"{i}.txt")
+                info.size = 1
+                archive.addfile(info, io.BytesIO(b"x"))
+        tarred.seek(0)
+        try:
+            next(iter_archive_uploads(tarred, "many.tar.gz"))
+            assert False, "Member limit was not enforced up front"
+        except ArchiveLimitError as e:
+            print(f"Rejected: {e}")
+
+        # A highly compressible member is rejected by its decompressed size
+        bomb = io.BytesIO()
+        with zipfile.ZipFile(bomb, "w", compression=zipfile.ZIP_DEFLATED) as z:
+            z.writestr("zeros.txt", b"\0" * 4096)
+        bomb.seek(0)
+        try:
+            list(iter_archive_uploads(bomb, "bomb.zip"))
+            assert False, "Size limit was not enforced"
+        except ArchiveLimitError as e:
+            print(f"Rejected: {e}")
+    finally:
+        archives.get_settings = original
+
+    print("✅ Archive limits are enforced")
+
+
+if __name__ == "__main__":
+    test_zip_and_tar_members()
+    test_archive_limits()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk ingest checkpoints and failed-file handling.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from tests.fakes import local_backend
+
+_SCRIPT = Path(__file__).parent.parent / "scripts" / "bulk_ingest.py"
+_spec = importlib.util.spec_from_file_location("bulk_ingest", _SCRIPT)
+bulk_ingest = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bulk_ingest)
+
+
+def test_checkpoint_log():
+    """Test that checkpoints are appended, replayed and compacted."""
+    print("Testing checkpoint log...")
+    path = os.path.join(tempfile.mkdtemp(), "state.json")
+
+    # A state file written as one JSON document is still resumed from
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"files": {"a.txt": {"fingerprint": "1:1", "chunks": 2}}}, fh)
+    state = bulk_ingest.CheckpointState(path)
+    assert state.is_done("a.txt", "1:1") and not state.is_done("a.txt", "1:2")
+
+    for i in range(50):
+        state.mark_done(f"doc{i}.txt", "1:1", i)
+    state.mark_failed("bad.pdf", "9:9", "EOF marker not found")
+    state.mark_done("doc0.txt", "2:2", 7)
+    state.close()
+    with open(path, encoding="utf-8") as fh:
+        lines = fh.read().splitlines()
+    # One appended line per checkpoint, not a rewrite of the whole state
+    assert len(lines) == 1 + 50 + 2, len(lines)
+
+    # A crash mid-write leaves a torn last line, which is ignored
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write('{"key": "doc1.txt", "fingerp')
+    state = bulk_ingest.CheckpointState(path)
+    assert state.is_done("doc0.txt", "2:2"), "The last record wins"
+    assert state.files["doc49.txt"]["chunks"] == 49
+    assert state.is_done("bad.pdf", "9:9"), "Failed files are skipped"
+    assert not state.is_done("bad.pdf", "9:10"), "...until they change"
+    assert state.failed["bad.pdf"]["error"] == "EOF marker not found"
+    state.close()
+    with open(path, encoding="utf-8") as fh:
+        assert len(fh.read().splitlines()) == 1 + 50 + 1, "Compacted on open"
+
+    retry = bulk_ingest.CheckpointState(path, retry_failed=True)
+    assert not retry.is_done("bad.pdf", "9:9")
+    retry.mark_done("bad.pdf", "9:9", 3)
+    retry.close()
+    state = bulk_ingest.CheckpointState(path)
+    assert state.files["bad.pdf"]["chunks"] == 3 and "bad.pdf" not in state.failed
+    state.close()
+
+    print("✅ Checkpoints are appended and replayed")
+
+
+def test_failed_files():
+    """Test that unparseable files are recorded and do not stop the run."""
+    print("\nTesting failed files...")
+    corpus = tempfile.mkdtemp()
+    with open(os.path.join(corpus, "advisory.txt"), "w", encoding="utf-8") as fh:
+        fh.write("Sow mustard in October after the monsoon recedes.")
+    with open(os.path.join(corpus, "scan.pdf"), "wb") as fh:
+        fh.write(b"not really a pdf")
+    with open(os.path.join(corpus, "bulletins.zip"), "wb") as fh:
+        fh.write(b"not really a zip")
+    state_file = os.path.join(tempfile.mkdtemp(), "state.json")
+    args = bulk_ingest.parse_args([corpus, "--state-file", state_file])
+
+    async def run():
+        async with local_backend(dedup_mode="off") as fake:
+            await bulk_ingest.main(args)
+            embedded = len(fake.texts)
+            # Resuming neither stops on nor re-parses the failed files
+            await bulk_ingest.main(args)
+            return embedded, len(fake.texts)
+
+    first, second = asyncio.run(run())
+    assert first == 1 and second == 1, (first, second)
+
+    state = bulk_ingest.CheckpointState(state_file)
+    assert set(state.files) == {"advisory.txt"}, state.files
+    assert set(state.failed) == {"scan.pdf", "bulletins.zip"}, state.failed
+    state.close()
+
+    print("✅ Failed files are checkpointed and skipped on resume")
+
+
+if __name__ == "__main__":
+    test_checkpoint_log()
+    test_failed_files()
+    print("\n🎉 All bulk ingest tests passed!")
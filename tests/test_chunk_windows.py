@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for merging adjacent chunks and neighbour chunk windows.
+"""
+
+import asyncio
+from app.core.qdrant_client import insert_documents, search_similar
+from app.utils.chunk_windows import (
+    join_overlapping,
+    merge_adjacent_chunks,
+    neighbour_chunk_ids,
+)
+from tests.fakes import local_backend
+
+WORDS = [f"w{i}" for i in range(100)]
+
+
+def _chunk(chunk_id: int, score=None, source: str = "doc.pdf") -> dict:
+    # 25-word chunks every 20 words, like a 5-token chunk overlap
+    return {
+        "text": " ".join(WORDS[chunk_id * 20 : chunk_id * 20 + 25]),
+        "score": score,
+        "metadata": {"source": source, "chunk_id": chunk_id},
+    }
+
+
+def test_join_overlapping():
+    """Test that the shared overlap is dropped when chunks are joined."""
+    print("Testing overlap removal...")
+
+    assert join_overlapping(_chunk(0)["text"], _chunk(1)["text"]) == " ".join(
+        WORDS[:45]
+    )
+    assert join_overlapping("alpha beta", "gamma delta") == "alpha beta\n…\ngamma delta"
+
+    print("✅ Overlapping text appears once")
+
+
+def test_merge_adjacent():
+    """Test that consecutive hits become one span and gaps stay apart."""
+    print("\nTesting adjacent chunk merging...")
+
+    hits = [_chunk(3, 0.9), _chunk(1, 0.7), _chunk(0, 0.8), _chunk(0, 0.5, "b.pdf")]
+    spans = merge_adjacent_chunks(hits)
+    assert [span["score"] for span in spans] == [0.9, 0.8, 0.5]
+    assert spans[1]["text"] == " ".join(WORDS[:45])
+    assert spans[1]["metadata"]["chunk_id"] == 0
+    assert spans[1]["metadata"]["chunk_end"] == 1
+    assert "chunk_end" not in spans[0]["metadata"]
+
+    # Unscored neighbours only survive inside a span with a scored hit
+    spans = merge_adjacent_chunks([_chunk(2, 0.6), _chunk(1), _chunk(4)])
+    assert len(spans) == 1 and spans[0]["metadata"]["chunk_end"] == 2
+
+    # Hits without chunk positions pass through
+    assert merge_adjacent_chunks([{"text": "x", "score": 0.1, "metadata": {}}])
+
+    print("✅ Consecutive chunks are merged into spans")
+
+
+def test_neighbour_ids():
+    """Test the chunk IDs requested around hits."""
+    print("\nTesting neighbour windows...")
+
+    wanted = neighbour_chunk_ids([_chunk(0, 0.9), _chunk(1, 0.8), _chunk(5, 0.7)], 1)
+    assert wanted == {(None, "doc.pdf"): {2, 4, 6}}, wanted
+    assert neighbour_chunk_ids([_chunk(0, 0.9), _chunk(1, 0.8)], 0) == {}
+
+    print("✅ Windows skip chunks that are already hits")
+
+
+def test_namespaced_sources():
+    """Test that same-named sources in two namespaces are not merged."""
+    print("\nTesting windows across namespaces...")
+    bulletins = {
+        "crops": ["Wheat sowing starts after paddy harvest", "Seed rate is 40 kg"],
+        "schemes": ["PM-KISAN pays farmers yearly", "Apply at the CSC centre"],
+    }
+    texts, metadatas = [], []
+    for namespace, chunks in bulletins.items():
+        for i, text in enumerate(chunks):
+            texts.append(text)
+            metadatas.append(
+                {"source": "bulletin.txt", "namespace": namespace, "chunk_id": i}
+            )
+
+    async def run():
+        async with local_backend(
+            dedup_mode="off",
+            retrieval_mode="dense",
+            retrieval_window=1,
+            retrieval_payload_fields=("source", "chunk_id"),
+        ):
+            await insert_documents(texts, metadatas)
+            return await search_similar(
+                "wheat sowing paddy harvest PM-KISAN pays farmers yearly", top_k=2
+            )
+
+    spans = asyncio.run(run())
+    assert sorted(span["text"] for span in spans) == sorted(
+        "\n…\n".join(chunks) for chunks in bulletins.values()
+    ), spans
+    assert all(span["metadata"]["chunk_end"] == 1 for span in spans)
+    assert all("namespace" not in span["metadata"] for span in spans)
+
+    print("✅ Windows stay within their namespace")
+
+
+if __name__ == "__main__":
+    test_join_overlapping()
+    test_merge_adjacent()
+    test_neighbour_ids()
+    test_namespaced_sources()
+    print("\n🎉 All chunk window tests passed!")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the chunking service.
+"""
+
+import dataclasses
+import os
+import threading
+
+import app.core.config as config
+import app.utils.chunking as chunking
+from app.utils.chunking import chunk_text, chunk_texts, get_chunk_pool, get_chunker
+
+
+def test_chunker_reuse():
+    """Test that chunkers are built once per (size, overlap) configuration."""
+    print("Testing chunker reuse...")
+
+    assert get_chunker(800, 120) is get_chunker(800, 120), "Chunker was rebuilt"
+    assert get_chunker(800, 120) is not get_chunker(400, 40)
+
+    print("✅ Chunkers are cached per configuration")
+
+
+def test_batch_chunking():
+    """Test that batch chunking keeps results aligned with the inputs."""
+    print("\nTesting batch chunking...")
+
+    documents = [
+        "Wheat needs timely irrigation at crown root initiation. " * 100,
+        "",
+        "PM-KISAN provides income support to farmer families. " * 40,
+    ]
+    results = chunk_texts(documents)
+
+    assert len(results) == len(documents), "Results not aligned with inputs"
+    assert results[0], "Long document should produce chunks"
+    assert results[1] == [], "Empty document should produce no chunks"
+    assert results[2], "Second document should produce chunks"
+
+    for chunks in results:
+        for chunk in chunks:
+            assert chunk.text.strip(), "Chunks should not be blank"
+            assert 0 < chunk.token_count <= 800, f"Bad count {chunk.token_count}"
+
+    # The single-document helper matches the batch path
+    assert chunk_text(documents[0]) == [c.text for c in results[0]]
+
+    print("✅ Batch chunking returns aligned chunks with token counts")
+
+
+def test_broken_pool():
+    """Test that the chunk pool is created once and replaced when it breaks."""
+    print("\nTesting chunk pool recovery...")
+    saved = config._settings
+    config._settings = dataclasses.replace(
+        config.get_settings(), chunk_workers=1, chunk_parallel_threshold=100
+    )
+    chunking._chunk_pool = None
+    try:
+        pools = []
+        threads = [
+            threading.Thread(target=lambda: pools.append(get_chunk_pool()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({id(pool) for pool in pools}) == 1, "Pool created twice"
+
+        # A worker dying (e.g. killed for memory) breaks the whole pool
+        broken = get_chunk_pool()
+        try:
+            broken.submit(os._exit, 1).result()
+        except Exception:
+            pass
+        document = "Apply gypsum to groundnut at pegging. " * 40
+        settings = config.get_settings()
+        expected = chunking._chunk_document(
+            document, settings.chunk_size, settings.chunk_overlap
+        )
+        assert chunk_texts([document]) == [expected]
+        assert get_chunk_pool() is not broken, "Broken pool was not replaced"
+        # ...and the replacement keeps working
+        assert chunk_texts([document])[0]
+    finally:
+        if chunking._chunk_pool is not None:
+            chunking._chunk_pool.shutdown()
+            chunking._chunk_pool = None
+        config._settings = saved
+
+    print("✅ Concurrent callers share one pool and broken pools are replaced")
+
+
+if __name__ == "__main__":
+    test_chunker_reuse()
+    test_batch_chunking()
+    test_broken_pool()
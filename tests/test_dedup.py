@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for MinHash near-duplicate suppression.
+"""
+
+import os
+import tempfile
+
+from app.core.dedup_index import NearDuplicateFilter, NearDuplicateIndex
+from app.utils.dedup import estimate_similarity, lsh_bands, minhash
+
+ADVISORY = (
+    "Farmers are advised to apply the second dose of urea at the tillering "
+    "stage of wheat and to irrigate the crop lightly before the cold wave. "
+    "Avoid spraying pesticides on windy days and follow the recommended "
+    "dose printed on the label of each product. "
+) * 4
+
+
+def test_minhash_similarity():
+    """Test that signatures estimate shingle overlap."""
+    print("Testing MinHash signatures...")
+
+    revised = ADVISORY.replace("cold wave", "cold spell", 1)
+    unrelated = "PM-KISAN transfers income support to eligible farmer families. " * 8
+
+    assert estimate_similarity(minhash(ADVISORY), minhash(ADVISORY)) == 1.0
+    assert estimate_similarity(minhash(ADVISORY), minhash(revised)) > 0.8
+    assert estimate_similarity(minhash(ADVISORY), minhash(unrelated)) < 0.2
+
+    bands, rows = lsh_bands(0.9, 128)
+    assert bands * rows == 128 and (1 / bands) ** (1 / rows) <= 0.9
+
+    print("✅ Signatures separate near-duplicates from unrelated text")
+
+
+def test_filter_suppresses_near_duplicates():
+    """Test that the filter links near-duplicates to stored chunks."""
+    print("\nTesting near-duplicate filter...")
+
+    path = os.path.join(tempfile.mkdtemp(), "dedup.sqlite3")
+    index = NearDuplicateIndex(path, threshold=0.8, mode="link")
+    revised = ADVISORY.replace("cold wave", "cold spell", 1)
+    metadata = {"namespace": "advisories", "source": "v1.pdf", "chunk_id": 0}
+
+    first = NearDuplicateFilter(index)
+    assert first.check(["a"], [ADVISORY], [metadata]) == [None]
+    # Chunks in the same run are compared against each other as well
+    assert first.check(["b"], [revised], [metadata]) == ["a"]
+    first.commit(["a"])
+
+    second = NearDuplicateFilter(index)
+    v2 = {**metadata, "source": "v2.pdf"}
+    other_namespace = {**metadata, "namespace": "schemes"}
+    assert second.check(["c"], [revised], [v2]) == ["a"]
+    assert second.check(["a"], [ADVISORY], [metadata]) == [None], "Same ID is kept"
+    assert second.check(["d"], [revised], [other_namespace]) == [None]
+
+    assert index.stats()["links"] == 2
+    assert index.stats()["suppressed"] == 2
+
+    # Dropping the collection clears the index with it
+    index.clear()
+    assert index.stats()["entries"] == 0 and index.stats()["links"] == 0
+    assert NearDuplicateFilter(index).check(["e"], [revised], [v2]) == [None]
+
+    index.close()
+    print("✅ Near-duplicates are suppressed per namespace and linked")
+
+
+if __name__ == "__main__":
+    test_minhash_similarity()
+    test_filter_suppresses_near_duplicates()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent embedding cache.
+"""
+
+import os
+import tempfile
+from app.core.embedding_cache import EmbeddingCache
+
+
+def test_hits_and_misses():
+    """Test that stored embeddings are returned and counted as hits."""
+    print("Testing embedding cache hits and misses...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(os.path.join(tmp, "cache.sqlite3"), "test-model")
+
+        assert cache.get_many(["wheat price today"]) == [None]
+        cache.put_many(["wheat price today"], [[0.5, 0.25, 1.0]])
+
+        # Whitespace differences normalize to the same entry
+        results = cache.get_many(["  wheat   price today ", "PM-KISAN eligibility"])
+        assert results[0] == [0.5, 0.25, 1.0], f"Unexpected vector: {results[0]}"
+        assert results[1] is None, "Unknown text should be a miss"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1, f"Expected 1 hit, got {stats['hits']}"
+        assert stats["misses"] == 2, f"Expected 2 misses, got {stats['misses']}"
+        assert stats["entries"] == 1
+        cache.close()
+
+    print("✅ Embedding cache hits and misses work")
+
+
+def test_model_isolation_and_persistence():
+    """Test that entries survive reopening and are scoped to the model name."""
+    print("\nTesting embedding cache persistence...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite3")
+        cache = EmbeddingCache(path, "model-a")
+        cache.put_many(["soil test"], [[1.0, 2.0]])
+        cache.close()
+
+        reopened = EmbeddingCache(path, "model-a")
+        assert reopened.get_many(["soil test"]) == [[1.0, 2.0]]
+        assert reopened.stats()["entries"] == 1
+        reopened.close()
+
+        other_model = EmbeddingCache(path, "model-b")
+        assert other_model.get_many(["soil test"]) == [None]
+        other_model.close()
+
+    print("✅ Embedding cache persists across reopen and isolates models")
+
+
+def test_lru_eviction():
+    """Test that the least recently used entries are evicted first."""
+    print("\nTesting embedding cache LRU eviction...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(
+            os.path.join(tmp, "cache.sqlite3"), "test-model", max_entries=3
+        )
+        cache.put_many(["a", "b", "c"], [[1.0], [2.0], [3.0]])
+
+        # Touch "a" so that "b" becomes the oldest entry
+        cache.get_many(["a"])
+        cache.put_many(["d"], [[4.0]])
+
+        results = cache.get_many(["a", "b", "d"])
+        assert results[0] == [1.0], "Recently used entry should survive"
+        assert results[1] is None, "Least recently used entry should be evicted"
+        assert results[2] == [4.0], "Newest entry should be present"
+        assert cache.stats()["entries"] <= 3
+        cache.close()
+
+    print("✅ Embedding cache evicts least recently used entries")
+
+
+if __name__ == "__main__":
+    test_hits_and_misses()
+    test_model_isolation_and_persistence()
+    test_lru_eviction()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for the adaptive embedding batch scheduler.
+"""
+
+import asyncio
+import app.core.llm as llm
+from app.core.llm import EmbeddingScheduler
+from app.utils.chunking import estimate_tokens
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+class FakeEmbedModel:
+    """Stands in for GoogleGenAIEmbedding; records batches and concurrency."""
+
+    def __init__(self, latency: float = 0.01, throttle_calls: int = 0):
+        self.latency = latency
+        self.throttle_calls = throttle_calls
+        self.calls = 0
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def aget_text_embedding_batch(self, texts):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.calls <= self.throttle_calls:
+                raise RateLimited("429 RESOURCE_EXHAUSTED")
+            self.batches.append(list(texts))
+            return [[float(len(text))] for text in texts]
+        finally:
+            self.in_flight -= 1
+
+
+def _scheduler(**overrides) -> EmbeddingScheduler:
+    options = dict(
+        max_batch_tokens=100,
+        max_batch_size=4,
+        min_concurrency=1,
+        max_concurrency=8,
+        target_latency=1.0,
+        max_retries=3,
+    )
+    options.update(overrides)
+    return EmbeddingScheduler(**options)
+
+
+TEXTS = ["x" * length for length in (40, 120, 80, 200, 8, 8, 8, 8, 8, 900, 60, 60)]
+
+
+def test_batch_token_bounds():
+    """Test that batches respect the token and size limits and keep order."""
+    print("Testing batch packing...")
+    scheduler = _scheduler()
+
+    batches = scheduler.pack(TEXTS)
+    assert [i for batch in batches for i in batch] == list(range(len(TEXTS)))
+    for batch in batches:
+        tokens = sum(estimate_tokens(TEXTS[i]) for i in batch)
+        assert len(batch) <= scheduler.max_batch_size, batch
+        # Only a single oversized text may exceed the token budget
+        assert tokens <= scheduler.max_batch_tokens or len(batch) == 1, batch
+
+    # The chunker's counts are used as given; missing ones are estimated
+    counts = [60, 60, 60, None, 1]
+    assert scheduler.pack(["x"] * 5, counts) == [[0], [1], [2, 3, 4]]
+
+    print("✅ Batches stay within the token and size bounds")
+
+
+def test_embed_alignment_and_concurrency():
+    """Test that vectors line up with inputs and in-flight batches are capped."""
+    print("\nTesting concurrent embedding...")
+    fake = llm._embed_model = FakeEmbedModel(latency=0.02)
+    scheduler = _scheduler(max_concurrency=2)
+
+    vectors = asyncio.run(scheduler.embed(TEXTS))
+    assert vectors == [[float(len(text))] for text in TEXTS]
+    assert fake.max_in_flight <= 2, fake.max_in_flight
+    for batch in fake.batches:
+        tokens = sum(estimate_tokens(text) for text in batch)
+        assert tokens <= scheduler.max_batch_tokens or len(batch) == 1
+    assert scheduler.stats()["texts"] == len(TEXTS)
+
+    print("✅ Embeddings are aligned and concurrency is capped")
+
+
+def test_backoff_on_rate_limit():
+    """Test that 429s halve concurrency and the batches are retried."""
+    print("\nTesting 429 backoff...")
+    fake = llm._embed_model = FakeEmbedModel(throttle_calls=2)
+    scheduler = _scheduler(max_concurrency=8)
+    assert scheduler.concurrency == 4
+
+    vectors = asyncio.run(scheduler.embed(TEXTS[:4]))
+    assert vectors == [[float(len(text))] for text in TEXTS[:4]]
+    assert scheduler.throttled == 2
+    # Halved twice, then at most one slot regained by fast batches
+    assert scheduler.concurrency <= 2, scheduler.concurrency
+
+    print("✅ Rate limits halve concurrency and retried batches succeed")
+
+
+def test_additive_increase_and_slow_batches():
+    """Test that fast batches add a slot back and slow ones remove one."""
+    print("\nTesting additive increase...")
+    llm._embed_model = FakeEmbedModel(latency=0.001)
+    scheduler = _scheduler(max_batch_size=1, min_concurrency=1, max_concurrency=4)
+    scheduler.concurrency = 1
+
+    asyncio.run(scheduler.embed(["a", "b", "c"]))
+    assert scheduler.concurrency > 1, scheduler.concurrency
+
+    llm._embed_model = FakeEmbedModel(latency=0.05)
+    slow = _scheduler(target_latency=0.01, max_concurrency=4)
+    start = slow.concurrency
+    asyncio.run(slow.embed(["a"]))
+    assert slow.concurrency == start - 1
+
+    try:
+        llm._embed_model = FakeEmbedModel(throttle_calls=10)
+        asyncio.run(_scheduler(max_retries=0).embed(["a"]))
+        raise AssertionError("Retries exhausted should raise the 429")
+    except RateLimited:
+        pass
+    finally:
+        llm._embed_model = None
+
+    print("✅ Concurrency adapts to batch latency")
+
+
+if __name__ == "__main__":
+    test_batch_token_bounds()
+    test_embed_alignment_and_concurrency()
+    test_backoff_on_rate_limit()
+    test_additive_increase_and_slow_batches()
+    print("\n🎉 All embedding scheduler tests passed!")
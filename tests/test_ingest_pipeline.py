@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test script for the staged ingest pipeline, run against the embedded NumPy
+vector index with fake embeddings.
+"""
+
+import asyncio
+import io
+import zipfile
+from fastapi import UploadFile
+from app.core.config import get_settings
+from app.core.ingest_pipeline import IngestPipeline
+from app.core.qdrant_client import get_qdrant_client, insert_documents
+from app.utils.chunking import chunk_texts
+from tests.fakes import local_backend
+
+
+def _upload(name: str, text: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(text.encode()), filename=name)
+
+
+async def _stored():
+    """Every stored chunk as {(source, chunk_id): (text, total_chunks)}"""
+    client = await get_qdrant_client()
+    records, _ = await client.scroll(
+        collection_name=get_settings().qdrant_collection,
+        limit=10000,
+        with_payload=True,
+        with_vectors=False,
+    )
+    return {
+        (r.payload["metadata"]["source"], r.payload["metadata"]["chunk_id"]): (
+            r.payload["text"],
+            r.payload["metadata"]["total_chunks"],
+        )
+        for r in records
+    }
+
+
+ADVISORY = " ".join(
+    f"Week {i}: irrigate wheat at crown root initiation and apply urea in split doses."
+    for i in range(400)
+)
+
+
+def test_segmented_chunking():
+    """Test that chunking page groups as they arrive matches whole-file chunking."""
+    print("Testing segmented chunking...")
+
+    async def run():
+        async with local_backend(ingest_segment_chars=2000, dedup_mode="off"):
+            pipeline = IngestPipeline(namespace="advisories", batch_size=16)
+            stats = await pipeline.run(
+                [_upload("wheat.txt", ADVISORY), _upload("empty.txt", "")]
+            )
+            return stats, await _stored()
+
+    stats, stored = asyncio.run(run())
+    expected = [chunk.text for chunk in chunk_texts([ADVISORY])[0]]
+    assert len(expected) > 3, "The advisory should span several chunks"
+    assert stats.files_parsed == 2 and stats.chunks_parsed == len(expected), stats
+    assert stats.chunks_upserted == len(expected), stats
+    texts = [stored[("wheat.txt", i)][0] for i in range(len(expected))]
+    assert texts == expected, "Chunks differ from chunking the whole file"
+    assert {total for _, total in stored.values()} == {len(expected)}
+
+    print("✅ Page groups are chunked as they arrive, with whole-file results")
+
+
+def test_archive_members():
+    """Test that only members the parser handles are ingested from archives."""
+    print("\nTesting archive member filtering...")
+
+    inner = io.BytesIO()
+    with zipfile.ZipFile(inner, "w") as archive:
+        archive.writestr("nested.txt", "Nested archives are not expanded")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("advisory.txt", "Spray neem oil against aphids")
+        archive.writestr("field.jpg", bytes(range(256)) * 8)
+        archive.writestr("scheme.docx", b"PK\x03\x04 binary office document")
+        archive.writestr("older.zip", inner.getvalue())
+    buffer.seek(0)
+
+    async def run():
+        async with local_backend(dedup_mode="off"):
+            pipeline = IngestPipeline(namespace="advisories")
+            stats = await pipeline.run(
+                [UploadFile(file=buffer, filename="bulletins.zip")]
+            )
+            return stats, await _stored()
+
+    stats, stored = asyncio.run(run())
+    assert set(stored) == {("bulletins.zip/advisory.txt", 0)}, set(stored)
+    assert stats.files_total == 1 and stats.files_parsed == 1, stats
+
+    print("✅ Binary members and nested archives are skipped")
+
+
+def test_stages_overlap():
+    """Test that points land while later files are still being parsed."""
+    print("\nTesting pipeline backpressure...")
+    progress = []
+
+    async def run():
+        async with local_backend(dedup_mode="off") as fake:
+            pipeline = IngestPipeline(batch_size=1, queue_size=1, parse_workers=1)
+            done = []
+
+            def files():
+                for i in range(12):
+                    # How far the later stages got when this file was drawn
+                    progress.append(pipeline.stats.chunks_upserted)
+                    yield _upload(f"mandi{i}.txt", f"Onion arrivals at mandi {i}")
+
+            pipeline.on_file_done = lambda source, chunks: done.append((source, chunks))
+            stats = await pipeline.run(files())
+            return stats, done, fake.texts
+
+    stats, done, embedded = asyncio.run(run())
+    assert progress[-1] > 0, "Nothing was upserted until every file was parsed"
+    assert stats.files_total == stats.files_parsed == 12, stats
+    assert stats.chunks_parsed == stats.chunks_embedded == stats.chunks_upserted
+    assert sorted(done) == sorted((f"mandi{i}.txt", 1) for i in range(12))
+    assert len(embedded) == 12
+    assert all(seconds >= 0 for seconds in stats.stage_seconds.values())
+
+    print("✅ Stages overlap and every file is reported done once")
+
+
+def _revision(chunks, source="advisory.txt"):
+    metadatas = [
+        {
+            "source": source,
+            "namespace": "advisories",
+            "chunk_id": i,
+            "total_chunks": len(chunks),
+        }
+        for i in range(len(chunks))
+    ]
+    return list(chunks), metadatas
+
+
+def test_incremental_reingest():
+    """Test that re-ingest embeds only changed chunks and retires stale ones."""
+    print("\nTesting incremental re-ingest...")
+    v1 = [f"Section {i}: dose of potash for banana, stage {i}" for i in range(4)]
+    # A new first section moves the others down; the last one was dropped
+    v2 = ["Section 0: revised advisory for the rabi season", *v1[:3]]
+
+    async def run():
+        async with local_backend(dedup_mode="off") as fake:
+            await insert_documents(*_revision(v1), incremental=True)
+            first = len(fake.texts)
+            await insert_documents(*_revision(v2), incremental=True)
+            return first, fake.texts[first:], await _stored()
+
+    first, embedded, stored = asyncio.run(run())
+    assert first == 4
+    assert embedded == [v2[0]], "Only the new chunk should be embedded"
+    assert stored == {
+        ("advisory.txt", i): (text, len(v2)) for i, text in enumerate(v2)
+    }, stored
+
+    # The pipeline path: unchanged files are skipped, edited ones updated
+    text = " ".join(f"Drip irrigation tip {i} for sugarcane." for i in range(60))
+
+    async def pipeline_run():
+        async with local_backend(dedup_mode="off", chunk_size=64, chunk_overlap=0):
+            await IngestPipeline(namespace="advisories").run(
+                [_upload("drip.txt", text)]
+            )
+            before = await _stored()
+            same = await IngestPipeline(namespace="advisories", incremental=True).run(
+                [_upload("drip.txt", text)]
+            )
+            # Trimming the end keeps the leading chunks and drops the tail
+            edited = await IngestPipeline(namespace="advisories", incremental=True).run(
+                [_upload("drip.txt", text[: len(text) // 2])]
+            )
+            return before, same, edited, await _stored()
+
+    before, same, edited, after = asyncio.run(pipeline_run())
+    assert len(before) > 3
+    assert same.chunks_unchanged == len(before) and same.chunks_embedded == 0
+    assert same.chunks_deleted == 0
+    assert edited.chunks_unchanged > 0 and edited.chunks_deleted > 0, edited
+    total = edited.chunks_parsed
+    assert sorted(after) == [("drip.txt", i) for i in range(total)], sorted(after)
+    assert {t for _, t in after.values()} == {total}, "Positions were not updated"
+
+    print("✅ Unchanged chunks are skipped and stale ones retired")
+
+
+if __name__ == "__main__":
+    test_segmented_chunking()
+    test_archive_members()
+    test_stages_overlap()
+    test_incremental_reingest()
+    print("\n🎉 All ingest pipeline tests passed!")
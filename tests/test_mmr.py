@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for maximal marginal relevance selection of retrieved chunks.
+"""
+
+import numpy as np
+from app.utils.mmr import mmr_select, scale_scores
+
+QUERY = [1.0, 0.0, 0.0]
+# Two near-copies of the best chunk (overlapping windows), then a chunk
+# covering different content that is slightly less relevant
+CANDIDATES = [
+    [0.95, 0.31, 0.0],
+    [0.94, 0.33, 0.0],
+    [0.93, 0.35, 0.02],
+    [0.80, -0.10, 0.59],
+]
+
+
+def test_skips_near_duplicates():
+    """Test that a distinct chunk is preferred over a near-copy."""
+    print("Testing near-duplicate suppression...")
+
+    assert mmr_select(QUERY, CANDIDATES, 2, lambda_mult=0.5) == [0, 3]
+    # lambda 1 is plain relevance order
+    assert mmr_select(QUERY, CANDIDATES, 3, lambda_mult=1.0) == [0, 1, 2]
+
+    print("✅ Near-copies of a selected chunk are skipped")
+
+
+def test_edge_cases():
+    """Test k larger than the candidate set, empty input and unnormalized vectors."""
+    print("\nTesting edge cases...")
+
+    assert sorted(mmr_select(QUERY, CANDIDATES, 10)) == [0, 1, 2, 3]
+    assert mmr_select(QUERY, [], 3) == []
+    assert mmr_select(QUERY, CANDIDATES, 0) == []
+    scaled = (np.asarray(CANDIDATES) * [[10], [1], [3], [0.5]]).tolist()
+    assert mmr_select(QUERY, scaled, 2) == [0, 3]
+
+    print("✅ Edge cases handled")
+
+
+def test_fused_relevance():
+    """Test that a given (e.g. RRF) ranking replaces dense relevance."""
+    print("\nTesting fused relevance...")
+
+    # The sparse search ranked the distinct chunk first
+    relevance = scale_scores([0.031, 0.030, 0.029, 0.033])
+    assert relevance.max() == 1.0 and relevance.min() == 0.0
+    assert mmr_select(None, CANDIDATES, 2, 1.0, relevance) == [3, 0]
+    assert mmr_select(None, CANDIDATES, 2, 0.5, relevance) == [3, 0]
+    assert scale_scores([0.5, 0.5]).tolist() == [1.0, 1.0]
+
+    print("✅ Fused rankings are kept as the relevance term")
+
+
+if __name__ == "__main__":
+    test_skips_near_duplicates()
+    test_edge_cases()
+    test_fused_relevance()
+    print("\n🎉 All MMR tests passed!")
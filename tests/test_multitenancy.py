@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for the QDRANT_MULTITENANCY collection config: the is_tenant
+namespace index and per-tenant HNSW graphs.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from qdrant_client.models import HnswConfigDiff, KeywordIndexParams
+from app.core.qdrant_client import TENANT_FIELD, CollectionRegistry
+from tests.fakes import local_backend
+
+
+class SchemaClient:
+    """Records the collection config it is given and reports it back."""
+
+    def __init__(self, payload_schema=None, hnsw=None):
+        self.exists = payload_schema is not None
+        self.payload_schema = dict(payload_schema or {})
+        self.hnsw = hnsw
+        self.created = None
+        self.indexes = []
+        self.updates = []
+
+    async def collection_exists(self, name):
+        return self.exists
+
+    async def delete_collection(self, name):
+        self.exists = False
+
+    async def create_collection(self, collection_name, **kwargs):
+        self.exists = True
+        self.created = kwargs
+        hnsw = kwargs.get("hnsw_config")
+        self.hnsw = SimpleNamespace(
+            m=16 if hnsw is None or hnsw.m is None else hnsw.m,
+            payload_m=None if hnsw is None else hnsw.payload_m,
+        )
+
+    async def create_payload_index(self, collection_name, field_name, field_schema):
+        self.indexes.append((field_name, field_schema))
+        self.payload_schema[field_name] = SimpleNamespace(
+            params=(
+                field_schema if isinstance(field_schema, KeywordIndexParams) else None
+            )
+        )
+
+    async def update_collection(self, collection_name, hnsw_config):
+        self.updates.append(hnsw_config)
+        self.hnsw = SimpleNamespace(m=hnsw_config.m, payload_m=hnsw_config.payload_m)
+
+    async def get_collection(self, name):
+        vectors = SimpleNamespace(size=16, distance="Cosine")
+        params = SimpleNamespace(vectors={"dense": vectors}, sparse_vectors={})
+        config = SimpleNamespace(
+            params=params, quantization_config=None, hnsw_config=self.hnsw
+        )
+        return SimpleNamespace(config=config, payload_schema=self.payload_schema)
+
+
+def _is_tenant(schema):
+    return isinstance(schema, KeywordIndexParams) and schema.is_tenant
+
+
+def test_new_collection():
+    """Test that new collections get the tenant index and per-tenant graphs."""
+    print("Testing new multitenant collections...")
+
+    async def run(**overrides):
+        async with local_backend(dedup_mode="off", **overrides):
+            client = SchemaClient()
+            info = await CollectionRegistry().ensure(client, "agri")
+            return client, info
+
+    client, info = asyncio.run(
+        run(qdrant_multitenancy=True, qdrant_global_hnsw=False, qdrant_tenant_hnsw_m=24)
+    )
+    assert client.created["hnsw_config"] == HnswConfigDiff(payload_m=24, m=0)
+    tenant = [schema for field, schema in client.indexes if field == TENANT_FIELD]
+    assert len(tenant) == 1 and _is_tenant(tenant[0]), client.indexes
+    assert info.tenant_field == TENANT_FIELD
+    assert client.updates == [], "A new collection needs no HNSW update"
+
+    client, info = asyncio.run(run(qdrant_multitenancy=False))
+    assert client.created["hnsw_config"] is None
+    assert not any(_is_tenant(schema) for _, schema in client.indexes)
+    assert info.tenant_field is None and client.updates == []
+
+    print("✅ New collections are created with the tenant config")
+
+
+def test_existing_collection():
+    """Test that collections created before multitenancy are converted."""
+    print("\nTesting existing collections...")
+    # The schema a collection got before QDRANT_MULTITENANCY existed
+    legacy = {
+        "metadata.namespace": SimpleNamespace(params=None),
+        "metadata.source": SimpleNamespace(params=None),
+        "metadata.chunk_id": SimpleNamespace(params=None),
+    }
+
+    async def run():
+        async with local_backend(
+            dedup_mode="off",
+            qdrant_multitenancy=True,
+            qdrant_global_hnsw=False,
+            qdrant_tenant_hnsw_m=16,
+        ):
+            client = SchemaClient(legacy, SimpleNamespace(m=16, payload_m=None))
+            info = await CollectionRegistry().ensure(client, "agri")
+            converted = (list(client.indexes), list(client.updates))
+            # A later process finds the collection already converted
+            again = await CollectionRegistry().ensure(client, "agri")
+            return client, info, again, converted
+
+    client, info, again, (indexes, updates) = asyncio.run(run())
+    assert client.created is None, "The collection must not be re-created"
+    assert [field for field, _ in indexes] == [TENANT_FIELD], indexes
+    assert _is_tenant(indexes[0][1])
+    assert updates == [HnswConfigDiff(m=0, payload_m=16)], updates
+    assert info.tenant_field == again.tenant_field == TENANT_FIELD
+    assert client.indexes == indexes and client.updates == updates
+
+    print("✅ Existing collections get the tenant index and HNSW update once")
+
+
+if __name__ == "__main__":
+    test_new_collection()
+    test_existing_collection()
+    print("\n🎉 All multitenancy tests passed!")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test script for parallel PDF page extraction and streaming text decoding.
+"""
+
+import dataclasses
+import io
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+import app.core.config as config
+import app.utils.parsing as parsing
+from app.utils.parsing import (
+    _extract_page_range,
+    _range_result,
+    _recycle_pdf_pool,
+    get_pdf_pool,
+    iter_decoded_text,
+    iter_pdf_pages,
+)
+
+
+def _write_pdf(texts) -> str:
+    """Write a PDF with one line of Helvetica text per page"""
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    for text in texts:
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as fh:
+        writer.write(fh)
+    return path
+
+
+def _with_pdf_settings(test, **overrides):
+    """Run `test` with PDF settings overridden and a fresh PDF pool"""
+    saved = config._settings
+    config._settings = dataclasses.replace(config.get_settings(), **overrides)
+    parsing._pdf_pool = None
+    try:
+        test()
+    finally:
+        if parsing._pdf_pool is not None:
+            parsing._pdf_pool.shutdown()
+            parsing._pdf_pool = None
+        config._settings = saved
+
+
+PAGES = [f"Page {i} mandi rates" for i in range(1, 8)]
+
+
+def test_page_ranges():
+    """Test that ranges split over the pool come back complete and in order."""
+    print("Testing PDF page ranges...")
+    path = _write_pdf(PAGES)
+
+    def run():
+        skipped = []
+        pages = list(iter_pdf_pages(path, skipped))
+        assert [page.strip() for page in pages] == PAGES, pages
+        assert skipped == []
+
+    try:
+        _with_pdf_settings(run, pdf_workers=2, pdf_pages_per_task=3)
+    finally:
+        os.unlink(path)
+
+    print("✅ Page ranges are extracted in page order")
+
+
+def test_page_timeout():
+    """Test that the worker times pages itself and queued ranges can wait."""
+    print("\nTesting PDF page timeouts...")
+    path = _write_pdf(PAGES[:3])
+    try:
+        pages = _extract_page_range(path, 0, 3)
+        assert [page.strip() for page in pages] == PAGES[:3], pages
+        # A budget no page can meet: every page is reported as timed out
+        assert _extract_page_range(path, 0, 3, page_timeout=1e-6) == [None] * 3
+    finally:
+        os.unlink(path)
+
+    # A range still queued behind others is not on the clock yet
+    queued: Future = Future()
+
+    def start_late():
+        time.sleep(0.3)
+        queued.set_running_or_notify_cancel()
+        queued.set_result(["late"])
+
+    threading.Thread(target=start_late).start()
+    assert _range_result(queued, budget=0.05) == ["late"]
+
+    # A running range that outlives twice its budget times out
+    stuck: Future = Future()
+    stuck.set_running_or_notify_cancel()
+    t0 = time.monotonic()
+    try:
+        _range_result(stuck, budget=0.05)
+        raise AssertionError("A stuck range should time out")
+    except FutureTimeout:
+        assert time.monotonic() - t0 < 1
+
+    path = _write_pdf(PAGES)
+
+    def run():
+        skipped = []
+        pages = list(iter_pdf_pages(path, skipped))
+        assert pages == [""] * len(PAGES), pages
+        assert skipped == list(range(1, len(PAGES) + 1)), skipped
+
+    try:
+        _with_pdf_settings(
+            run, pdf_workers=1, pdf_pages_per_task=2, pdf_page_timeout=1e-6
+        )
+    finally:
+        os.unlink(path)
+
+    print("✅ Pages over budget are skipped without stalling the document")
+
+
+def test_pool_recycling():
+    """Test that ranges lost with a recycled pool are resubmitted."""
+    print("\nTesting PDF pool recycling...")
+    path = _write_pdf(PAGES)
+
+    def run():
+        pages = iter_pdf_pages(path)
+        first = next(pages)
+        old = get_pdf_pool()
+        # As if another ingest hit a stuck worker and replaced the pool
+        new = _recycle_pdf_pool(old)
+        assert new is not old and get_pdf_pool() is new
+        rest = list(pages)
+        assert [page.strip() for page in [first, *rest]] == PAGES
+
+    try:
+        _with_pdf_settings(run, pdf_workers=1, pdf_pages_per_task=1)
+    finally:
+        os.unlink(path)
+
+    print("✅ Ranges survive the pool being recycled mid-document")
+
+
+def _decode(data: bytes, block_size: int = 2) -> str:
+    """Decode through small blocks so sequences straddle block boundaries"""
+    saved = parsing._BLOCK_SIZE
+    parsing._BLOCK_SIZE = block_size
+    try:
+        return "".join(iter_decoded_text(io.BytesIO(data)))
+    finally:
+        parsing._BLOCK_SIZE = saved
+
+
+def test_decoding():
+    """Test UTF-8 decoding with per-byte latin-1 fallback."""
+    print("\nTesting streaming decoding...")
+
+    hindi = "गेहूं की बुआई नवंबर में"
+    assert _decode(hindi.encode()) == hindi
+    assert _decode(hindi.encode(), block_size=1024) == hindi
+
+    # A stray byte is read as latin-1 without touching the valid UTF-8
+    assert _decode(b"abc\xe2\x82\xac\xfftail") == "abc€ÿtail"
+    assert _decode("धान".encode() + b"\x92 rates") == "धान\x92 rates"
+    assert _decode("Prix du blé, maïs".encode("latin-1")) == "Prix du blé, maïs"
+
+    # A sequence cut off at the end of a UTF-8 file is one replacement char
+    assert _decode(b"abc\xe2\x82") == "abc\ufffd"
+    # ... but in a file already known to hold latin-1 it is latin-1 too
+    assert _decode(b"caf\xe9 \xe2\x82") == "café â\x82"
+    assert _decode(b"") == ""
+
+    print("✅ Invalid bytes fall back to latin-1 one at a time")
+
+
+if __name__ == "__main__":
+    test_page_ranges()
+    test_page_timeout()
+    test_pool_recycling()
+    test_decoding()
+    print("\n🎉 All parsing tests passed!")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for the retrieval result cache.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from app.core.qdrant_client import insert_documents, search_similar
+from app.core.retrieval_cache import (
+    RetrievalCache,
+    SharedVersion,
+    bump_collection_version,
+    get_retrieval_cache,
+)
+from tests.fakes import local_backend
+
+RESULTS = [{"text": "PM-KISAN pays Rs 6000 a year", "score": 0.9, "metadata": {}}]
+
+
+def test_exact_and_semantic_hits():
+    """Test exact hits on normalized queries and semantic hits by embedding."""
+    print("Testing retrieval cache lookups...")
+
+    cache = RetrievalCache(max_bytes=1024 * 1024, semantic_threshold=0.95)
+    version = bump_collection_version()
+    key = cache.make_key("PM-KISAN eligibility", "schemes", 5)
+    cache.put(key, "schemes", 5, [1.0, 0.0, 0.0], RESULTS, version)
+
+    same = cache.make_key("  pm-kisan   ELIGIBILITY ", "schemes", 5)
+    assert cache.get(same) == RESULTS, "Normalized query should hit"
+    assert cache.get(cache.make_key("PM-KISAN eligibility", None, 5)) is None
+
+    assert cache.get_similar("schemes", 5, [0.99, 0.05, 0.0]) == RESULTS
+    assert cache.get_similar("schemes", 5, [0.0, 1.0, 0.0]) is None
+    assert cache.get_similar("schemes", 3, [1.0, 0.0, 0.0]) is None, "top_k differs"
+
+    print("✅ Exact and semantic lookups work")
+
+
+def test_invalidation_and_eviction():
+    """Test version-based invalidation and byte-bounded eviction."""
+    print("\nTesting retrieval cache invalidation...")
+
+    cache = RetrievalCache(max_bytes=400)
+    version = bump_collection_version()
+    key = cache.make_key("wheat price today", None, 5)
+    cache.put(key, None, 5, None, RESULTS, version)
+    assert cache.get(key) == RESULTS
+
+    # A write to the collection drops everything cached before it
+    bump_collection_version()
+    assert cache.get(key) is None
+    # Results computed before the write are not stored afterwards
+    cache.put(key, None, 5, None, RESULTS, version)
+    assert cache.get(key) is None
+
+    version = bump_collection_version()
+    keys = [cache.make_key(f"query {i}", None, 5) for i in range(10)]
+    for k in keys:
+        cache.get(k)
+        cache.put(k, None, 5, None, RESULTS, version)
+    stats = cache.stats()
+    assert stats["bytes"] <= 400, stats
+    assert stats["evictions"] > 0, stats
+    assert cache.get(keys[-1]) == RESULTS, "Most recent entry should survive"
+
+    print("✅ Cache is invalidated by writes and bounded by size")
+
+
+def test_shared_version_and_max_age():
+    """Test that versions are shared through the file and entries expire."""
+    print("\nTesting shared collection version...")
+
+    path = os.path.join(tempfile.mkdtemp(), "collection_version")
+    worker = SharedVersion(path, check_interval=0)
+    other = SharedVersion(path, check_interval=0)
+    assert worker.get() == other.get() == ""
+    # A write in one process is seen by the others on their next check
+    version = other.bump()
+    assert worker.get() == version
+
+    lagging = SharedVersion(path, check_interval=60)
+    worker.bump()
+    assert lagging.get() == version, "Re-read at most every check_interval"
+
+    cache = RetrievalCache(max_bytes=1024 * 1024, max_age=0.05)
+    version = bump_collection_version()
+    key = cache.make_key("onion mandi rates", None, 5)
+    cache.put(key, None, 5, [1.0, 0.0], RESULTS, version)
+    assert cache.get(key) == RESULTS
+    time.sleep(0.1)
+    assert cache.get_similar(None, 5, [1.0, 0.0]) is None
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+    print("✅ Collection version is shared and entries expire")
+
+
+def test_search_stats():
+    """Test that every search_similar lookup is counted once, in both modes."""
+    print("\nTesting retrieval cache stats...")
+
+    texts = ["wheat sowing in november", "paddy transplanting in july"]
+    metadatas = [{"source": "crops.txt", "namespace": "crops"} for _ in texts]
+
+    async def run(mode):
+        async with local_backend(retrieval_mode=mode, dedup_mode="off"):
+            await insert_documents(texts, metadatas)
+            await search_similar("wheat sowing", top_k=1, namespace="crops")
+            await search_similar("Wheat  sowing", top_k=1, namespace="crops")
+            # Same words, so the same fake embedding, but a different key
+            await search_similar("sowing wheat", top_k=1, namespace="crops")
+            return get_retrieval_cache().stats()
+
+    stats = asyncio.run(run("hybrid"))
+    assert stats["hits"] == 1 and stats["semantic_hits"] == 0, stats
+    assert stats["misses"] == 2, "Hybrid mode only reuses exact matches"
+    assert stats["hit_rate"] == round(1 / 3, 4), stats
+
+    stats = asyncio.run(run("dense"))
+    assert stats["hits"] == 1 and stats["semantic_hits"] == 1, stats
+    assert stats["misses"] == 1, stats
+
+    print("✅ Cache stats count one hit or miss per lookup")
+
+
+if __name__ == "__main__":
+    test_exact_and_semantic_hits()
+    test_invalidation_and_eviction()
+    test_shared_version_and_max_age()
+    test_search_stats()
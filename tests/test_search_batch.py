@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for batched retrieval with search_similar_batch.
+"""
+
+import asyncio
+import app.core.qdrant_client as qdrant_client
+from app.core.qdrant_client import (
+    get_qdrant_client,
+    insert_documents,
+    search_similar,
+    search_similar_batch,
+)
+from app.core.retrieval_cache import get_retrieval_cache
+from tests.fakes import local_backend
+
+TEXTS = [
+    "Wheat sowing window closes in late November",
+    "Paddy nursery should be raised in June",
+    "Mustard needs one irrigation at flowering",
+]
+
+
+class RecordingClient:
+    """Wraps the embedded index, recording batch searches and failing filtered ones."""
+
+    def __init__(self, client, fail_filtered=False):
+        self.client = client
+        self.fail_filtered = fail_filtered
+        self.batches = []
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    async def query_batch_points(self, collection_name, requests, **kwargs):
+        filtered = any(
+            "metadata.namespace" in str((request.filter, request.prefetch))
+            for request in requests
+        )
+        self.batches.append((len(requests), filtered))
+        if filtered and self.fail_filtered:
+            raise RuntimeError("Index required but not found for metadata.namespace")
+        return await self.client.query_batch_points(collection_name, requests, **kwargs)
+
+
+async def _seed(fail_filtered=False) -> RecordingClient:
+    metadatas = [
+        {"source": f"crop{i}.txt", "namespace": "crops", "chunk_id": 0}
+        for i in range(len(TEXTS))
+    ]
+    await insert_documents(TEXTS, metadatas)
+    client = await get_qdrant_client()
+    recording = RecordingClient(client, fail_filtered)
+    qdrant_client._embedded_client = recording
+    return recording
+
+
+def _top_source(results):
+    return results[0]["metadata"]["source"] if results else None
+
+
+def test_duplicate_queries_stay_aligned():
+    """Test that repeated queries are searched once and results stay aligned."""
+    print("Testing batch search alignment...")
+    queries = ["wheat sowing", "paddy nursery", "Wheat  Sowing", "wheat sowing"]
+
+    async def run():
+        async with local_backend(dedup_mode="off") as fake:
+            recording = await _seed()
+            seeded = len(fake.texts)
+            results = await search_similar_batch(queries, top_k=1, namespace="crops")
+            embedded = fake.texts[seeded:]
+            # A second batch is served from the cache except for the new query
+            again = await search_similar_batch(
+                ["paddy nursery", "mustard irrigation"], top_k=1, namespace="crops"
+            )
+            single = await search_similar(
+                "mustard irrigation", top_k=1, namespace="crops"
+            )
+            return results, again, single, embedded, recording.batches
+
+    results, again, single, embedded, batches = asyncio.run(run())
+    assert len(results) == len(queries)
+    assert [_top_source(r) for r in results] == [
+        "crop0.txt",
+        "crop1.txt",
+        "crop0.txt",
+        "crop0.txt",
+    ], results
+    assert results[0] == results[2] == results[3]
+    assert embedded == ["wheat sowing", "paddy nursery"], embedded
+    assert [_top_source(r) for r in again] == ["crop1.txt", "crop2.txt"]
+    assert again[1] == single, "Batch and single search should agree"
+    assert batches == [(2, True), (1, True)], batches
+
+    print("✅ Results line up with the queries, duplicates searched once")
+
+
+def test_unfiltered_fallback():
+    """Test the retry without the namespace filter when the batch search fails."""
+    print("\nTesting batch search fallback...")
+
+    async def run():
+        async with local_backend(dedup_mode="off", qdrant_multitenancy=False):
+            recording = await _seed(fail_filtered=True)
+            results = await search_similar_batch(
+                ["mustard irrigation", "paddy nursery"], top_k=1, namespace="crops"
+            )
+            return results, recording.batches, get_retrieval_cache().stats()
+
+    results, batches, stats = asyncio.run(run())
+    assert batches == [(2, True), (2, False)], batches
+    assert [_top_source(r) for r in results] == ["crop2.txt", "crop1.txt"], results
+    assert stats["entries"] == 0, "Unfiltered results must not be cached"
+
+    async def tenant_run():
+        async with local_backend(dedup_mode="off", qdrant_multitenancy=True):
+            await _seed(fail_filtered=True)
+            await search_similar_batch(["paddy nursery"], top_k=1, namespace="crops")
+
+    try:
+        asyncio.run(tenant_run())
+        raise AssertionError("Tenant-scoped searches must not drop the filter")
+    except RuntimeError:
+        pass
+
+    print("✅ Failed batches retry unfiltered, except under multitenancy")
+
+
+if __name__ == "__main__":
+    test_duplicate_queries_stay_aligned()
+    test_unfiltered_fallback()
+    print("\n🎉 All batch search tests passed!")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact serialization of search results for tools.
+"""
+
+import json
+from app.utils.search_results import (
+    format_batch_search_results,
+    format_search_results,
+    format_web_results,
+    pack_search_results,
+    truncate_text,
+)
+
+RESULTS = [
+    {
+        "text": "गेहूं की बुवाई नवंबर में करें",
+        "score": 0.91234,
+        "metadata": {"source": "wheat.pdf", "chunk_id": 3},
+    },
+    {"text": "Apply urea in two splits.", "score": 0.5, "metadata": {}},
+]
+
+
+def test_truncate_text():
+    """Test truncation at word boundaries."""
+    print("Testing truncation...")
+
+    assert truncate_text("short text", 0) == "short text"
+    assert truncate_text("short text", 50) == "short text"
+    cut = truncate_text("apply urea in two equal splits after sowing", 20)
+    assert len(cut) <= 20 and cut.endswith("…"), cut
+    assert cut == "apply urea in two…", cut
+
+    print("✅ Long texts are cut at a word boundary")
+
+
+def test_compact_format():
+    """Test that the compact format carries source, chunk and score."""
+    print("\nTesting compact format...")
+
+    output = format_search_results(RESULTS, fmt="compact", max_chars=0)
+    assert output.startswith("[1] wheat.pdf#3 (score 0.912)\nगेहूं"), output
+    assert "[2] unknown (score 0.500)" in output
+    assert format_search_results([], fmt="compact") == "No results."
+
+    print("✅ Compact format is one block per hit")
+
+
+def test_json_format():
+    """Test the minified JSON format keeps non-ASCII text readable."""
+    print("\nTesting JSON format...")
+
+    output = format_search_results(RESULTS, fmt="json", max_chars=10)
+    assert "गेहूं" in output and "\\u" not in output
+    assert ", " not in output, "JSON output should be minified"
+    parsed = json.loads(output)
+    assert parsed[0]["source"] == "wheat.pdf#3"
+    assert parsed[1]["text"].endswith("…")
+    assert len(output) < len(json.dumps(RESULTS))
+
+    batch = json.loads(
+        format_batch_search_results(["q1", "q2"], [RESULTS, []], fmt="json")
+    )
+    assert [entry["query"] for entry in batch] == ["q1", "q2"]
+    assert batch[1]["results"] == []
+
+    print("✅ JSON output is minified and readable")
+
+
+def test_pack_merges_and_trims():
+    """Test merging same-source chunks and trimming by score to a budget."""
+    print("\nTesting context packing...")
+
+    words = [f"w{i}" for i in range(300)]
+    hits = [
+        # Adjacent chunks overlapping by 40 words, returned out of order
+        {
+            "text": " ".join(words[160:]),
+            "score": 0.8,
+            "metadata": {"source": "a.pdf", "chunk_id": 1},
+        },
+        {
+            "text": " ".join(words[:200]),
+            "score": 0.9,
+            "metadata": {"source": "a.pdf", "chunk_id": 0},
+        },
+        {"text": "low " * 400, "score": 0.1, "metadata": {"source": "b.pdf"}},
+    ]
+
+    packed = pack_search_results(hits, 0)
+    assert len(packed) == 2
+    assert packed[0]["text"] == " ".join(words), "Overlap should be dropped"
+    assert packed[0]["metadata"]["chunk_id"] == "0,1"
+    assert packed[0]["score"] == 0.9
+
+    packed = pack_search_results(hits, 700)
+    assert [hit["metadata"]["source"] for hit in packed] == ["a.pdf", "b.pdf"]
+    assert packed[1]["text"].endswith("…"), "The last hit is cut to the budget"
+    assert len(format_search_results(hits, fmt="compact", max_tokens=700)) < 2900
+
+    # The best hit survives even a tiny budget
+    packed = pack_search_results(hits, 5)
+    assert len(packed) == 1 and packed[0]["metadata"]["chunk_id"] == 0
+
+    print("✅ Hits are merged by source and trimmed by score")
+
+
+def test_batch_and_web_budgets():
+    """Test that batch and web search outputs stay within the budget."""
+    print("\nTesting batch and web budgets...")
+
+    long_hits = [
+        {"text": "x " * 2000, "score": 0.9 - i / 10, "metadata": {"source": f"s{i}"}}
+        for i in range(3)
+    ]
+    output = format_batch_search_results(
+        ["q1", "q2"], [long_hits, long_hits[:1]], fmt="compact", max_tokens=1000
+    )
+    assert len(output) // 4 < 1100, len(output)
+    assert "## q2\n[1] s0" in output
+
+    web = json.loads(
+        format_web_results(
+            "wheat price",
+            "Around 2,400 per quintal.",
+            [
+                {
+                    "title": f"Page {i}",
+                    "url": f"https://example.org/{i}",
+                    "content": "price " * 100,
+                    "score": 0.5 + i / 10,
+                }
+                for i in range(3)
+            ],
+            max_tokens=100,
+        )
+    )
+    assert web["results"][0].startswith("Answer:")
+    assert web["total_results"] == len(web["results"]) - 1
+    assert "Page 2" in web["results"][1], "Pages are ordered by score"
+
+    print("✅ Batch and web outputs respect the token budget")
+
+
+if __name__ == "__main__":
+    test_truncate_text()
+    test_compact_format()
+    test_json_format()
+    test_pack_merges_and_trims()
+    test_batch_and_web_budgets()
+    print("\n🎉 All search result formatting tests passed!")
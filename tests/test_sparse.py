@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Test script for the BM25 sparse encoder used by hybrid retrieval.
+"""
+
+from app.utils.sparse import document_vector, query_vector, term_index, tokenize
+
+
+def test_tokenize_keeps_codes():
+    """Test that variety codes survive tokenization whole and in parts."""
+    print("Testing sparse tokenization...")
+
+    tokens = tokenize("Sow HD-2967 wheat at 100 kg/ha")
+    assert "hd-2967" in tokens and "hd" in tokens and "2967" in tokens, tokens
+    assert "kg/ha" in tokens, tokens
+    assert "at" not in tokens, "Stopwords should be dropped"
+
+    print("✅ Compound codes are kept whole and split")
+
+
+def test_bm25_vectors():
+    """Test that document weights saturate and queries are unit weights."""
+    print("\nTesting BM25 sparse vectors...")
+
+    indices, values = document_vector("urea urea urea potash", avg_doc_tokens=4)
+    weights = dict(zip(indices, values))
+    assert indices == sorted(indices), "Indices must be sorted"
+    assert weights[term_index("urea")] > weights[term_index("potash")]
+    assert weights[term_index("urea")] < 3 * weights[term_index("potash")]
+
+    q_indices, q_values = query_vector("urea dose for urea")
+    assert len(q_indices) == len(set(q_indices)) == 2, q_indices
+    assert set(q_values) == {1.0}
+    assert document_vector("", avg_doc_tokens=4) == ([], [])
+
+    print("✅ Sparse vectors carry BM25 term weights")
+
+
+if __name__ == "__main__":
+    test_tokenize_keeps_codes()
+    test_bm25_vectors()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for batched upserts: retries, wait handling and cache versioning.
+"""
+
+import asyncio
+import app.core.qdrant_client as qdrant_client
+from app.core.config import get_settings
+from app.core.qdrant_client import get_qdrant_client, point_ids_for, upsert_chunks
+from app.core.retrieval_cache import get_collection_version
+from tests.fakes import FakeEmbedModel, local_backend
+
+
+class FlakyClient:
+    """Wraps the embedded index, failing chosen batches and recording upserts."""
+
+    def __init__(self, client, failures):
+        self.client = client
+        # Remaining failures per first point ID of a batch
+        self.failures = failures
+        self.upserts = []
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    async def upsert(self, collection_name, points, wait=True, **kwargs):
+        first = str(points[0].id)
+        self.upserts.append((first, len(points), wait))
+        if self.failures.get(first, 0) > 0:
+            self.failures[first] -= 1
+            raise ConnectionError("connection reset by peer")
+        # Let the other batches in flight get ahead, as a real server would
+        await asyncio.sleep(0.01 if wait else 0)
+        return await self.client.upsert(collection_name, points, wait=wait, **kwargs)
+
+
+def _chunks(count: int):
+    texts = [f"Mandi price bulletin {i} for tomato" for i in range(count)]
+    metadatas = [{"source": "prices.txt", "chunk_id": i} for i in range(count)]
+    embeddings = [FakeEmbedModel().embed(text) for text in texts]
+    return texts, metadatas, embeddings, point_ids_for(texts, metadatas)
+
+
+async def _flaky(failures):
+    # Create the collection first so the wrapper sees only the upserts
+    await qdrant_client.get_collection_info(get_settings().qdrant_collection)
+    client = await get_qdrant_client()
+    flaky = qdrant_client._embedded_client = FlakyClient(client, failures)
+    return flaky
+
+
+async def _count() -> int:
+    client = await get_qdrant_client()
+    records, _ = await client.scroll(
+        collection_name=get_settings().qdrant_collection, limit=1000
+    )
+    return len(records)
+
+
+def test_wait_on_last_batch():
+    """Test that only the last batch waits, and only after the others."""
+    print("Testing upsert wait handling...")
+    texts, metadatas, embeddings, ids = _chunks(10)
+
+    async def run():
+        async with local_backend(qdrant_upsert_batch_size=3, qdrant_upsert_wait=False):
+            flaky = await _flaky({})
+            report = await upsert_chunks(texts, metadatas, embeddings, ids=ids)
+            return report, flaky.upserts, await _count()
+
+    report, upserts, stored = asyncio.run(run())
+    assert report.points == 10 and report.batches == 4 and report.retries == 0
+    assert [(size, wait) for _, size, wait in upserts] == [
+        (3, False),
+        (3, False),
+        (3, False),
+        (1, True),
+    ], upserts
+    assert upserts[-1][0] == ids[9], "The waited batch must be the last one"
+    assert stored == 10
+
+    print("✅ Only the final batch waits for the write to be applied")
+
+
+def test_retry_with_backoff():
+    """Test that a failing batch is retried on its own."""
+    print("\nTesting upsert retries...")
+    texts, metadatas, embeddings, ids = _chunks(9)
+
+    async def run():
+        async with local_backend(qdrant_upsert_batch_size=3, qdrant_upsert_retries=2):
+            flaky = await _flaky({ids[3]: 1})
+            report = await upsert_chunks(texts, metadatas, embeddings, ids=ids)
+            return report, flaky.upserts, await _count()
+
+    report, upserts, stored = asyncio.run(run())
+    assert report.retries == 1, report
+    # The failed batch is sent twice, the others once each
+    assert sorted(first for first, _, _ in upserts) == sorted(
+        [ids[0], ids[3], ids[3], ids[6]]
+    ), upserts
+    assert stored == 9
+
+    print("✅ Failed batches are retried with backoff")
+
+
+def test_version_bump_on_partial_failure():
+    """Test that a write that fails part way still invalidates cached results."""
+    print("\nTesting partial upsert failures...")
+    texts, metadatas, embeddings, ids = _chunks(6)
+
+    async def run():
+        async with local_backend(qdrant_upsert_batch_size=3, qdrant_upsert_retries=1):
+            await _flaky({ids[3]: 5})
+            before = get_collection_version()
+            try:
+                await upsert_chunks(texts, metadatas, embeddings, ids=ids)
+                raise AssertionError("Retries exhausted should raise")
+            except ConnectionError:
+                pass
+            return before, get_collection_version(), await _count()
+
+    before, after, stored = asyncio.run(run())
+    assert after != before, "Cached searches must not outlive a partial write"
+    assert stored == 3, "The batch that succeeded stays written"
+
+    print("✅ Partial failures raise and still bump the collection version")
+
+
+if __name__ == "__main__":
+    test_wait_on_last_batch()
+    test_retry_with_backoff()
+    test_version_bump_on_partial_failure()
+    print("\n🎉 All upsert tests passed!")
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Test script for the embedded NumPy vector index backend.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import numpy as np
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    Fusion,
+    FusionQuery,
+    MatchValue,
+    Modifier,
+    PointIdsList,
+    PointStruct,
+    Prefetch,
+    QueryRequest,
+    SetPayload,
+    SetPayloadOperation,
+    SparseVector,
+    SparseVectorParams,
+    VectorParams,
+)
+from app.core.vector_index import LocalVectorIndex, select_payload
+
+
+def _namespace(value: str) -> Filter:
+    return Filter(
+        must=[FieldCondition(key="metadata.namespace", match=MatchValue(value=value))]
+    )
+
+
+async def _create(index: LocalVectorIndex, name: str = "docs") -> None:
+    await index.create_collection(
+        name,
+        vectors_config={"dense": VectorParams(size=4, distance=Distance.COSINE)},
+        sparse_vectors_config={"sparse": SparseVectorParams(modifier=Modifier.IDF)},
+    )
+    await index.create_payload_index(name, "metadata.namespace", "keyword")
+
+
+def _point(point_id: int, vector, namespace: str, terms=()) -> PointStruct:
+    return PointStruct(
+        id=point_id,
+        vector={
+            "dense": vector,
+            "sparse": SparseVector(indices=list(terms), values=[1.0] * len(terms)),
+        },
+        payload={"text": f"chunk {point_id}", "metadata": {"namespace": namespace}},
+    )
+
+
+def test_dense_search_and_filter():
+    """Test exact cosine search, namespace filtering and overwrites."""
+    print("Testing dense search...")
+
+    async def run():
+        index = LocalVectorIndex(tempfile.mkdtemp())
+        await _create(index)
+        await index.upsert(
+            "docs",
+            [
+                _point(1, [1, 0, 0, 0], "a"),
+                _point(2, [0.9, 0.1, 0, 0], "b"),
+                _point(3, [0, 1, 0, 0], "a"),
+            ],
+        )
+        hits = (
+            await index.query_points("docs", query=[1, 0, 0, 0], using="dense", limit=2)
+        ).points
+        assert [hit.id for hit in hits] == [1, 2], hits
+        assert abs(hits[0].score - 1.0) < 1e-6
+        assert hits[0].payload["text"] == "chunk 1"
+
+        hits = (
+            await index.query_points(
+                "docs",
+                query=[1, 0, 0, 0],
+                using="dense",
+                query_filter=_namespace("b"),
+                limit=5,
+            )
+        ).points
+        assert [hit.id for hit in hits] == [2], hits
+
+        # Re-upserting an ID replaces the point instead of adding a row
+        await index.upsert("docs", [_point(2, [0, 0, 1, 0], "a")])
+        assert (await index.count("docs")).count == 3
+        assert (await index.count("docs", count_filter=_namespace("b"))).count == 0
+        records = await index.retrieve("docs", [2, 99], with_payload=False)
+        assert [record.id for record in records] == [2]
+
+    asyncio.run(run())
+    print("✅ Dense search, filters and overwrites work")
+
+
+def test_hybrid_fusion():
+    """Test that sparse term matches are fused with dense results."""
+    print("\nTesting hybrid search...")
+
+    async def run():
+        index = LocalVectorIndex(tempfile.mkdtemp())
+        await _create(index)
+        await index.upsert(
+            "docs",
+            [
+                _point(1, [1, 0, 0, 0], "a", terms=[10, 11]),
+                _point(2, [0.99, 0.1, 0, 0], "a", terms=[10, 12]),
+                _point(3, [0, 1, 0, 0], "a", terms=[10]),
+            ],
+        )
+        sparse = (
+            await index.query_points(
+                "docs", query=SparseVector(indices=[12], values=[1.0]), using="sparse"
+            )
+        ).points
+        assert [hit.id for hit in sparse] == [2], sparse
+
+        fused = (
+            await index.query_points(
+                "docs",
+                prefetch=[
+                    Prefetch(query=[1, 0, 0, 0], using="dense", limit=3),
+                    Prefetch(
+                        query=SparseVector(indices=[12], values=[1.0]),
+                        using="sparse",
+                        limit=3,
+                    ),
+                ],
+                query=FusionQuery(fusion=Fusion.RRF),
+                limit=2,
+            )
+        ).points
+        assert fused[0].id == 2, "The exact term match should win the fusion"
+        assert fused[0].payload["metadata"]["namespace"] == "a"
+
+    asyncio.run(run())
+    print("✅ Dense and sparse results are fused with RRF")
+
+
+def test_batch_queries():
+    """Test that batched requests return responses aligned to the requests."""
+    print("\nTesting batch queries...")
+
+    async def run():
+        index = LocalVectorIndex(tempfile.mkdtemp())
+        await _create(index)
+        await index.upsert(
+            "docs",
+            [
+                _point(1, [1, 0, 0, 0], "a"),
+                _point(2, [0, 1, 0, 0], "b"),
+                _point(3, [0, 0, 1, 0], "a"),
+            ],
+        )
+        responses = await index.query_batch_points(
+            "docs",
+            requests=[
+                QueryRequest(query=[0, 0, 1, 0], using="dense", limit=1),
+                QueryRequest(
+                    query=[0, 1, 0, 0],
+                    using="dense",
+                    filter=_namespace("a"),
+                    limit=1,
+                    with_payload=True,
+                ),
+            ],
+        )
+        assert [[hit.id for hit in r.points] for r in responses] == [[3], [1]]
+        assert responses[0].points[0].payload is None
+        assert responses[1].points[0].payload["metadata"]["namespace"] == "a"
+
+    asyncio.run(run())
+    print("✅ Batch queries are answered in order")
+
+
+def test_selective_filter():
+    """Test that a namespace holding few rows is searched on its own rows."""
+    print("\nTesting selective filters...")
+
+    async def run():
+        index = LocalVectorIndex(tempfile.mkdtemp())
+        await _create(index)
+        vectors = np.random.default_rng(1).standard_normal((400, 4))
+        await index.upsert(
+            "docs",
+            [
+                _point(i, vector.tolist(), f"district-{i % 40}")
+                for i, vector in enumerate(vectors)
+            ],
+        )
+        query = vectors[17].tolist()
+        hits = (
+            await index.query_points(
+                "docs",
+                query=query,
+                using="dense",
+                query_filter=_namespace("district-17"),
+                limit=3,
+            )
+        ).points
+        assert hits[0].id == 17, hits
+        assert all(hit.id % 40 == 17 for hit in hits), hits
+        assert len(hits) == 3
+
+    asyncio.run(run())
+    print("✅ Selective filters return only their namespace")
+
+
+def test_persistence_and_growth():
+    """Test that points survive a reopen and the matrix grows past capacity."""
+    print("\nTesting persistence...")
+    path = tempfile.mkdtemp()
+    vectors = np.random.default_rng(0).standard_normal((1500, 4)).tolist()
+
+    async def write():
+        index = LocalVectorIndex(path)
+        await _create(index)
+        await index.upsert(
+            "docs",
+            [_point(i, vector, "a", terms=[i]) for i, vector in enumerate(vectors)],
+        )
+        await index.close()
+
+    async def read():
+        index = LocalVectorIndex(path)
+        assert await index.collection_exists("docs")
+        info = await index.get_collection("docs")
+        assert info.points_count == 1500
+        assert "metadata.namespace" in info.payload_schema
+        hits = (
+            await index.query_points(
+                "docs", query=vectors[1234], using="dense", limit=1
+            )
+        ).points
+        assert hits[0].id == 1234, hits
+        records, offset = await index.scroll("docs", limit=1000)
+        assert len(records) == 1000 and offset == 1000
+        records, offset = await index.scroll("docs", limit=1000, offset=offset)
+        assert len(records) == 500 and offset is None
+        assert await index.delete_collection("docs")
+        assert not await index.collection_exists("docs")
+
+    def downgrade():
+        # Older releases stored payload indexes as a bare type name
+        config_path = os.path.join(path, "docs", "collection.json")
+        with open(config_path) as f:
+            config = json.load(f)
+        config["payload_indexes"] = {"metadata.namespace": "keyword"}
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+
+    asyncio.run(write())
+    downgrade()
+    asyncio.run(read())
+    print("✅ Collections persist across reopen")
+
+
+def test_delete_and_set_payload():
+    """Test deletes (which move the last row into the gap) and payload updates."""
+    print("\nTesting deletes and payload updates...")
+    path = tempfile.mkdtemp()
+
+    async def write():
+        index = LocalVectorIndex(path)
+        await _create(index)
+        await index.upsert(
+            "docs",
+            [
+                _point(1, [1, 0, 0, 0], "a", terms=[1]),
+                _point(2, [0, 1, 0, 0], "b", terms=[2]),
+                _point(3, [0, 0, 1, 0], "a", terms=[3]),
+                _point(4, [0, 0, 0, 1], "b", terms=[4]),
+            ],
+        )
+        await index.delete("docs", PointIdsList(points=[1, 3, 99]))
+        await index.batch_update_points(
+            "docs",
+            [
+                SetPayloadOperation(
+                    set_payload=SetPayload(
+                        payload={"namespace": "a", "chunk_id": 7},
+                        points=[4],
+                        key="metadata",
+                    )
+                )
+            ],
+        )
+        await index.close()
+
+    async def read():
+        index = LocalVectorIndex(path)
+        assert (await index.count("docs")).count == 2
+        hits = (
+            await index.query_points("docs", query=[0, 0, 0, 1], using="dense", limit=1)
+        ).points
+        assert hits[0].id == 4 and hits[0].score > 0.99, hits
+        assert hits[0].payload["metadata"] == {"namespace": "a", "chunk_id": 7}
+        assert hits[0].payload["text"] == "chunk 4"
+        hits = (
+            await index.query_points(
+                "docs", query=SparseVector(indices=[4], values=[1.0]), using="sparse"
+            )
+        ).points
+        assert [hit.id for hit in hits] == [4], hits
+        assert (await index.count("docs", count_filter=_namespace("a"))).count == 1
+        assert not await index.retrieve("docs", [1, 3])
+
+    asyncio.run(write())
+    asyncio.run(read())
+    print("✅ Deleted points are gone and updated payloads are re-indexed")
+
+
+def test_storage_lock():
+    """Test that a storage folder is opened by one instance at a time."""
+    print("\nTesting the storage lock...")
+    path = tempfile.mkdtemp()
+
+    async def run():
+        index = LocalVectorIndex(path)
+        await _create(index)
+        try:
+            LocalVectorIndex(path)
+            raise AssertionError("A second instance should not open the folder")
+        except RuntimeError as e:
+            print(f"Refused: {e}")
+        await index.close()
+
+        reopened = LocalVectorIndex(path)
+        assert (await reopened.count("docs")).count == 0
+        await reopened.close()
+
+    asyncio.run(run())
+    print("✅ The storage folder is locked while open")
+
+
+def test_select_payload():
+    """Test payload selectors on nested keys."""
+    print("\nTesting payload selection...")
+
+    payload = {"text": "t", "metadata": {"source": "s", "chunk_id": 3}}
+    assert select_payload(payload, True) is payload
+    assert select_payload(payload, False) is None
+    assert select_payload(payload, ["metadata.source"]) == {"metadata": {"source": "s"}}
+
+    print("✅ Payload selectors project nested keys")
+
+
+if __name__ == "__main__":
+    test_dense_search_and_filter()
+    test_hybrid_fusion()
+    test_batch_queries()
+    test_selective_filter()
+    test_persistence_and_growth()
+    test_delete_and_set_payload()
+    test_storage_lock()
+    test_select_payload()
+    print("\n🎉 All vector index tests passed!")